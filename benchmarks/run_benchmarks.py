@@ -0,0 +1,324 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""run_benchmarks.py
+
+Benchmarks for the posterior hot paths of the conjugate package.  Results are
+written as JSON so that runs can be compared over time:
+
+    $ python benchmarks/run_benchmarks.py                  # full run
+    $ python benchmarks/run_benchmarks.py --quick -k hdcr  # subset
+    $ python benchmarks/run_benchmarks.py --compare old.json new.json
+
+Each result records the benchmark name, its parameters (alphabet size `K`,
+count magnitude `counts`) and per-call times in seconds.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import matplotlib  # noqa
+matplotlib.use('Agg')
+
+import numpy as np  # noqa
+
+import conjugate  # noqa
+
+ALPHABET_SIZES = [2, 10, 100, 1000, 10000]
+COUNT_MAGNITUDES = [10, 1000, 1000000]
+PLOT_ALPHABET_SIZES = [2, 10]
+
+QUICK_ALPHABET_SIZES = [2, 100]
+QUICK_COUNT_MAGNITUDES = [10, 1000000]
+
+
+def _binomial(counts):
+    """Return a BinomialBeta with about `counts` attempts."""
+    bp = conjugate.BinomialBeta()
+    bp.data = {'n': counts, 'k': counts//3}
+
+    return bp
+
+
+def _multinomial(K, counts):
+    """Return a MultinomialDirichlet over `K` symbols with about `counts`
+    observations per symbol.
+    """
+    mp = conjugate.MultinomialDirichlet(range(K))
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 2*counts + 1, size=K).tolist()
+    mp.data = dict(zip(mp.alphabet, values))
+
+    return mp
+
+
+def _without_cache(func):
+    """Wrap `func` so that it runs with the credible region cache off."""
+    def wrapped():
+        maxsize = conjugate.credible_region_cache.maxsize
+        conjugate.credible_region_cache.maxsize = 0
+        try:
+            return func()
+        finally:
+            conjugate.credible_region_cache.maxsize = maxsize
+
+    return wrapped
+
+
+def cases(quick=False):
+    """Yield (name, params, callable) for every benchmark case."""
+    sizes = QUICK_ALPHABET_SIZES if quick else ALPHABET_SIZES
+    magnitudes = QUICK_COUNT_MAGNITUDES if quick else COUNT_MAGNITUDES
+
+    for counts in magnitudes:
+        params = {'K': 1, 'counts': counts}
+        bp = _binomial(counts)
+        data = {'n': counts, 'k': counts//3}
+
+        yield ('binomial.add_data', params, lambda: bp.add_data(data))
+        yield ('binomial.posterior_mean', params,
+               lambda: bp.posterior_mean('p'))
+        yield ('binomial.posterior_central_credible_region', params,
+               _without_cache(
+                   lambda: bp.posterior_central_credible_region('p')))
+        yield ('binomial.posterior_high_density_credible_region', params,
+               _without_cache(
+                   lambda: bp.posterior_high_density_credible_region('p')))
+        # the cache is opt-in; enable it while this case is timed
+        conjugate.credible_region_cache.maxsize = 1024
+        yield ('binomial.posterior_high_density_credible_region[cached]',
+               params, lambda: bp.posterior_high_density_credible_region('p'))
+        conjugate.credible_region_cache.maxsize = 0
+
+    for K in sizes:
+        for counts in magnitudes:
+            params = {'K': K, 'counts': counts}
+            mp = _multinomial(K, counts)
+            data = dict(zip(mp.alphabet, [counts]*K))
+            last = mp.distribution_parameter_names[-1]
+
+            yield ('multinomial.add_data', params,
+                   lambda: mp.add_data(data))
+            yield ('multinomial.posterior_mean', params,
+                   lambda: mp.posterior_mean(last))
+            yield ('multinomial.posterior_mean[all]', params,
+                   lambda: [mp.posterior_mean(p) for p in mp])
+            yield ('multinomial.posterior_means', params,
+                   lambda: mp.posterior_means())
+            yield ('multinomial.posterior_summary', params,
+                   lambda: mp.posterior_summary())
+            yield ('multinomial.posterior_central_credible_region', params,
+                   _without_cache(
+                       lambda: mp.posterior_central_credible_region(last)))
+            yield ('multinomial.posterior_high_density_credible_region',
+                   params,
+                   _without_cache(
+                       lambda: mp.posterior_high_density_credible_region(
+                           last)))
+
+    for K in sizes:
+        params = {'K': K, 'counts': 1000}
+        bandit = conjugate.ThompsonSamplingBandit(K, rng=0)
+        arms = np.arange(1000) % K
+        outcomes = np.arange(1000) % 3 == 0
+
+        yield ('bandit.select', params, lambda: bandit.select())
+        yield ('bandit.select[batch=1000]', params,
+               lambda: bandit.select(batch=1000))
+        yield ('bandit.update[1000]', params,
+               lambda: bandit.update(arms, outcomes))
+
+    for K in sizes:
+        params = {'K': K, 'counts': 1000}
+        posteriors = conjugate.BinomialBetaArray(K)
+        posteriors.add_data({'n': 1000, 'k': 333})
+        k = np.arange(101)[:, np.newaxis]
+
+        yield ('binomial_array.posterior_predictive_logpmf[101]', params,
+               lambda: posteriors.posterior_predictive_logpmf(k, 100))
+
+    plt = conjugate.plots.pyplot()
+    for K in PLOT_ALPHABET_SIZES:
+        params = {'K': K, 'counts': 1000}
+        mp = _multinomial(K, 1000)
+
+        def plot_multinomial():
+            mp.plot_summary()
+            plt.close('all')
+
+        yield ('multinomial.plot_summary', params, plot_multinomial)
+
+    bp = _binomial(1000)
+
+    def plot_binomial():
+        bp.plot_summary()
+        plt.close('all')
+
+    yield ('binomial.plot_summary', {'K': 1, 'counts': 1000}, plot_binomial)
+
+
+def time_case(func, repeat=5, min_time=0.2):
+    """Return (number, per-call times) for `func`, using `timeit` to pick a
+    number of calls that takes at least `min_time` seconds.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 10**6:
+            break
+        number *= 10 if elapsed < min_time/10 else 2
+
+    times = [t/number for t in timer.repeat(repeat=repeat, number=number)]
+
+    return number, times
+
+
+def time_import(repeat=5):
+    """Return the times, in seconds, of `import conjugate` in fresh
+    interpreters.
+    """
+    code = ('import time; t = time.perf_counter(); import conjugate; '
+            'print(time.perf_counter() - t)')
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([os.path.dirname(HERE),
+                                         env.get('PYTHONPATH', '')])
+    times = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', code],
+                                         env=env)
+        times.append(float(output.decode('utf-8').strip()))
+
+    return times
+
+
+def _summary(name, params, number, times):
+    """Return a JSON-ready result record."""
+    return {'name': name, 'params': params, 'number': number,
+            'times': times, 'best': min(times),
+            'median': float(np.median(times))}
+
+
+def metadata():
+    """Return information about the environment of the run."""
+    import scipy
+
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=HERE,
+            stderr=subprocess.STDOUT).decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {'timestamp': datetime.datetime.now().isoformat(),
+            'commit': commit,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'matplotlib': matplotlib.__version__}
+
+
+def run(quick=False, keyword=None, repeat=5):
+    """Run the selected benchmarks and return the results dict."""
+    results = []
+    if keyword is None or keyword in 'import':
+        times = time_import(repeat=repeat)
+        results.append(_summary('import', {}, 1, times))
+        print('{:<72} {:>10.3e}'.format('import', min(times)))
+
+    for name, params, func in cases(quick=quick):
+        if keyword is not None and keyword not in name:
+            continue
+
+        number, times = time_case(func, repeat=repeat)
+        results.append(_summary(name, params, number, times))
+        label = '{} K={K} counts={counts}'.format(name, **params)
+        print('{:<72} {:>10.3e}'.format(label, min(times)))
+
+    return {'metadata': metadata(), 'results': results}
+
+
+def _key(result):
+    """Return a hashable key for matching results between runs."""
+    return (result['name'], tuple(sorted(result['params'].items())))
+
+
+def compare(old_path, new_path):
+    """Print the ratio of best times (new/old) for matching results."""
+    with open(old_path) as f:
+        old = {_key(r): r for r in json.load(f)['results']}
+    with open(new_path) as f:
+        new = [r for r in json.load(f)['results']]
+
+    print('{:<72} {:>10} {:>10} {:>6}'.format('benchmark', 'old', 'new',
+                                               'ratio'))
+    for result in new:
+        before = old.get(_key(result))
+        if before is None:
+            continue
+
+        label = result['name']
+        if result['params']:
+            label += ' K={K} counts={counts}'.format(**result['params'])
+        print('{:<72} {:>10.3e} {:>10.3e} {:>6.2f}'.format(
+            label, before['best'], result['best'],
+            result['best']/before['best']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--output', default=None,
+                        help='JSON file for the results (default: '
+                             'benchmarks/results/bench-<timestamp>.json)')
+    parser.add_argument('--quick', action='store_true',
+                        help='run a reduced set of sizes')
+    parser.add_argument('-k', dest='keyword', default=None,
+                        help='only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of timing repeats (default 5)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help='compare two result files and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run(quick=args.quick, keyword=args.keyword, repeat=args.repeat)
+
+    output = args.output
+    if output is None:
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(HERE, 'results', 'bench-{}.json'.format(stamp))
+
+    directory = os.path.dirname(os.path.abspath(output))
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+    print('results written to {}'.format(output))
+
+
+if __name__ == '__main__':
+    main()
@@ -13,17 +13,52 @@ The conjugate package.
 """
 from .abstract import PosteriorBase  # noqa
 
+from .bandit import ThompsonSamplingBandit
 from .binomial import BinomialBeta
+from .binomial import BinomialBetaArray
+from .binomial import bernoulli_counts  # noqa
+from .collection import ConcurrentPosteriors
 from .multinomial import MultinomialDirichlet
+from .window import SlidingWindow
 
 from .exceptions import ConjugateException  # noqa
 from .exceptions import ConjugateDataException  # noqa
 from .exceptions import ConjugateParameterException  # noqa
 
+from . import instrumentation  # noqa
+
 from .plots import plot_parameter_pdf  # noqa
 
+from .sampling import dirichlet_sample_chunks  # noqa
+from .sampling import reduce_chunks  # noqa
+from .sampling import ProbabilityOfMax  # noqa
+from .sampling import ReservoirQuantiles  # noqa
+from .sampling import RunningMoments  # noqa
+
+from .snapshot import load_posteriors  # noqa
+from .snapshot import save_posteriors  # noqa
+
+from .store import create_beta_store  # noqa
+from .store import create_dirichlet_store  # noqa
+from .store import DirichletStore  # noqa
+from .store import open_beta_store  # noqa
+from .store import open_dirichlet_store  # noqa
+
+from .utilities import beta_binomial_logpmf  # noqa
+from .utilities import beta_central_credible_region  # noqa
+from .utilities import beta_high_density_credible_region  # noqa
+from .utilities import beta_mode  # noqa
 from .utilities import central_credible_region  # noqa
+from .utilities import credible_region_cache  # noqa
+from .utilities import decay_weights  # noqa
+from .utilities import dirichlet_multinomial_logpmf  # noqa
+from .utilities import CredibleRegionCache  # noqa
 from .utilities import high_density_credible_region  # noqa
+from .utilities import merge_posteriors  # noqa
 
 __all__ = ['BinomialBeta',
-           'MultinomialDirichlet']
+           'BinomialBetaArray',
+           'ConcurrentPosteriors',
+           'MultinomialDirichlet',
+           'SlidingWindow',
+           'ThompsonSamplingBandit']
@@ -20,14 +20,66 @@ from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
 import six
 import abc
 
+import numpy as np
 
-class PosteriorBase(six.with_metaclass(abc.ABCMeta, object)):
-    """Abstract class for all posteriors."""
+from .instrumentation import InstrumentedMeta
+
+
+class PosteriorBase(six.with_metaclass(InstrumentedMeta, object)):
+    """Abstract class for all posteriors.  Public methods of subclasses, and
+    the private methods named in `_instrumented_methods`, are timed by
+    `conjugate.instrumentation` when it is enabled.
+    """
+
+    _instrumented_methods = ('_posterior_scipy', '_prior_scipy',
+                             '_posterior_marginal_scipy',
+                             '_prior_marginal_scipy', '_plot_prior_pdf',
+                             '_plot_posterior_pdf')
 
     @abc.abstractmethod
     def __contains__(self, parameter):
         pass # pragma: no cover
 
+    def __add__(self, other):
+        if not isinstance(other, type(self)):
+            return NotImplemented
+
+        return self.merge(other)
+
+    def __getstate__(self):
+        # cached frozen scipy distributions are rebuilt on demand; dropping
+        # them keeps pickles small, e.g. when shipping partial posteriors
+        # between processes
+        state = self.__dict__.copy()
+        state['_scipy_cache'] = {}
+
+        return state
+
+    # maximum number of frozen scipy distributions kept per posterior
+    _scipy_cache_size = 32
+
+    def _invalidate(self):
+        """Drop the cached frozen scipy distributions.  Subclasses call this
+        whenever data or prior hyperparameters change.
+        """
+        self._scipy_cache.clear()
+
+    def _cached_scipy(self, key, args, build):
+        """Return the frozen scipy distribution cached under `key`, calling
+        `build(*args)` to create it unless it was built from the same
+        hyperparameters `args`, e.g. after in-place edits of `data`.
+        """
+        entry = self._scipy_cache.get(key)
+        if entry is None or entry[0] != args:
+            if entry is None and \
+                    len(self._scipy_cache) >= self._scipy_cache_size:
+                # drop the oldest entry
+                del self._scipy_cache[next(iter(self._scipy_cache))]
+            entry = (args, build(*args))
+            self._scipy_cache[key] = entry
+
+        return entry[1]
+
     @abc.abstractmethod
     def __iter__(self):
         pass # pragma: no cover
@@ -91,48 +143,127 @@ class PosteriorBase(six.with_metaclass(abc.ABCMeta, object)):
         """Add data, keeping old data, with validation and processing."""
         pass # pragma: no cover
 
+    @abc.abstractmethod
+    def copy(self):
+        """Return an independent copy of the posterior that shares only
+        read-only state, e.g. parameter names, with this one.
+        """
+        pass # pragma: no cover
+
+    @abc.abstractmethod
+    def merge(self, other):
+        """Return a new posterior combining the data of this posterior and
+        `other`, which must have the same prior.
+        """
+        pass # pragma: no cover
+
     @abc.abstractmethod
     def prior_mean(self, parameter):
         """Return prior mean for passed parameter."""
         pass # pragma: no cover
 
     @abc.abstractmethod
-    def prior_sample(self):
+    def prior_sample(self, size=None, rng=None):
         """Return a sample of all parameters from the prior."""
         pass # pragma: no cover
 
     @abc.abstractmethod
-    def prior_sample_parameter(self, parameter):
+    def prior_sample_parameter(self, parameter, size=None, rng=None):
         """Return a sample of the passed parameter from the prior."""
         pass # pragma: no cover
 
     @abc.abstractmethod
-    def posterior_mean(self, parameter):
-        """Return posterior mean for passed parameter."""
+    def posterior_mean(self, parameter, timestamp=None):
+        """Return posterior mean for passed parameter.  Posterior queries
+        take an optional `timestamp`; with a half-life set, the counts
+        decayed to that time are used without changing them.
+        """
         pass # pragma: no cover
 
     @abc.abstractmethod
-    def posterior_sample(self):
+    def posterior_sample(self, size=None, rng=None, timestamp=None):
         """Return a sample of all parameters from the posterior."""
         pass # pragma: no cover
 
     @abc.abstractmethod
-    def posterior_sample_parameter(self, parameter):
+    def posterior_sample_parameter(self, parameter, size=None,
+                                   rng=None, timestamp=None):
         """Return a sample of the passed parameter from the posterior."""
         pass # pragma: no cover
 
     @abc.abstractmethod
-    def posterior_central_credible_region(self, parameter, confidence):
+    def posterior_central_credible_region(self, parameter, confidence,
+                                          timestamp=None):
         """Return central credible region of posterior for passed parameter."""
         pass # pragma: no cover
 
     @abc.abstractmethod
-    def posterior_high_density_credible_region(self, parameter, confidence):
+    def posterior_high_density_credible_region(self, parameter, confidence,
+                                               timestamp=None):
         """Return high-density credible region of posterior for passed
         parameter.
         """
         pass # pragma: no cover
 
+    @abc.abstractmethod
+    def posterior_means(self, timestamp=None):
+        """Return array of posterior means for all parameters, aligned with
+        `distribution_parameter_names`.
+        """
+        pass # pragma: no cover
+
+    @abc.abstractmethod
+    def posterior_variances(self, timestamp=None):
+        """Return array of posterior variances for all parameters."""
+        pass # pragma: no cover
+
+    @abc.abstractmethod
+    def posterior_modes(self, timestamp=None):
+        """Return array of posterior modes for all parameters."""
+        pass # pragma: no cover
+
+    @abc.abstractmethod
+    def posterior_central_credible_regions(self, confidence,
+                                           timestamp=None):
+        """Return `(K, 2)` array with the central credible regions of all
+        parameters.
+        """
+        pass # pragma: no cover
+
+    @abc.abstractmethod
+    def posterior_high_density_credible_regions(self, confidence,
+                                                timestamp=None):
+        """Return `(K, 2)` array with the high-density credible regions of
+        all parameters.
+        """
+        pass # pragma: no cover
+
+    def posterior_summary(self, confidence=0.95, timestamp=None):
+        """Return a structured array, one row per parameter, with fields
+        `parameter`, `mean`, `variance`, `mode`, `ccr_low`, `ccr_high`,
+        `hdcr_low` and `hdcr_high`.
+        """
+        names = self.distribution_parameter_names
+        ccr = self.posterior_central_credible_regions(confidence, timestamp)
+        hdcr = self.posterior_high_density_credible_regions(confidence,
+                                                            timestamp)
+        width = max(len(name) for name in names)
+
+        summary = np.empty(len(names),
+                           dtype=[('parameter', 'U{}'.format(width)),
+                                  ('mean', 'f8'), ('variance', 'f8'),
+                                  ('mode', 'f8'), ('ccr_low', 'f8'),
+                                  ('ccr_high', 'f8'), ('hdcr_low', 'f8'),
+                                  ('hdcr_high', 'f8')])
+        summary['parameter'] = names
+        summary['mean'] = self.posterior_means(timestamp)
+        summary['variance'] = self.posterior_variances(timestamp)
+        summary['mode'] = self.posterior_modes(timestamp)
+        summary['ccr_low'], summary['ccr_high'] = ccr[:, 0], ccr[:, 1]
+        summary['hdcr_low'], summary['hdcr_high'] = hdcr[:, 0], hdcr[:, 1]
+
+        return summary
+
     @abc.abstractmethod
     def plot_parameter_prior(self, parameter, **kwargs):
         """Plot the prior pdf for the passed parameter.
@@ -0,0 +1,288 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+aio.py
+
+Asyncio ingestion of data into a keyed collection of posteriors.  Producers,
+e.g. web handlers, only enqueue events; a single consumer task micro-batches
+them and calls `add_data` once per key and batch.
+
+This module needs Python 3.7 or later and is not imported by `import
+conjugate`; use `from conjugate.aio import PosteriorIngestor`.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import asyncio
+
+import numpy as np
+
+from .binomial import BinomialBeta
+
+from .exceptions import ConjugateException
+from .exceptions import ConjugateParameterException
+
+
+class PosteriorIngestor(object):
+    """Consume `(key, data)` events from an `asyncio.Queue` and apply them
+    in bulk to one posterior per key.
+
+    Events are collected until `batch_size` events are pending or
+    `max_delay` seconds have passed since the first one; the data of each
+    key is then summed and applied with a single `add_data` call.  A bounded
+    queue (`maxsize`) gives back-pressure: `put` waits while it is full, and
+    `metrics` reports how often and how long producers waited.
+
+    Events that do not match the posteriors (unknown keys in the data dict,
+    negative or non-numeric counts, more successes than attempts) are
+    dropped and counted as rejected.  The sum of valid events is always
+    valid, and `add_data` leaves a posterior unchanged when it rejects data,
+    so updates are applied in place.
+    """
+
+    def __init__(self, factory, maxsize=0, batch_size=1024, max_delay=0.01):
+        """Initialize an instance of the PosteriorIngestor class.
+
+        Arguments:
+        ----------
+        factory: callable returning a new posterior, e.g. `BinomialBeta` or
+            `lambda: MultinomialDirichlet(alphabet)`; called for new keys.
+        maxsize: maximum number of queued events, default 0 (unbounded).
+        batch_size: maximum number of events applied in one batch.
+        max_delay: maximum time, in seconds, to wait for a batch to fill.
+        """
+        if int(batch_size) <= 0 or max_delay < 0:
+            raise ConjugateParameterException('Batch size must be positive '
+                                              'and max_delay non-negative!')
+
+        probe = factory()
+        self._factory = factory
+        self._fields = frozenset(probe.data)
+        self._binomial = isinstance(probe, BinomialBeta)
+        self._posteriors = {}
+
+        self.queue = asyncio.Queue(maxsize)
+        self.batch_size = int(batch_size)
+        self.max_delay = max_delay
+
+        self._task = None
+        self._metrics = {'events_applied': 0, 'events_rejected': 0,
+                         'batches': 0, 'last_batch_size': 0, 'last_lag': 0.,
+                         'blocked_puts': 0, 'blocked_time': 0.}
+
+    def __len__(self):
+        return len(self._posteriors)
+
+    def keys(self):
+        """Return a list of the keys with data."""
+        return list(self._posteriors)
+
+    async def put(self, key, data):
+        """Enqueue data for the posterior of `key`, passed as for its
+        `add_data` method; waits while the queue is full.
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self.queue.full():
+            self._metrics['blocked_puts'] += 1
+            await self.queue.put((key, data, now))
+            self._metrics['blocked_time'] += loop.time() - now
+        else:
+            self.queue.put_nowait((key, data, now))
+
+    def put_nowait(self, key, data):
+        """Enqueue data without waiting; raises `asyncio.QueueFull` if the
+        queue is full.
+        """
+        self.queue.put_nowait((key, data, asyncio.get_running_loop().time()))
+
+    def _valid(self, data):
+        """Return True if `data` can be added to the posteriors on its own."""
+        if not isinstance(data, dict) or not self._fields.issuperset(data):
+            return False
+
+        try:
+            if not all(np.ndim(value) == 0 and value >= 0
+                       for value in data.values()):
+                return False
+        except (TypeError, ValueError):
+            return False
+
+        # every Binomial event must be consistent by itself
+        return not self._binomial or data.get('k', 0) <= data.get('n', 0)
+
+    def _update(self, key, data):
+        """Add `data` to the posterior of `key`; return False, leaving the
+        posterior unchanged, if it is rejected.
+        """
+        posterior = self._posteriors.get(key)
+        if posterior is None:
+            posterior = self._factory()
+
+        try:
+            posterior.add_data(data)
+        except (ConjugateException, TypeError):
+            return False
+
+        self._posteriors[key] = posterior
+
+        return True
+
+    def _apply(self, batch):
+        """Sum the data of each key in `batch` and add it to the
+        posteriors; if a sum fails, the events of that key are applied one
+        at a time and the failing ones rejected.
+        """
+        events = {}
+        rejected = 0
+        for key, data, _ in batch:
+            if self._valid(data):
+                events.setdefault(key, []).append(data)
+            else:
+                rejected += 1
+
+        applied = 0
+        for key, datas in events.items():
+            total = {}
+            for data in datas:
+                for name, value in data.items():
+                    total[name] = total.get(name, 0) + value
+
+            if self._update(key, total):
+                applied += len(datas)
+                continue
+
+            for data in datas:
+                if self._update(key, data):
+                    applied += 1
+                else:
+                    rejected += 1
+
+        self._metrics['events_applied'] += applied
+        self._metrics['events_rejected'] += rejected
+        self._metrics['batches'] += 1
+        self._metrics['last_batch_size'] = len(batch)
+        self._metrics['last_lag'] = \
+            asyncio.get_running_loop().time() - batch[0][2]
+
+    async def run(self):
+        """Consume and apply events until cancelled."""
+        loop = asyncio.get_running_loop()
+        getter = None
+        try:
+            while True:
+                if getter is None:
+                    getter = asyncio.ensure_future(self.queue.get())
+                batch = [await getter]
+                getter = None
+
+                deadline = loop.time() + self.max_delay
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                        continue
+                    except asyncio.QueueEmpty:
+                        pass
+
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+
+                    # a pending get is kept, not cancelled, on timeout so
+                    # that no event is lost
+                    getter = asyncio.ensure_future(self.queue.get())
+                    done, _ = await asyncio.wait([getter], timeout=remaining)
+                    if not done:
+                        break
+                    batch.append(getter.result())
+                    getter = None
+
+                try:
+                    self._apply(batch)
+                except Exception:
+                    # never let one bad batch stop the consumer
+                    self._metrics['events_rejected'] += len(batch)
+                finally:
+                    for _ in batch:
+                        self.queue.task_done()
+        finally:
+            if getter is not None:
+                getter.cancel()
+
+    def start(self):
+        """Start the consumer task on the running event loop and return
+        it.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run())
+
+        return self._task
+
+    async def flush(self):
+        """Wait until all queued events have been applied."""
+        await self.queue.join()
+
+    async def stop(self):
+        """Apply all queued events, then stop the consumer task."""
+        if self._task is None:
+            return
+
+        await self.flush()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def snapshot(self, key=None, flush=False):
+        """Return a copy of the posterior of `key`, or a dict with copies of
+        all posteriors if `key` is None.  Keys without data give a new
+        posterior holding only the prior.
+
+        Arguments:
+        ----------
+        key: key of the posterior, default None (all posteriors).
+        flush: first wait until all queued events have been applied,
+            default False.
+        """
+        if flush:
+            await self.flush()
+
+        # batches are applied without awaiting, so copies are consistent
+        if key is None:
+            return {k: p.copy() for k, p in self._posteriors.items()}
+
+        if key in self._posteriors:
+            return self._posteriors[key].copy()
+
+        return self._factory()
+
+    def metrics(self):
+        """Return a dict of ingestion and back-pressure metrics.
+
+        Returns:
+        --------
+        metrics: dict with keys `queue_size` and `queue_maxsize` (current
+            queue length and bound), `events_applied`, `events_rejected`,
+            `batches`, `last_batch_size`, `last_lag` (seconds from enqueuing
+            the first event of the last batch to applying it), and
+            `blocked_puts`/`blocked_time` (number of `put` calls that waited
+            on a full queue and the total seconds they waited).
+        """
+        metrics = dict(self._metrics)
+        metrics['queue_size'] = self.queue.qsize()
+        metrics['queue_maxsize'] = self.queue.maxsize
+
+        return metrics
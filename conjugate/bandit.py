@@ -0,0 +1,176 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+bandit.py
+
+Thompson sampling for Bernoulli bandits, with the Beta posteriors of all
+arms held in a single `BinomialBetaArray`.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import numpy as np
+import six
+
+from .binomial import BinomialBetaArray
+
+from .exceptions import ConjugateDataException
+from .exceptions import ConjugateParameterException
+
+from .instrumentation import InstrumentedMeta
+
+from .utilities import random_generator
+
+
+class ThompsonSamplingBandit(six.with_metaclass(InstrumentedMeta, object)):
+    """Thompson sampling over `n_arms` Bernoulli arms with Beta priors.
+
+    Every call to `select` or `select_top` makes one batched draw from the
+    posteriors of all arms; `update` folds arrays of (arm, outcome) pairs
+    into the posteriors with two `bincount` calls.
+    """
+
+    def __init__(self, n_arms, alpha=1, beta=1, rng=None, half_life=None):
+        """Initialize an instance of the ThompsonSamplingBandit class.
+
+        Arguments:
+        ----------
+        n_arms: number of arms.
+        alpha, beta: Beta prior hyperparameters; scalars or arrays of length
+            `n_arms`, default 1.
+        rng: None, a seed or a `numpy.random.Generator` used for all draws.
+        half_life: optional half-life for forgetting old rewards; see
+            `BinomialBetaArray`.
+        """
+        if int(n_arms) <= 0:
+            raise ConjugateParameterException('Number of arms must be '
+                                              'positive!')
+
+        self.posterior = BinomialBetaArray(n_arms, alpha=alpha, beta=beta,
+                                           half_life=half_life)
+        self.rng = random_generator(rng)
+
+    @classmethod
+    def from_posteriors(cls, posteriors, rng=None):
+        """Return a bandit with one arm per passed `BinomialBeta` instance,
+        copying their prior hyperparameters and data.
+        """
+        posteriors = list(posteriors)
+        bandit = cls(len(posteriors),
+                     alpha=[bp.prior_hyperparameters['alpha']
+                            for bp in posteriors],
+                     beta=[bp.prior_hyperparameters['beta']
+                           for bp in posteriors],
+                     rng=rng)
+        bandit.posterior.add_data({'n': [bp.data['n'] for bp in posteriors],
+                                   'k': [bp.data['k'] for bp in posteriors]})
+
+        return bandit
+
+    def __len__(self):
+        return len(self.posterior)
+
+    def _draw(self, batch):
+        """Return posterior draws with shape `(n_arms,)` or
+        `(batch, n_arms)`.
+        """
+        a, b = self.posterior._posterior_hyperparameters()
+        if batch is None:
+            return self.rng.beta(a, b)
+
+        return self.rng.beta(a, b, size=(int(batch), a.shape[0]))
+
+    def select(self, batch=None):
+        """Select arms by Thompson sampling.
+
+        Arguments:
+        ----------
+        batch: None for a single decision, or the number of independent
+            decisions to make at once (e.g. one per concurrent request).
+
+        Returns:
+        --------
+        arm: index of the selected arm, or an integer array of length
+            `batch`.
+        """
+        draw = self._draw(batch)
+        if batch is None:
+            return int(draw.argmax())
+
+        return draw.argmax(axis=-1)
+
+    def select_top(self, m, batch=None):
+        """Select the `m` distinct arms with the largest posterior draws,
+        ordered from largest to smallest draw.
+
+        Returns:
+        --------
+        arms: integer array with shape `(m,)`, or `(batch, m)` if `batch`
+            is passed.
+        """
+        m = int(m)
+        if m <= 0 or m > len(self):
+            raise ConjugateParameterException('m must be between 1 and the '
+                                              'number of arms!')
+
+        draw = -self._draw(batch)
+        top = np.argpartition(draw, m - 1, axis=-1)[..., :m]
+        order = np.argsort(np.take_along_axis(draw, top, axis=-1), axis=-1)
+
+        return np.take_along_axis(top, order, axis=-1)
+
+    def update(self, arms, outcomes, timestamp=None):
+        """Update the posteriors with observed rewards.
+
+        Arguments:
+        ----------
+        arms: integer array of pulled arms; an arm may appear many times.
+        outcomes: array of matching 0 (failure) / 1 (success) rewards.
+        timestamp: time of the rewards, used only with `half_life`.
+        """
+        arms = np.asarray(arms, dtype=np.intp).ravel()
+        outcomes = np.asarray(outcomes).ravel()
+        if arms.shape != outcomes.shape:
+            raise ConjugateDataException('Arms and outcomes must have the '
+                                         'same length!')
+
+        if arms.shape[0] == 0:
+            return
+
+        if arms.min() < 0 or arms.max() >= len(self):
+            raise ConjugateDataException('Arm index out of range!')
+
+        if np.any((outcomes != 0) & (outcomes != 1)):
+            raise ConjugateDataException('Outcomes must be 0 or 1!')
+
+        n = np.bincount(arms, minlength=len(self))
+        k = np.bincount(arms[outcomes == 1], minlength=len(self))
+        self.posterior.add_data({'n': n, 'k': k}, timestamp=timestamp)
+
+    def probability_best(self, n_samples=10000, chunk_size=1024):
+        """Return Monte Carlo estimates of the probability that each arm has
+        the largest success probability.
+        """
+        if int(n_samples) <= 0 or int(chunk_size) <= 0:
+            raise ConjugateParameterException('Number of samples and chunk '
+                                              'size must be positive!')
+
+        wins = np.zeros(len(self), dtype=np.int64)
+        remaining = int(n_samples)
+        while remaining > 0:
+            m = min(int(chunk_size), remaining)
+            wins += np.bincount(self.select(batch=m), minlength=len(self))
+            remaining -= m
+
+        return wins/int(n_samples)
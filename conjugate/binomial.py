@@ -18,19 +18,111 @@ from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
                              input, int, map, next, oct, open, pow, range,
                              round, str, super, zip)
 
+import copy
+import time
+from itertools import islice
+
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import beta
+import six
 
 from .abstract import PosteriorBase
 
 from .exceptions import ConjugateDataException
 from .exceptions import ConjugateParameterException
 
-from .plots import plot_parameter_pdf
+from .instrumentation import InstrumentedMeta
+from .instrumentation import instrument
 
-from .utilities import central_credible_region
-from .utilities import high_density_credible_region
+from .plots import plot_parameter_pdf
+from .plots import pyplot
+
+from .utilities import beta_binomial_logpmf
+from .utilities import beta_binomial_moments
+from .utilities import beta_central_credible_region
+from .utilities import beta_high_density_credible_region
+from .utilities import beta_mode
+from .utilities import credible_region_cache
+from .utilities import decay_weights
+from .utilities import random_generator
+from .utilities import sample_shape
+
+
+def _count_successes(block):
+    """Return the number of ones in a 1-d block of 0/1 outcomes, raising an
+    exception for any other value.
+    """
+    kind = block.dtype.kind
+    if kind == 'b':
+        pass
+    elif kind == 'u':
+        if block.max() > 1:
+            raise ConjugateDataException('Outcomes must be 0 or 1!')
+    elif kind == 'i':
+        if block.min() < 0 or block.max() > 1:
+            raise ConjugateDataException('Outcomes must be 0 or 1!')
+    elif kind == 'f':
+        if not np.all((block == 0.) | (block == 1.)):
+            raise ConjugateDataException('Outcomes must be 0 or 1!')
+    else:
+        raise ConjugateDataException('Outcomes must be boolean or numeric!')
+
+    return int(np.count_nonzero(block))
+
+
+@instrument('binomial.bernoulli_counts')
+def bernoulli_counts(outcomes, chunk_size=1 << 20):
+    """Reduce raw Bernoulli outcomes to the number of attempts :math:`n` and
+    successes :math:`k`.
+
+    Arrays (and objects with the buffer protocol) are reduced with
+    vectorized counts over blocks of `chunk_size` values; other iterables
+    are consumed `chunk_size` values at a time with `np.fromiter`, so no
+    Python integer is kept per outcome.
+
+    Arguments:
+    ----------
+    outcomes: NumPy array, list, `bytes`/`bytearray`/`memoryview` (one byte
+        per outcome unless the memoryview has another format) or iterable
+        of 0/1 (or boolean) outcomes.
+    chunk_size: number of outcomes reduced per block, default 2**20.
+
+    Returns:
+    --------
+    n, k: number of outcomes and number of ones.
+    """
+    chunk_size = int(chunk_size)
+    if chunk_size <= 0:
+        raise ConjugateParameterException('Chunk size must be positive!')
+
+    if isinstance(outcomes, (bytes, bytearray)):
+        outcomes = np.frombuffer(outcomes, dtype=np.uint8)
+    elif isinstance(outcomes, (memoryview, list, tuple)):
+        outcomes = np.asarray(outcomes)
+
+    n = 0
+    k = 0
+    if isinstance(outcomes, np.ndarray):
+        outcomes = outcomes.reshape(-1)
+        for start in range(0, outcomes.shape[0], chunk_size):
+            block = outcomes[start:start + chunk_size]
+            n += block.shape[0]
+            k += _count_successes(block)
+    else:
+        outcomes = iter(outcomes)
+        while True:
+            # read as float so that values other than 0/1 are not truncated
+            try:
+                block = np.fromiter(islice(outcomes, chunk_size),
+                                    dtype=np.float64)
+            except (TypeError, ValueError):
+                raise ConjugateDataException('Outcomes must be boolean or '
+                                             'numeric!')
+            if block.shape[0] == 0:
+                break
+            n += block.shape[0]
+            k += _count_successes(block)
+
+    return n, k
 
 
 class BinomialBeta(PosteriorBase):
@@ -41,13 +133,31 @@ class BinomialBeta(PosteriorBase):
     _distribution = 'Distribution: Binomial'
     _prior = 'Prior: Beta'
 
-    def __init__(self):
-        """Initialize an instance of the BinomialPosterior class."""
+    def __init__(self, half_life=None):
+        """Initialize an instance of the BinomialPosterior class.
+
+        Arguments:
+        ----------
+        half_life: optional half-life, in the units of the timestamps passed
+            to `add_data`.  If set, existing counts are halved every
+            `half_life` so that the posterior relaxes toward the prior.
+            Stored counts are decayed when data is added; pass `timestamp`
+            to the posterior query methods to use counts decayed to that
+            time without changing them.
+        """
         self._distribution_parameter_names = ['p']
         self._distribution_parameter_support = {'p': (0.0, 1.0)}
         self._prior_hyperparameters = {'alpha': 1, 'beta': 1}
         self._data = {'n': 0, 'k': 0}
 
+        # exponential forgetting; time of the latest update
+        self.half_life = half_life
+        self._timestamp = -np.inf
+
+        # frozen scipy distributions and the hyperparameters they were
+        # built from, cleared by _invalidate
+        self._scipy_cache = {}
+
     def __contains__(self, parameter):
         return parameter in self._distribution_parameter_names
 
@@ -62,16 +172,39 @@ class BinomialBeta(PosteriorBase):
 
         return tmp
 
+    def _decayed_data(self, timestamp=None):
+        """Return the counts n, k decayed to `timestamp` without changing
+        them; the stored counts if `timestamp` is None or `half_life` is not
+        set.
+        """
+        n = self._data['n']
+        k = self._data['k']
+        if timestamp is None or self.half_life is None:
+            return n, k
+
+        decay = float(decay_weights(timestamp, self._timestamp,
+                                    self.half_life)[0])
+
+        return n*decay, k*decay
+
+    def _posterior_hyperparameters(self, timestamp=None):
+        """Return the hyperparameters of the Beta posterior, with counts
+        decayed to `timestamp` if it is passed.
+        """
+        a = self._prior_hyperparameters['alpha']
+        b = self._prior_hyperparameters['beta']
+        n, k = self._decayed_data(timestamp)
+
+        return a+k, b+n-k
+
     def _posterior_scipy(self):
         """Return the scipy posterior. For Binomial inference this is the same
         as the marginal because there is a single model parameter.
         """
-        a = self._prior_hyperparameters['alpha']
-        b = self._prior_hyperparameters['beta']
-        k = self._data['k']
-        n = self._data['n']
+        from scipy.stats import beta
 
-        return beta(a+k, b+n-k)
+        return self._cached_scipy('posterior',
+                                  self._posterior_hyperparameters(), beta)
 
     def _posterior_marginal_scipy(self, parameter):
         """Return the scipy (marginal) posterior for passed parameter."""
@@ -80,10 +213,12 @@ class BinomialBeta(PosteriorBase):
     def _prior_scipy(self):
         """Return the scipy prior. For Binomial inference this the same as the
         marginal because there is a single model parameter."""
+        from scipy.stats import beta
+
         a = self._prior_hyperparameters['alpha']
         b = self._prior_hyperparameters['beta']
 
-        return beta(a, b)
+        return self._cached_scipy('prior', (a, b), beta)
 
     def _prior_marginal_scipy(self, parameter):
         """Return the scipy (marginal) prior for passed parameter."""
@@ -173,6 +308,7 @@ class BinomialBeta(PosteriorBase):
                                                   'must be greater than '
                                                   'zero!')
 
+        self._invalidate()
         self._prior_hyperparameters = new_setting
 
     @property
@@ -182,29 +318,124 @@ class BinomialBeta(PosteriorBase):
     @data.setter
     def data(self, new_data):
         # clear current data
+        self._invalidate()
         self._data = {'n': 0, 'k': 0}
         self.add_data(new_data)
 
-    def add_data(self, data):
-        """Add data, passed as as a dict with keys :math:`n` and :math:`k`."""
+    def _decay(self, timestamp):
+        """Decay the counts to `timestamp` (default: now) and return the
+        weight for data observed at `timestamp`.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        decay, weight = decay_weights(timestamp, self._timestamp,
+                                      self.half_life)
+        self._invalidate()
+        self._data['n'] *= float(decay)
+        self._data['k'] *= float(decay)
+        self._timestamp = max(self._timestamp, timestamp)
+
+        return float(weight)
+
+    def decay_to(self, timestamp=None):
+        """Apply exponential forgetting to the stored counts up to
+        `timestamp` (default: now).  Does nothing unless `half_life` is
+        set.
+        """
+        if self.half_life is not None:
+            self._decay(timestamp)
+
+    def add_data(self, data, timestamp=None):
+        """Add data, passed as as a dict with keys :math:`n` and :math:`k`.
+        Invalid data raises an exception and leaves the posterior unchanged.
+
+        If `half_life` is set, the existing counts are first decayed to
+        `timestamp` (default: now); data older than the latest update is
+        down-weighted instead.
+        """
         if isinstance(data, list):
             raise ConjugateDataException('Data must be passed as n,k '
                                          'dictionary!')
-        elif isinstance(data, dict):
-            for key in data:
-                if key in self._data:
-                    self._data[key] += data[key]
-                else:
-                    raise ConjugateDataException('Key: {} in passed data not '
-                                                 'valid!'.format(key))
-        else:
+        elif not isinstance(data, dict):
             raise ConjugateDataException('Passed data is not a dictionary!')
 
-        n = self.data['n']
-        k = self.data['k']
-        if k > n:
+        for key in data:
+            if key not in self._data:
+                raise ConjugateDataException('Key: {} in passed data not '
+                                             'valid!'.format(key))
+
+        n = self._data['n']
+        k = self._data['k']
+        dn = data.get('n', 0)
+        dk = data.get('k', 0)
+        if self.half_life is not None:
+            if timestamp is None:
+                timestamp = time.time()
+
+            decay, weight = decay_weights(timestamp, self._timestamp,
+                                          self.half_life)
+            n, k = n*float(decay), k*float(decay)
+            dn, dk = dn*float(weight), dk*float(weight)
+
+        # check the updated counts before changing any state
+        if k + dk > n + dn:
             raise ConjugateDataException('Data has k > n -- invalid!')
 
+        self._invalidate()
+        self._data['n'] = n + dn
+        self._data['k'] = k + dk
+        if self.half_life is not None:
+            self._timestamp = max(self._timestamp, timestamp)
+
+    def add_outcomes(self, outcomes, chunk_size=1 << 20, timestamp=None):
+        """Add raw Bernoulli outcomes -- an array, buffer or iterable of 0's
+        (failures) and 1's (successes).  See `bernoulli_counts`.
+        """
+        n, k = bernoulli_counts(outcomes, chunk_size=chunk_size)
+        self.add_data({'n': n, 'k': k}, timestamp=timestamp)
+
+    def copy(self):
+        """Return an independent copy of this posterior; unlike
+        `copy.deepcopy`, cached scipy distributions are not copied.
+        """
+        bp = copy.copy(self)
+        bp._prior_hyperparameters = dict(self._prior_hyperparameters)
+        bp._data = dict(self._data)
+        bp._scipy_cache = {}
+
+        return bp
+
+    def merge(self, other):
+        """Return a new BinomialBeta with the data of this posterior and
+        `other` added together.  The prior hyperparameters must match; the
+        prior is counted once.  Also available as `self + other`.
+        """
+        if not isinstance(other, BinomialBeta):
+            raise ConjugateParameterException('Can only merge with another '
+                                              'BinomialBeta!')
+
+        prior = self.prior_hyperparameters
+        other_prior = other.prior_hyperparameters
+        if any(float(prior[h]) != float(other_prior[h]) for h in prior):
+            raise ConjugateParameterException('Prior hyperparameters do not '
+                                              'match!')
+
+        if self.half_life != other.half_life:
+            raise ConjugateParameterException('Half-lives do not match!')
+
+        merged = type(self)(half_life=self.half_life)
+        merged.prior_hyperparameters = dict(prior)
+        if self.half_life is None:
+            merged.add_data({'n': self.data['n'] + other.data['n'],
+                             'k': self.data['k'] + other.data['k']})
+        else:
+            # decay both to the later of the two update times
+            for source in (self, other):
+                merged.add_data(source.data, timestamp=source._timestamp)
+
+        return merged
+
     def prior_mean(self, parameter):
         """Return the prior mean for the specified parameter."""
         if parameter not in self:
@@ -215,58 +446,184 @@ class BinomialBeta(PosteriorBase):
 
             return a/(a+b)
 
-    def prior_sample(self):
-        """Return a sample of all parameters from the Beta prior."""
-        pass
+    def prior_sample(self, size=None, rng=None):
+        """Return a sample of all parameters from the Beta prior as an array
+        with shape `size + (1,)`; columns follow
+        `distribution_parameter_names`.
+        """
+        sample = self.prior_sample_parameter('p', size=size, rng=rng)
 
-    def prior_sample_parameter(self, parameter):
-        """Return a sample of the passed parameter from the Beta prior."""
-        pass
+        return sample[..., np.newaxis]
 
-    def posterior_mean(self, parameter):
-        """Return the posterior mean for the specified parameter."""
+    def prior_sample_parameter(self, parameter, size=None, rng=None):
+        """Return a sample of the passed parameter from the Beta prior as an
+        array with shape `size`, drawn with the `numpy.random.Generator`
+        `rng`.
+        """
         if parameter not in self:
             raise ConjugateParameterException('Parameter not recognized!')
         else:
             a = self.prior_hyperparameters['alpha']
             b = self.prior_hyperparameters['beta']
-            n = self.data['n']
-            k = self.data['k']
 
-            return (a+k)/(a+b+n)
+            return random_generator(rng).beta(a, b, size=sample_shape(size))
 
-    def posterior_sample(self):
-        """Return a sample of all parameters from the Beta posterior."""
-        pass
+    def posterior_mean(self, parameter, timestamp=None):
+        """Return the posterior mean for the specified parameter.
 
-    def posterior_sample_parameter(self, parameter):
-        """Return a sample of the passed parameter from the Beta posterior."""
-        pass
+        All posterior query methods take an optional `timestamp`: if it is
+        passed and `half_life` is set, the counts decayed to `timestamp`
+        are used, without changing the stored counts.
+        """
+        if parameter not in self:
+            raise ConjugateParameterException('Parameter not recognized!')
+        else:
+            a, b = self._posterior_hyperparameters(timestamp)
+
+            return a/(a+b)
+
+    def posterior_sample(self, size=None, rng=None, timestamp=None):
+        """Return a sample of all parameters from the Beta posterior as an
+        array with shape `size + (1,)`; columns follow
+        `distribution_parameter_names`.
+        """
+        sample = self.posterior_sample_parameter('p', size=size, rng=rng,
+                                                 timestamp=timestamp)
+
+        return sample[..., np.newaxis]
+
+    def posterior_sample_parameter(self, parameter, size=None, rng=None,
+                                   timestamp=None):
+        """Return a sample of the passed parameter from the Beta posterior as
+        an array with shape `size`, drawn with the `numpy.random.Generator`
+        `rng`.
+        """
+        if parameter not in self:
+            raise ConjugateParameterException('Parameter not recognized!')
+        else:
+            a, b = self._posterior_hyperparameters(timestamp)
+
+            return random_generator(rng).beta(a, b, size=sample_shape(size))
+
+    def posterior_predictive_logpmf(self, k, n, timestamp=None):
+        """Return the log-probability of `k` successes in `n` future attempts
+        under the Beta-Binomial posterior predictive distribution; `k` and
+        `n` are scalars or arrays that broadcast together.
+        """
+        a, b = self._posterior_hyperparameters(timestamp)
+
+        return beta_binomial_logpmf(k, n, a, b)
+
+    def posterior_predictive_pmf(self, k, n, timestamp=None):
+        """Return the probability of `k` successes in `n` future attempts
+        under the Beta-Binomial posterior predictive distribution.
+        """
+        return np.exp(self.posterior_predictive_logpmf(k, n, timestamp))
+
+    def posterior_predictive_mean(self, n, timestamp=None):
+        """Return the posterior predictive mean number of successes in `n`
+        future attempts.
+        """
+        a, b = self._posterior_hyperparameters(timestamp)
+
+        return beta_binomial_moments(n, a, b)[0]
+
+    def posterior_predictive_variance(self, n, timestamp=None):
+        """Return the posterior predictive variance of the number of
+        successes in `n` future attempts.
+        """
+        a, b = self._posterior_hyperparameters(timestamp)
+
+        return beta_binomial_moments(n, a, b)[1]
+
+    def posterior_predictive_sample(self, n, size=None, rng=None,
+                                    timestamp=None):
+        """Return a sample of the number of successes in `n` future attempts
+        from the Beta-Binomial posterior predictive distribution, shape
+        `size + np.shape(n)`.
+        """
+        rng = random_generator(rng)
+        a, b = self._posterior_hyperparameters(timestamp)
+        shape = sample_shape(size) + np.shape(n)
+
+        return rng.binomial(n, rng.beta(a, b, size=shape))
 
-    def posterior_central_credible_region(self, parameter, confidence=0.95):
+    def posterior_central_credible_region(self, parameter, confidence=0.95,
+                                          timestamp=None):
         """Return central credible region of posterior for passed parameter."""
         if parameter not in self:
             raise ConjugateParameterException('Parameter not recognized!')
         else:
-            ccr = central_credible_region(self._posterior_marginal_scipy(parameter),
-                                          confidence=confidence)
+            a, b = self._posterior_hyperparameters(timestamp)
+            ccr = credible_region_cache.region(
+                'ccr', 'beta', (a, b), confidence,
+                lambda: beta_central_credible_region(a, b, confidence))
 
             return list(ccr)
 
     def posterior_high_density_credible_region(self, parameter,
-                                               confidence=0.95):
+                                               confidence=0.95,
+                                               timestamp=None):
         """Return high-density credible region of the posterior for passed
         parameter.
         """
         if parameter not in self:
             raise ConjugateParameterException('Parameter not recognized!')
         else:
-            p = parameter
-            hdcr = high_density_credible_region(self._posterior_marginal_scipy(p),
-                                                confidence=confidence)
+            a, b = self._posterior_hyperparameters(timestamp)
+            hdcr = credible_region_cache.region(
+                'hdcr', 'beta', (a, b), confidence,
+                lambda: beta_high_density_credible_region(a, b, confidence))
 
             return list(hdcr)
 
+    def _posterior_marginal_arrays(self, timestamp=None):
+        """Return arrays with the Beta posterior hyperparameters of all
+        parameters.
+        """
+        a, b = self._posterior_hyperparameters(timestamp)
+
+        return np.array([a], dtype=np.float64), np.array([b],
+                                                         dtype=np.float64)
+
+    def posterior_means(self, timestamp=None):
+        """Return array of posterior means, aligned with
+        `distribution_parameter_names`.
+        """
+        a, b = self._posterior_marginal_arrays(timestamp)
+
+        return a/(a+b)
+
+    def posterior_variances(self, timestamp=None):
+        """Return array of posterior variances."""
+        a, b = self._posterior_marginal_arrays(timestamp)
+
+        return a*b/((a+b)**2*(a+b+1))
+
+    def posterior_modes(self, timestamp=None):
+        """Return array of posterior modes; nan when the posterior has no
+        unique mode (e.g. a uniform posterior).
+        """
+        return beta_mode(*self._posterior_marginal_arrays(timestamp))
+
+    def posterior_central_credible_regions(self, confidence=0.95,
+                                           timestamp=None):
+        """Return `(1, 2)` array with the posterior central credible
+        region.
+        """
+        a, b = self._posterior_marginal_arrays(timestamp)
+
+        return beta_central_credible_region(a, b, confidence)
+
+    def posterior_high_density_credible_regions(self, confidence=0.95,
+                                                timestamp=None):
+        """Return `(1, 2)` array with the posterior high-density credible
+        region.
+        """
+        a, b = self._posterior_marginal_arrays(timestamp)
+
+        return beta_high_density_credible_region(a, b, confidence)
+
     def plot_parameter_prior(self, parameter, **kwargs):
         """Plot the prior pdf."""
         width = kwargs.pop('width', 8)
@@ -274,7 +631,7 @@ class BinomialBeta(PosteriorBase):
         y_label = kwargs.pop('y_label', 'Prior pdf')
         x_label = kwargs.pop('x_label', 'p: Probability of success')
 
-        fig, ax = plt.subplots(1, 1, figsize=(width, height))
+        fig, ax = pyplot().subplots(1, 1, figsize=(width, height))
         self._plot_prior_pdf(parameter, ax, y_label=y_label,
                              x_label=x_label)
 
@@ -287,7 +644,7 @@ class BinomialBeta(PosteriorBase):
         y_label = kwargs.pop('y_label', 'Posterior pdf')
         x_label = kwargs.pop('x_label', 'p: Probability of success')
 
-        fig, ax = plt.subplots(1, 1, figsize=(width, height))
+        fig, ax = pyplot().subplots(1, 1, figsize=(width, height))
         self._plot_posterior_pdf(parameter, ax, y_label=y_label,
                                  x_label=x_label)
 
@@ -301,7 +658,7 @@ class BinomialBeta(PosteriorBase):
         posterior_ylabel = kwargs.pop('posterior_ylabel', 'Posterior pdf')
         x_label = kwargs.pop('x_label', 'p: Probability of success')
 
-        fig, ax = plt.subplots(2, 1, figsize=(width, height), sharex=True)
+        fig, ax = pyplot().subplots(2, 1, figsize=(width, height), sharex=True)
         self._plot_prior_pdf(parameter, ax[0], ylabel=prior_ylabel,
                              x_label=None)
         self._plot_posterior_pdf(parameter, ax[1], y_label=posterior_ylabel,
@@ -312,3 +669,467 @@ class BinomialBeta(PosteriorBase):
     def plot_summary(self, **kwargs):
         """Plot posterior pdfs for all parameters."""
         return self.plot_parameter_posterior('p', **kwargs)
+
+
+class BinomialBetaArray(six.with_metaclass(InstrumentedMeta, object)):
+    """Infer Binomial parameters :math:`p_i` for many independent
+    Binomial-Beta problems at once.  Row :math:`i` has data :math:`D_i=k_i`,
+    the *number of successes* in :math:`n_i` *attempts*, and a
+    Beta(:math:`\\alpha_i`, :math:`\\beta_i`) prior.
+
+    All state is kept in NumPy arrays of length `size` so that updates and
+    posterior summaries are computed for every row in a single call.
+    """
+
+    _distribution = 'Distribution: Binomial'
+    _prior = 'Prior: Beta'
+
+    def __init__(self, size, alpha=1, beta=1, half_life=None):
+        """Initialize an instance of the BinomialBetaArray class.
+
+        Arguments:
+        ----------
+        size: number of independent Binomial-Beta problems (rows).
+        alpha, beta: prior hyperparameters; scalars or arrays of length
+            `size`, default 1.
+        half_life: optional half-life, in the units of the timestamps passed
+            to `add_data`.  If set, the counts of each row are halved every
+            `half_life`.  Stored counts are decayed only when a row is
+            updated, so idle rows cost nothing; pass `timestamp` to the
+            posterior query methods to use counts decayed to that time.
+        """
+        size = int(size)
+        if size < 0:
+            raise ConjugateParameterException('Size must be non-negative!')
+
+        counts_dtype = np.int64 if half_life is None else np.float64
+        self._distribution_parameter_names = ['p']
+        self._distribution_parameter_support = {'p': (0.0, 1.0)}
+        self._alpha = np.ones(size, dtype=np.float64)
+        self._beta = np.ones(size, dtype=np.float64)
+        self._n = np.zeros(size, dtype=counts_dtype)
+        self._k = np.zeros(size, dtype=counts_dtype)
+
+        # exponential forgetting; time of the latest update of each row
+        self.half_life = half_life
+        self._last = None
+        if half_life is not None:
+            self._last = np.full(size, -np.inf)
+
+        self.prior_hyperparameters = {'alpha': alpha, 'beta': beta}
+
+    def __contains__(self, parameter):
+        return parameter in self._distribution_parameter_names
+
+    def __iter__(self):
+        return iter(self._distribution_parameter_names)
+
+    @classmethod
+    def _from_arrays(cls, alpha, beta, n, k, half_life=None, last=None):
+        """Return an instance using the passed 1-d arrays (e.g. views or
+        memory maps) for its state, without copying or validating them.
+        `last` holds the update times of the rows if `half_life` is set.
+        """
+        posteriors = cls(0, half_life=half_life)
+        posteriors._alpha, posteriors._beta = alpha, beta
+        posteriors._n, posteriors._k = n, k
+        posteriors._last = last
+
+        return posteriors
+
+    def __getitem__(self, index):
+        """Return row `index` as a BinomialBeta (a copy), or a
+        BinomialBetaArray over the selected rows.  Slices give views that
+        share state with this array; index arrays give copies.
+        """
+        if isinstance(index, (int, np.integer)):
+            bp = BinomialBeta(half_life=self.half_life)
+            bp.prior_hyperparameters = {'alpha': float(self._alpha[index]),
+                                        'beta': float(self._beta[index])}
+            bp._data = {'n': self._n[index].item(),
+                        'k': self._k[index].item()}
+            if self._last is not None:
+                bp._timestamp = float(self._last[index])
+
+            return bp
+
+        last = None if self._last is None else self._last[index]
+
+        return self._from_arrays(self._alpha[index], self._beta[index],
+                                 self._n[index], self._k[index],
+                                 half_life=self.half_life, last=last)
+
+    def __len__(self):
+        return self._n.shape[0]
+
+    def __str__(self):
+        prior = self.prior_hyperparameters
+        tmp = ('bp = BinomialBetaArray({})\n'
+               'bp.data = {}\n'
+               'bp.prior_hyperparameters = {}'.format(len(self), self.data,
+                                                      prior))
+
+        return tmp
+
+    def _check_parameter(self, parameter):
+        """Raise exception if passed parameter is not recognized."""
+        if parameter not in self:
+            raise ConjugateParameterException('Parameter not recognized!')
+
+    def _decayed_data(self, timestamp=None):
+        """Return arrays with the counts n, k decayed to `timestamp`, a
+        scalar or an array aligned with the rows, without changing them;
+        the stored counts if `timestamp` is None or `half_life` is not set.
+        """
+        if timestamp is None or self.half_life is None:
+            return self._n, self._k
+
+        decay = decay_weights(timestamp, self._last, self.half_life)[0]
+
+        return self._n*decay, self._k*decay
+
+    def _posterior_hyperparameters(self, timestamp=None):
+        """Return arrays with the Beta posterior hyperparameters, with counts
+        decayed to `timestamp` if it is passed.
+        """
+        n, k = self._decayed_data(timestamp)
+
+        return self._alpha + k, self._beta + n - k
+
+    @property
+    def distribution(self):
+        """Return a string with distribution name."""
+        return self._distribution
+
+    @property
+    def distribution_parameter_names(self):
+        """Return a list of parameter names for the distribution."""
+        return self._distribution_parameter_names
+
+    @property
+    def distribution_parameter_support(self):
+        """Return a dictionary with support for distribution parameter(s)."""
+        return self._distribution_parameter_support
+
+    @property
+    def prior(self):
+        """Return a string with name of prior distribution."""
+        return self._prior
+
+    @property
+    def prior_hyperparameter_names(self):
+        """Return a list of hyperparameter name(s) for the prior."""
+        return ['alpha', 'beta']
+
+    @property
+    def alpha(self):
+        """Array of prior hyperparameters :math:`\\alpha_i`."""
+        return self._alpha
+
+    @property
+    def beta(self):
+        """Array of prior hyperparameters :math:`\\beta_i`."""
+        return self._beta
+
+    @property
+    def n(self):
+        """Array with number of attempts :math:`n_i`."""
+        return self._n
+
+    @property
+    def k(self):
+        """Array with number of successes :math:`k_i`."""
+        return self._k
+
+    @property
+    def prior_hyperparameters(self):
+        """Dictionary containing the prior hyperparameter arrays."""
+        return {'alpha': self._alpha, 'beta': self._beta}
+
+    @prior_hyperparameters.setter
+    def prior_hyperparameters(self, new_setting):
+        if not isinstance(new_setting, dict):
+            raise ConjugateParameterException('Parameters must be passed '
+                                              'as a dictionary!')
+
+        if sorted(new_setting.keys()) != ['alpha', 'beta']:
+            raise ConjugateParameterException('Keys of parameter dictionary '
+                                              'must be: [alpha, beta]!')
+
+        try:
+            a = np.broadcast_to(np.asarray(new_setting['alpha'], float),
+                                self._alpha.shape)
+            b = np.broadcast_to(np.asarray(new_setting['beta'], float),
+                                self._beta.shape)
+        except ValueError:
+            raise ConjugateParameterException('Parameters alpha and beta '
+                                              'must be scalars or arrays of '
+                                              'length {}!'.format(len(self)))
+
+        if np.any(a <= 0.) or np.any(b <= 0.):
+            raise ConjugateParameterException('Parameters alpha and beta '
+                                              'must be greater than zero!')
+
+        self._alpha[...] = a
+        self._beta[...] = b
+
+    @property
+    def data(self):
+        """Dictionary containing (observed) data arrays."""
+        return {'n': self._n, 'k': self._k}
+
+    @data.setter
+    def data(self, new_data):
+        # clear current data
+        self._n[...] = 0
+        self._k[...] = 0
+        self.add_data(new_data)
+
+    def add_data(self, data, index=None, timestamp=None):
+        """Add data, passed as a dict with keys :math:`n` and :math:`k`.
+
+        Arguments:
+        ----------
+        data: dict with keys 'n' and 'k'; values are scalars or arrays.
+        index: optional integer array of rows to update; repeated rows are
+            accumulated.  By default `data` is broadcast over all rows.
+        timestamp: time of the observations, a scalar or an array aligned
+            with the updated rows; used only if `half_life` is set, default
+            now.  Only the updated rows are decayed.
+        """
+        if not isinstance(data, dict):
+            raise ConjugateDataException('Passed data is not a dictionary!')
+
+        for key in data:
+            if key not in ('n', 'k'):
+                raise ConjugateDataException('Key: {} in passed data not '
+                                             'valid!'.format(key))
+
+        n = np.asarray(data.get('n', 0))
+        k = np.asarray(data.get('k', 0))
+        if n.dtype.kind not in 'biuf' or k.dtype.kind not in 'biuf':
+            raise ConjugateDataException('Passed data is not numeric!')
+
+        if np.any(n < 0) or np.any(k < 0):
+            raise ConjugateDataException('Passed negative data!')
+
+        if np.any(k > n):
+            raise ConjugateDataException('Data has k > n -- invalid!')
+
+        if self._n.dtype.kind != 'f':
+            if np.any(n != np.floor(n)) or np.any(k != np.floor(k)):
+                raise ConjugateDataException('Passed data must be integer '
+                                             'counts!')
+
+            n = n.astype(np.int64)
+            k = k.astype(np.int64)
+
+        if index is not None:
+            index = np.asarray(index, dtype=np.intp)
+            if index.size and (index.min() < 0 or index.max() >= len(self)):
+                raise ConjugateDataException('Index out of range for {} '
+                                             'rows!'.format(len(self)))
+
+        if self.half_life is not None:
+            weight = self._decay(timestamp, index)
+            n, k = n*weight, k*weight
+
+        if index is None:
+            self._n += n
+            self._k += k
+        else:
+            np.add.at(self._n, index, n)
+            np.add.at(self._k, index, k)
+
+    def _decay(self, timestamp, index=None):
+        """Decay the counts of the rows in `index` (default: all) to
+        `timestamp` (default: now) and return the weights for data observed
+        at `timestamp`, aligned with `index`.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        rows = slice(None) if index is None else index
+        last = self._last[rows].copy()
+        timestamp = np.broadcast_to(np.asarray(timestamp, dtype=np.float64),
+                                    last.shape)
+
+        # rows repeated in index move to their latest timestamp
+        if index is None:
+            np.maximum(last, timestamp, out=self._last)
+        else:
+            np.maximum.at(self._last, index, timestamp)
+
+        latest = self._last[rows]
+        decay = decay_weights(latest, last, self.half_life)[0]
+        self._n[rows] *= decay
+        self._k[rows] *= decay
+
+        return decay_weights(latest, timestamp, self.half_life)[0]
+
+    def decay_to(self, timestamp=None, index=None):
+        """Apply exponential forgetting up to `timestamp` (default: now) to
+        the stored counts of the rows in `index` (default: all).  Does
+        nothing unless `half_life` is set.
+        """
+        if self.half_life is not None:
+            if index is not None:
+                index = np.asarray(index, dtype=np.intp)
+            self._decay(timestamp, index)
+
+    def merge(self, other):
+        """Return a new BinomialBetaArray with the data of this array and
+        `other` added row by row.  Sizes and prior hyperparameters must
+        match.  Also available as `self + other`.
+        """
+        if not isinstance(other, BinomialBetaArray):
+            raise ConjugateParameterException('Can only merge with another '
+                                              'BinomialBetaArray!')
+
+        if len(other) != len(self):
+            raise ConjugateParameterException('Sizes do not match!')
+
+        if not (np.array_equal(self._alpha, other._alpha) and
+                np.array_equal(self._beta, other._beta)):
+            raise ConjugateParameterException('Prior hyperparameters do not '
+                                              'match!')
+
+        if self.half_life != other.half_life:
+            raise ConjugateParameterException('Half-lives do not match!')
+
+        merged = type(self)(len(self), alpha=self._alpha, beta=self._beta,
+                            half_life=self.half_life)
+        if self.half_life is None:
+            np.add(self._n, other._n, out=merged._n)
+            np.add(self._k, other._k, out=merged._k)
+        else:
+            # decay both to the later update time of each row
+            for source in (self, other):
+                merged.add_data({'n': source._n, 'k': source._k},
+                                timestamp=source._last)
+
+        return merged
+
+    def __add__(self, other):
+        if not isinstance(other, BinomialBetaArray):
+            return NotImplemented
+
+        return self.merge(other)
+
+    def prior_mean(self, parameter):
+        """Return array of prior means for the specified parameter."""
+        self._check_parameter(parameter)
+
+        return self._alpha/(self._alpha + self._beta)
+
+    def prior_sample(self, size=None, rng=None):
+        """Return a sample of all parameters from the Beta priors, shape
+        `size + (len(self),)`.
+        """
+        return self.prior_sample_parameter('p', size=size, rng=rng)
+
+    def prior_sample_parameter(self, parameter, size=None, rng=None):
+        """Return a sample of the passed parameter from the Beta priors,
+        shape `size + (len(self),)`.
+        """
+        self._check_parameter(parameter)
+        shape = sample_shape(size) + self._alpha.shape
+
+        return random_generator(rng).beta(self._alpha, self._beta,
+                                          size=shape)
+
+    def posterior_mean(self, parameter, timestamp=None):
+        """Return array of posterior means for the specified parameter.
+
+        All posterior query methods take an optional `timestamp`, a scalar
+        or an array aligned with the rows: if it is passed and `half_life`
+        is set, the counts decayed to `timestamp` are used, without changing
+        the stored counts.
+        """
+        self._check_parameter(parameter)
+        a, b = self._posterior_hyperparameters(timestamp)
+
+        return a/(a + b)
+
+    def posterior_sample(self, size=None, rng=None, timestamp=None):
+        """Return a sample of all parameters from the Beta posteriors, shape
+        `size + (len(self),)`.
+        """
+        return self.posterior_sample_parameter('p', size=size, rng=rng,
+                                               timestamp=timestamp)
+
+    def posterior_sample_parameter(self, parameter, size=None, rng=None,
+                                   timestamp=None):
+        """Return a sample of the passed parameter from the Beta posteriors,
+        shape `size + (len(self),)`.
+        """
+        self._check_parameter(parameter)
+        a, b = self._posterior_hyperparameters(timestamp)
+
+        return random_generator(rng).beta(a, b,
+                                          size=sample_shape(size) + a.shape)
+
+    def posterior_predictive_logpmf(self, k, n, timestamp=None):
+        """Return the log-probabilities of `k` successes in `n` future
+        attempts under the Beta-Binomial posterior predictive distributions
+        of all rows; `k` and `n` broadcast against `(len(self),)`, e.g.
+        shape `(M, 1)` evaluates `M` outcomes for every row.
+        """
+        a, b = self._posterior_hyperparameters(timestamp)
+
+        return beta_binomial_logpmf(k, n, a, b)
+
+    def posterior_predictive_pmf(self, k, n, timestamp=None):
+        """Return the probabilities of `k` successes in `n` future attempts
+        under the Beta-Binomial posterior predictive distributions.
+        """
+        return np.exp(self.posterior_predictive_logpmf(k, n, timestamp))
+
+    def posterior_predictive_mean(self, n, timestamp=None):
+        """Return array of posterior predictive mean numbers of successes in
+        `n` future attempts.
+        """
+        a, b = self._posterior_hyperparameters(timestamp)
+
+        return beta_binomial_moments(n, a, b)[0]
+
+    def posterior_predictive_variance(self, n, timestamp=None):
+        """Return array of posterior predictive variances of the number of
+        successes in `n` future attempts.
+        """
+        a, b = self._posterior_hyperparameters(timestamp)
+
+        return beta_binomial_moments(n, a, b)[1]
+
+    def posterior_predictive_sample(self, n, size=None, rng=None,
+                                    timestamp=None):
+        """Return a sample of the numbers of successes in `n` future
+        attempts from the posterior predictive distributions of all rows,
+        shape `size + np.broadcast(n, alpha).shape`.
+        """
+        rng = random_generator(rng)
+        a, b = self._posterior_hyperparameters(timestamp)
+        shape = sample_shape(size) + np.broadcast(n, a).shape
+
+        return rng.binomial(n, rng.beta(a, b, size=shape))
+
+    def posterior_central_credible_region(self, parameter, confidence=0.95,
+                                          timestamp=None):
+        """Return central credible regions of the posteriors for passed
+        parameter as an array with shape `(len(self), 2)`.
+        """
+        self._check_parameter(parameter)
+        a, b = self._posterior_hyperparameters(timestamp)
+
+        return beta_central_credible_region(a, b, confidence=confidence)
+
+    def posterior_high_density_credible_region(self, parameter,
+                                               confidence=0.95,
+                                               timestamp=None):
+        """Return high-density credible regions of the posteriors for passed
+        parameter as an array with shape `(len(self), 2)`.
+        """
+        self._check_parameter(parameter)
+        a, b = self._posterior_hyperparameters(timestamp)
+
+        return beta_high_density_credible_region(a, b, confidence=confidence)
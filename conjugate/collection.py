@@ -0,0 +1,125 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+collection.py
+
+Thread-safe keyed collections of posteriors.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import contextlib
+import threading
+
+from .exceptions import ConjugateParameterException
+
+
+class ConcurrentPosteriors(object):
+    """One posterior per key, safe to update from many threads.
+
+    Keys are spread over `n_stripes` shards by hash, each guarded by its own
+    lock, so updates of keys in different stripes never wait on each other
+    while updates of one key are serialized and never lost.  `snapshot`
+    copies one posterior under its stripe lock; `snapshot_all` holds all
+    locks, taken in stripe order, and returns a consistent copy of every
+    posterior.  Snapshots use the `copy` method of the posteriors, which
+    copies only their count and hyperparameter arrays, so writers are held
+    up for little longer than a memory copy.
+    """
+
+    def __init__(self, factory, n_stripes=64):
+        """Initialize an instance of the ConcurrentPosteriors class.
+
+        Arguments:
+        ----------
+        factory: callable returning a new posterior, e.g. `BinomialBeta` or
+            `lambda: MultinomialDirichlet(alphabet)`; called for new keys.
+        n_stripes: number of locks/shards, default 64.
+        """
+        if int(n_stripes) <= 0:
+            raise ConjugateParameterException('Number of stripes must be '
+                                              'positive!')
+
+        self._factory = factory
+        self._locks = [threading.Lock() for _ in range(int(n_stripes))]
+        self._shards = [{} for _ in range(int(n_stripes))]
+
+    def _stripe(self, key):
+        """Return the index of the stripe holding `key`."""
+        return hash(key) % len(self._locks)
+
+    @contextlib.contextmanager
+    def _all_locks(self):
+        """Hold all stripe locks, acquired in a fixed order."""
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
+
+    def __len__(self):
+        with self._all_locks():
+            return sum(len(shard) for shard in self._shards)
+
+    def __contains__(self, key):
+        i = self._stripe(key)
+        with self._locks[i]:
+            return key in self._shards[i]
+
+    def keys(self):
+        """Return a list of the keys with data."""
+        with self._all_locks():
+            return [key for shard in self._shards for key in shard]
+
+    def update(self, key, func):
+        """Call `func(posterior)` with the posterior of `key`, created if
+        needed, while holding its stripe lock, and return the result.
+        """
+        i = self._stripe(key)
+        with self._locks[i]:
+            shard = self._shards[i]
+            posterior = shard.get(key)
+            if posterior is None:
+                posterior = shard[key] = self._factory()
+
+            return func(posterior)
+
+    def add_data(self, key, data, timestamp=None):
+        """Add data to the posterior of `key`; see the `add_data` method of
+        the posterior.
+        """
+        self.update(key, lambda p: p.add_data(data, timestamp=timestamp))
+
+    def snapshot(self, key):
+        """Return a copy of the posterior of `key`; keys without data give
+        a new posterior holding only the prior.
+        """
+        i = self._stripe(key)
+        with self._locks[i]:
+            posterior = self._shards[i].get(key)
+            if posterior is not None:
+                return posterior.copy()
+
+        return self._factory()
+
+    def snapshot_all(self):
+        """Return a dict with copies of all posteriors, taken at a single
+        point in time.
+        """
+        with self._all_locks():
+            return {key: posterior.copy()
+                    for shard in self._shards
+                    for key, posterior in shard.items()}
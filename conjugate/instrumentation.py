@@ -0,0 +1,186 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+instrumentation.py
+
+Opt-in call counters and latency statistics for the hot paths of the
+package: the public methods of all posterior classes, the scipy
+frozen-distribution builders, plotting and the functions in
+`conjugate.utilities`.
+
+Instrumentation is off by default; a disabled wrapper only checks one
+module-level flag before calling through.  Typical use::
+
+    from conjugate import instrumentation
+
+    with instrumentation.instrumented() as stats:
+        refresh_dashboard()
+
+    print(stats['MultinomialDirichlet.posterior_high_density_credible_region'])
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import abc
+import contextlib
+import functools
+import inspect
+import time
+from collections import deque
+
+import numpy as np
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+# number of most recent latencies kept per name for percentiles
+SAMPLE_SIZE = 4096
+
+_enabled = False
+_stats = {}
+
+
+class _CallStats(object):
+    """Call count, cumulative time and recent latencies for one name."""
+
+    __slots__ = ('calls', 'total', 'max', 'samples')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.
+        self.max = 0.
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+
+    def add(self, elapsed):
+        self.calls += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        self.samples.append(elapsed)
+
+    def summary(self):
+        p50, p90, p99 = np.percentile(list(self.samples), [50, 90, 99])
+
+        return {'calls': self.calls, 'total': self.total,
+                'mean': self.total/self.calls, 'p50': float(p50),
+                'p90': float(p90), 'p99': float(p99), 'max': self.max}
+
+
+def _record(name, elapsed):
+    """Record one call of `name` taking `elapsed` seconds."""
+    try:
+        stats = _stats[name]
+    except KeyError:
+        stats = _stats.setdefault(name, _CallStats())
+
+    stats.add(elapsed)
+
+
+def enable():
+    """Start recording calls of instrumented functions."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Stop recording calls; recorded statistics are kept."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    """Return True if instrumentation is recording."""
+    return _enabled
+
+
+def reset():
+    """Discard all recorded statistics."""
+    _stats.clear()
+
+
+def snapshot():
+    """Return a dict keyed by instrumented name with the number of calls,
+    cumulative ('total'), mean, 50/90/99th percentile and max latencies in
+    seconds.  Percentiles use the most recent `SAMPLE_SIZE` calls.
+    """
+    return {name: stats.summary() for name, stats in list(_stats.items())
+            if stats.calls > 0}
+
+
+@contextlib.contextmanager
+def instrumented(clear=True):
+    """Context manager that records calls inside the `with` block.
+
+    Yields a dict that is filled with the `snapshot()` when the block
+    exits.  The previous enabled/disabled state is restored on exit.
+
+    Arguments:
+    ----------
+    clear: discard previously recorded statistics on entry, default True.
+    """
+    previous = _enabled
+    if clear:
+        reset()
+
+    stats = {}
+    enable()
+    try:
+        yield stats
+    finally:
+        if not previous:
+            disable()
+        stats.update(snapshot())
+
+
+def instrument(name):
+    """Decorator recording calls of the wrapped function under `name`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            start = _clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(name, _clock() - start)
+
+        return wrapper
+
+    return decorator
+
+
+class InstrumentedMeta(abc.ABCMeta):
+    """Metaclass that instruments the public methods of a class, and the
+    private methods listed in its `_instrumented_methods` attribute, under
+    the names `'<class>.<method>'`.  Abstract methods are left alone.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        extra = set(namespace.get('_instrumented_methods', ()))
+        for base in bases:
+            extra.update(getattr(base, '_instrumented_methods', ()))
+
+        for attr, value in list(namespace.items()):
+            if not inspect.isfunction(value):
+                continue
+            if getattr(value, '__isabstractmethod__', False):
+                continue
+            if attr.startswith('_') and attr not in extra:
+                continue
+
+            namespace[attr] = instrument('{}.{}'.format(name, attr))(value)
+
+        return super(InstrumentedMeta, mcs).__new__(mcs, name, bases,
+                                                    namespace)
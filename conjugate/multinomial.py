@@ -19,11 +19,15 @@ from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
                              input, int, map, next, oct, open, pow, range,
                              round, str, super, zip)
 
+import copy
+import time
+
+try:
+    from collections.abc import Mapping, MutableMapping
+except ImportError:  # Python 2
+    from collections import Mapping, MutableMapping
+
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.gridspec as gridspec
-from scipy.stats import beta as _scipy_beta
-from numpy.random import multinomial as _np_multinomial
 
 from .abstract import PosteriorBase
 
@@ -31,9 +35,74 @@ from .exceptions import ConjugateDataException
 from .exceptions import ConjugateParameterException
 
 from .plots import plot_parameter_pdf
+from .plots import pyplot
+
+from .sampling import dirichlet_sample_chunks
+
+from .utilities import beta_central_credible_region
+from .utilities import beta_high_density_credible_region
+from .utilities import beta_mode
+from .utilities import credible_region_cache
+from .utilities import decay_weights
+from .utilities import dirichlet_multinomial_logpmf
+from .utilities import dirichlet_multinomial_moments
+from .utilities import dirichlet_sample
+from .utilities import random_generator
+from .utilities import sample_shape
+
+
+def _read_only(arr):
+    """Return a read-only view of the passed array."""
+    view = arr.view()
+    view.flags.writeable = False
+
+    return view
+
+
+class _ArrayDictView(MutableMapping):
+    """Live dict view of the prior hyperparameters or the counts of a
+    MultinomialDirichlet.  Reads come from, and writes go through to, the
+    arrays of the posterior, keeping its totals up to date.
+    """
+
+    def __init__(self, posterior, names, index, hyperparameters=False):
+        self._posterior = posterior
+        self._names = names
+        self._index = index
+        self._hyperparameters = hyperparameters
+
+    def _array(self):
+        if self._hyperparameters:
+            return self._posterior._alpha
+
+        return self._posterior._counts
+
+    def __getitem__(self, key):
+        return self._array()[self._index[key]].item()
+
+    def __setitem__(self, key, value):
+        if self._hyperparameters:
+            self._posterior.prior_hyperparameters = {key: value}
+        else:
+            self._posterior._set_count(key, value)
+
+    def __delitem__(self, key):
+        raise TypeError('Keys cannot be removed!')
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, key):
+        try:
+            return key in self._index
+        except TypeError:
+            return False
 
-from .utilities import central_credible_region
-from .utilities import high_density_credible_region
+    def __repr__(self):
+        return repr(dict(self))
 
 
 class MultinomialDirichlet(PosteriorBase):
@@ -45,27 +114,67 @@ class MultinomialDirichlet(PosteriorBase):
     _distribution = 'Distribution: Multinomial'
     _prior = 'Prior: Dirichlet'
 
-    def __init__(self, alphabet):
+    def __init__(self, alphabet, half_life=None):
         """Initialize an instance of the MultinomialPosterior class.
 
         Arguments:
         ---------
         alphabet: the types of observations; ideally, a list of strings.
+        half_life: optional half-life, in the units of the timestamps passed
+            to `add_data`.  If set, existing counts are halved every
+            `half_life` so that the posterior relaxes toward the prior.
+            Stored counts are decayed when data is added; pass `timestamp`
+            to the posterior query methods to use counts decayed to that
+            time without changing them.
         """
         self.alphabet = [str(i) for i in alphabet]
+        self._index = {i: n for n, i in enumerate(self.alphabet)}
         self._distribution_parameter_names = \
             [str('p_{}'.format(i)) for i in self.alphabet]
 
+        # parameter name -> (symbol, position); symbols may contain '_'
+        self._parameter_index = \
+            {p: (i, n) for n, (p, i) in
+             enumerate(zip(self._distribution_parameter_names,
+                           self.alphabet))}
+
         self._distribution_parameter_support = \
             {str(p): (0.0, 1.0) for p in self._distribution_parameter_names}
 
-        self._prior_hyperparameters = \
-            {str('a_{}'.format(i)): 1 for i in self.alphabet}
+        self._hyperparameter_names = \
+            [str('a_{}'.format(i)) for i in self.alphabet]
+
+        self._hyperparameter_index = \
+            {a: n for n, a in enumerate(self._hyperparameter_names)}
+
+        # hyperparameters and counts, aligned with self.alphabet
+        self._alpha = np.ones(len(self.alphabet), dtype=np.float64)
+        self._counts = np.zeros(len(self.alphabet),
+                                dtype=np.int64 if half_life is None
+                                else np.float64)
+
+        # exponential forgetting; time of the latest update
+        self.half_life = half_life
+        self._timestamp = -np.inf
+
+        # totals A = sum(alpha) and N = sum(counts), kept up to date by the
+        # setters and add_* methods
+        self._A = float(len(self.alphabet))
+        self._N = 0
+
+        # tables for encoding raw symbols, built on first use
+        self._lookup = None
 
-        self._data = {i: 0 for i in self.alphabet}
+        # frozen scipy distributions and the hyperparameters they were
+        # built from, cleared by _invalidate
+        self._scipy_cache = {}
 
     def __contains__(self, parameter):
-        return parameter in self._distribution_parameter_names
+        try:
+            return parameter in self._parameter_index
+        except TypeError:
+            # unhashable, so not a parameter name
+            return False
 
     def __iter__(self):
         return iter(self._distribution_parameter_names)
@@ -80,23 +189,70 @@ class MultinomialDirichlet(PosteriorBase):
 
         return tmp
 
+    def _with_arrays(self, alpha, counts):
+        """Return a shallow copy that shares the alphabet and name indexes of
+        this posterior but uses the passed arrays (e.g. views or memory
+        maps) for its hyperparameters and counts, without copying them.
+        """
+        mp = copy.copy(self)
+        mp._alpha = alpha
+        mp._counts = counts
+        mp._A = float(alpha.sum())
+        mp._N = counts.sum()
+        mp._scipy_cache = {}
+
+        return mp
+
+    def _parameter_position(self, parameter):
+        """Return position of passed parameter in the alphabet arrays."""
+        return self._parameter_index[parameter][1]
+
+    def _decayed_counts(self, timestamp=None):
+        """Return the counts and their total decayed to `timestamp` without
+        changing them; the stored counts if `timestamp` is None or
+        `half_life` is not set.
+        """
+        if timestamp is None or self.half_life is None:
+            return self._counts, self._N
+
+        decay = float(decay_weights(timestamp, self._timestamp,
+                                    self.half_life)[0])
+
+        return self._counts*decay, self._N*decay
+
+    def _posterior_marginal_hyperparameters(self, parameter, timestamp=None):
+        """Return hyperparameters of the (marginal) Beta posterior for passed
+        parameter, with counts decayed to `timestamp` if it is passed.
+        """
+        i = self._parameter_position(parameter)
+        A = self._A
+        ai = self._alpha[i]
+        N = self._N
+        ni = self._counts[i]
+        if timestamp is not None and self.half_life is not None:
+            decay = float(decay_weights(timestamp, self._timestamp,
+                                        self.half_life)[0])
+            N, ni = N*decay, ni*decay
+
+        return ai+ni, A-ai+N-ni
+
     def _posterior_marginal_scipy(self, parameter):
         """Return the scipy (marginal) posterior for passed parameter."""
-        letter = parameter.strip().split('_')[1]
-        A = sum(self._prior_hyperparameters.values())
-        ai = self.prior_hyperparameters['a_{}'.format(letter)]
-        N = sum(self._data.values())
-        ni = self._data[letter]
+        from scipy.stats import beta
 
-        return _scipy_beta(ai+ni, A-ai+N-ni)
+        return self._cached_scipy(
+            ('posterior', parameter),
+            self._posterior_marginal_hyperparameters(parameter), beta)
 
     def _prior_marginal_scipy(self, parameter):
         """Return the scipy (marginal) prior for passed parameter."""
-        letter = parameter.strip().split('_')[1]
-        A = sum(self._prior_hyperparameters.values())
-        ai = self.prior_hyperparameters['a_{}'.format(letter)]
+        from scipy.stats import beta
 
-        return _scipy_beta(ai, A-ai)
+        i = self._parameter_position(parameter)
+        A = self._A
+        ai = self._alpha[i]
+
+        return self._cached_scipy(('prior', parameter), (ai, A-ai), beta)
 
     def _plot_prior_pdf(self, parameter, ax, **kwargs):
         """Plot parameter prior pdf using passed matplotlib ax."""
@@ -127,7 +283,7 @@ class MultinomialDirichlet(PosteriorBase):
         posterior = self._posterior_marginal_scipy(parameter)
         posterior_mean = self.posterior_mean(parameter)
 
-        N = sum(self.data.values())
+        N = self._N
         if N > 0:
             fill_type = 'hdcr'
             hdcr = self.posterior_high_density_credible_region
@@ -160,126 +316,554 @@ class MultinomialDirichlet(PosteriorBase):
 
     @property
     def prior_hyperparameter_names(self):
-        return super().prior_hyperparameter_names
+        """Return a list of hyperparameter name(s) for the prior."""
+        return sorted(self._hyperparameter_names)
 
     @property
     def prior_hyperparameters(self):
-        return super().prior_hyperparameters
+        """Dictionary-like view of the prior hyperparameters; assigning to
+        a key updates the posterior.
+        """
+        return _ArrayDictView(self, self._hyperparameter_names,
+                              self._hyperparameter_index,
+                              hyperparameters=True)
 
     @prior_hyperparameters.setter
     def prior_hyperparameters(self, new_setting):
-        if not isinstance(new_setting, dict):
+        if not isinstance(new_setting, Mapping):
             msg = 'Hyperparameters must passed as a dictionary!'
             raise ConjugateParameterException(msg)
 
         for ai in new_setting:
-            if ai in self._prior_hyperparameters:
-                if new_setting[ai] > 0.:
-                    self._prior_hyperparameters[ai] = new_setting[ai]
-                else:
-                    msg = 'Hyperparameters must be greater than zero!'
-                    raise ConjugateParameterException(msg)
-            else:
+            if ai not in self._hyperparameter_index:
                 msg = 'Invalid hyperparameter: {}!'.format(ai)
                 raise ConjugateParameterException(msg)
 
+        if not new_setting:
+            return
+
+        idx = [self._hyperparameter_index[ai] for ai in new_setting]
+        vals = np.asarray(list(new_setting.values()), dtype=np.float64)
+        if np.any(vals <= 0.):
+            msg = 'Hyperparameters must be greater than zero!'
+            raise ConjugateParameterException(msg)
+
+        self._invalidate()
+        self._A += vals.sum() - self._alpha[idx].sum()
+        self._alpha[idx] = vals
+
+    @property
+    def alpha(self):
+        """Read-only array of prior hyperparameters, aligned with the
+        alphabet.
+        """
+        return _read_only(self._alpha)
+
+    @property
+    def counts(self):
+        """Read-only array of observed counts, aligned with the alphabet."""
+        return _read_only(self._counts)
+
     @property
     def data(self):
-        return super().data
+        """Dictionary-like view of the (observed) data; assigning to a key
+        updates the posterior.
+        """
+        return _ArrayDictView(self, self.alphabet, self._index)
 
     @data.setter
     def data(self, new_data):
+        if isinstance(new_data, Mapping):
+            # may be a view of this posterior's counts
+            new_data = dict(new_data)
+
         # clear current data
-        for i in self.alphabet:
-            self._data[i] = 0
+        self._invalidate()
+        self._counts[...] = 0
+        self._N = 0
 
         self.add_data(new_data)
 
-    def add_data(self, data):
-        """Add data, passed as list of 0's and 1's--- or as a dict with keys
-        :math:`n` and :math:`k`."""
-        if isinstance(data, dict):
-            for i in data:
-                if i in self.alphabet:
-                    if data[i] >= 0:
-                        self._data[i] += data[i]
-                    else:
-                        raise ConjugateDataException('Passed neagtive data!')
-                else:
-                    raise ConjugateDataException('Passed data has key not '
-                                                 'found in alphabet: '
-                                                 '{}!'.format(i))
-        else:
+    def _set_count(self, symbol, value):
+        """Set the count of `symbol` to `value`, keeping the total."""
+        if symbol not in self._index:
+            raise ConjugateDataException('Passed data has key not found in '
+                                         'alphabet: {}!'.format(symbol))
+
+        value = np.asarray(value)
+        if value.ndim != 0 or value.dtype.kind not in 'biuf':
+            raise ConjugateDataException('Passed data is not a number!')
+
+        if value < 0:
+            raise ConjugateDataException('Passed neagtive data!')
+
+        self._invalidate()
+        if value.dtype.kind == 'f' and self._counts.dtype.kind != 'f':
+            # allow fractional counts
+            self._counts = self._counts.astype(np.float64)
+
+        i = self._index[symbol]
+        self._N += value.item() - self._counts[i].item()
+        self._counts[i] = value
+
+    def _decay(self, timestamp):
+        """Decay the counts to `timestamp` (default: now) and return the
+        weight for data observed at `timestamp`.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        decay, weight = decay_weights(timestamp, self._timestamp,
+                                      self.half_life)
+        self._invalidate()
+        if self._counts.dtype.kind != 'f':
+            self._counts = self._counts.astype(np.float64)
+
+        self._counts *= decay
+        self._N *= float(decay)
+        self._timestamp = max(self._timestamp, timestamp)
+
+        return float(weight)
+
+    def decay_to(self, timestamp=None):
+        """Apply exponential forgetting to the stored counts up to
+        `timestamp` (default: now).  Does nothing unless `half_life` is
+        set.
+        """
+        if self.half_life is not None:
+            self._decay(timestamp)
+
+    def add_data(self, data, timestamp=None):
+        """Add data, passed as a dict with alphabet symbols as keys and
+        counts as values.
+
+        If `half_life` is set, the existing counts are first decayed to
+        `timestamp` (default: now); data older than the latest update is
+        down-weighted instead.
+        """
+        if not isinstance(data, Mapping):
             raise ConjugateDataException('Passed data is not a dict!')
 
+        for i in data:
+            if i not in self._index:
+                raise ConjugateDataException('Passed data has key not '
+                                             'found in alphabet: '
+                                             '{}!'.format(i))
+
+        if not data:
+            return
+
+        idx = [self._index[i] for i in data]
+        vals = np.asarray(list(data.values()))
+        if np.any(vals < 0):
+            raise ConjugateDataException('Passed neagtive data!')
+
+        if self.half_life is not None:
+            vals = vals*self._decay(timestamp)
+
+        self._invalidate()
+        if vals.dtype.kind == 'f' and self._counts.dtype.kind != 'f':
+            # allow fractional counts
+            self._counts = self._counts.astype(np.float64)
+
+        self._counts[idx] += vals
+        self._N += vals.sum()
+
+    def _symbol_lookup(self):
+        """Return (and cache) sorted lookup tables used to encode raw
+        symbols: sorted alphabet strings, integer-valued symbols and a
+        256-entry byte table, each with the matching alphabet positions.
+        """
+        if self._lookup is None:
+            symbols = np.array(self.alphabet, dtype=np.str_)
+            order = np.argsort(symbols, kind='mergesort')
+
+            int_keys = []
+            int_pos = []
+            byte_table = np.full(256, -1, dtype=np.intp)
+            for n, i in enumerate(self.alphabet):
+                try:
+                    if str(int(i)) == i:
+                        int_keys.append(int(i))
+                        int_pos.append(n)
+                except ValueError:
+                    pass
+
+                if len(i) == 1 and ord(i) < 256:
+                    byte_table[ord(i)] = n
+
+            int_keys = np.array(int_keys, dtype=np.int64)
+            int_order = np.argsort(int_keys, kind='mergesort')
+
+            int_pos = np.array(int_pos, dtype=np.intp)
+            self._lookup = {'symbols': symbols[order], 'positions': order,
+                            'int_keys': int_keys[int_order],
+                            'int_positions': int_pos[int_order],
+                            'bytes': byte_table}
+
+        return self._lookup
+
+    def _encode_values(self, values, keys, positions):
+        """Return alphabet positions of the distinct `values` using the
+        sorted `keys` table, raising an exception for unknown values.
+        """
+        where = np.searchsorted(keys, values)
+        valid = where < keys.shape[0]
+        valid[valid] = keys[where[valid]] == values[valid]
+
+        if not np.all(valid):
+            bad = ', '.join(str(v) for v in values[~valid][:5])
+            raise ConjugateDataException('Passed data has symbol(s) not '
+                                         'found in alphabet: {}!'.format(bad))
+
+        return positions[where]
+
+    def sequence_counts(self, symbols):
+        """Return an array of counts, aligned with the alphabet, for a raw
+        sequence of symbols.
+
+        Symbols are counted with `np.bincount` (bytes, small non-negative
+        integers) or `np.unique` and mapped to the alphabet through sorted
+        lookup tables, so validation is done once per distinct symbol.
+
+        Arguments:
+        ----------
+        symbols: list or iterable of symbols, NumPy integer or string array,
+            or `bytes`/`bytearray`/`memoryview`.  Each byte of a bytes-like
+            object is the one-character symbol `chr(byte)`, e.g. `b'ACGT'`
+            for the alphabet `['A', 'C', 'G', 'T']`.  Integer symbols match
+            the alphabet entries `str(integer)`.
+        """
+        lookup = self._symbol_lookup()
+        counts = np.zeros(len(self.alphabet), dtype=np.int64)
+
+        if isinstance(symbols, memoryview) and symbols.itemsize != 1:
+            symbols = np.asarray(symbols)
+
+        if isinstance(symbols, (bytes, bytearray, memoryview)):
+            freq = np.bincount(np.frombuffer(symbols, dtype=np.uint8),
+                               minlength=256)
+            present = np.nonzero(freq)[0]
+            pos = lookup['bytes'][present]
+            if np.any(pos < 0):
+                bad = ', '.join(repr(chr(v)) for v in present[pos < 0][:5])
+                raise ConjugateDataException('Passed data has symbol(s) not '
+                                             'found in alphabet: '
+                                             '{}!'.format(bad))
+            counts[pos] = freq[present]
+
+            return counts
+
+        if not isinstance(symbols, np.ndarray):
+            symbols = np.asarray(list(symbols))
+
+        symbols = symbols.reshape(-1)
+        if symbols.shape[0] == 0:
+            return counts
+
+        if symbols.dtype.kind in 'iu':
+            lo, hi = symbols.min(), symbols.max()
+            if lo >= 0 and hi < 4*(symbols.shape[0] + counts.shape[0]):
+                freq = np.bincount(symbols, minlength=0)
+                values = np.nonzero(freq)[0]
+                freq = freq[values]
+            else:
+                values, freq = np.unique(symbols, return_counts=True)
+            pos = self._encode_values(values.astype(np.int64),
+                                      lookup['int_keys'],
+                                      lookup['int_positions'])
+        else:
+            if symbols.dtype.kind != 'U':
+                symbols = symbols.astype(np.str_)
+            values, freq = np.unique(symbols, return_counts=True)
+            pos = self._encode_values(values, lookup['symbols'],
+                                      lookup['positions'])
+
+        counts[pos] = freq
+
+        return counts
+
+    def add_sequence(self, symbols, timestamp=None):
+        """Add data passed as a raw sequence of symbols, e.g. a tokenized
+        stream.  See `sequence_counts` for the accepted types and
+        `add_data` for `timestamp`.
+        """
+        counts = self.sequence_counts(symbols)
+        if self.half_life is not None:
+            counts = counts*self._decay(timestamp)
+        elif self._counts.dtype.kind == 'f':
+            counts = counts.astype(np.float64)
+
+        self._invalidate()
+        self._counts += counts
+        self._N += counts.sum()
+
+    def copy(self):
+        """Return an independent copy of this posterior.  Only the
+        hyperparameter and count arrays are copied; the alphabet, name
+        indexes and symbol lookup tables, which never change, are shared.
+        """
+        return self._with_arrays(self._alpha.copy(), self._counts.copy())
+
+    def merge(self, other):
+        """Return a new MultinomialDirichlet with the data of this posterior
+        and `other` added together.  Alphabets and prior hyperparameters
+        must match; the prior is counted once.  Also available as
+        `self + other`.
+        """
+        if not isinstance(other, MultinomialDirichlet):
+            raise ConjugateParameterException('Can only merge with another '
+                                              'MultinomialDirichlet!')
+
+        if other.alphabet != self.alphabet:
+            raise ConjugateParameterException('Alphabets do not match!')
+
+        if not np.array_equal(other._alpha, self._alpha):
+            raise ConjugateParameterException('Prior hyperparameters do not '
+                                              'match!')
+
+        if self.half_life != other.half_life:
+            raise ConjugateParameterException('Half-lives do not match!')
+
+        merged = type(self)(self.alphabet, half_life=self.half_life)
+        merged._alpha[...] = self._alpha
+        merged._A = self._A
+        if self.half_life is None:
+            merged._counts = self._counts + other._counts
+        else:
+            # decay both to the later of the two update times
+            last = max(self._timestamp, other._timestamp)
+            merged._timestamp = last
+            merged._counts = sum(
+                source._counts*decay_weights(last, source._timestamp,
+                                             self.half_life)[0]
+                for source in (self, other))
+
+        merged._N = merged._counts.sum()
+
+        return merged
+
     def prior_mean(self, parameter):
         """Return the prior mean for the specified parameter."""
         if parameter not in self:
             raise ConjugateParameterException('Parameter not recognized!')
         else:
-            i = parameter.split('_')[1]
-            ai = self.prior_hyperparameters['a_{}'.format(i)]
-            A = sum(self.prior_hyperparameters.values())
+            i = self._parameter_position(parameter)
+
+            return self._alpha[i]/self._A
 
-            return ai/A
+    def prior_sample(self, size=None, rng=None):
+        """Return a sample of all parameters from the Dirichlet prior as an
+        array with shape `size + (K,)`; columns follow
+        `distribution_parameter_names`.
+        """
+        return dirichlet_sample(self._alpha, size=size, rng=rng)
 
-    def prior_sample(self):
-        """Return a sample of all parameters from the Dirichlet prior."""
-        pass
+    def prior_sample_chunks(self, n_samples, chunk_size=1024, rng=None):
+        """Generate `n_samples` draws from the Dirichlet prior in blocks of
+        at most `chunk_size` rows, reusing one preallocated buffer.
+        """
+        return dirichlet_sample_chunks(self._alpha, n_samples,
+                                       chunk_size=chunk_size, rng=rng)
 
-    def prior_sample_parameter(self, parameter):
+    def prior_sample_parameter(self, parameter, size=None, rng=None):
         """Return a sample of the passed parameter from the (marginal) Beta
-        prior.
+        prior as an array with shape `size`.
         """
-        pass
+        if parameter not in self:
+            raise ConjugateParameterException('Parameter not recognized!')
+        else:
+            i = self._parameter_position(parameter)
+            ai = self._alpha[i]
+            A = self._A
+
+            return random_generator(rng).beta(ai, A-ai,
+                                              size=sample_shape(size))
 
-    def posterior_mean(self, parameter):
-        """Return the posterior mean for the specified parameter."""
+    def posterior_mean(self, parameter, timestamp=None):
+        """Return the posterior mean for the specified parameter.
+
+        All posterior query methods take an optional `timestamp`: if it is
+        passed and `half_life` is set, the counts decayed to `timestamp`
+        are used, without changing the stored counts.
+        """
         if parameter not in self:
             raise ConjugateParameterException('Parameter not recognized!')
         else:
-            i = parameter.split('_')[1]
-            ai = self.prior_hyperparameters['a_{}'.format(i)]
-            A = sum(self.prior_hyperparameters.values())
-            ni = self.data[i]
-            N = sum(self.data.values())
+            a, b = self._posterior_marginal_hyperparameters(parameter,
+                                                            timestamp)
+
+            return a/(a+b)
+
+    def _posterior_alpha(self, timestamp=None):
+        """Return the Dirichlet posterior hyperparameters."""
+        return self._alpha + self._decayed_counts(timestamp)[0]
 
-            return (ai+ni)/(A+N)
+    def posterior_sample(self, size=None, rng=None, timestamp=None):
+        """Return a sample of all parameters from the Dirichlet posterior as
+        an array with shape `size + (K,)`; columns follow
+        `distribution_parameter_names`.
+        """
+        return dirichlet_sample(self._posterior_alpha(timestamp), size=size,
+                                rng=rng)
+
+    def posterior_sample_chunks(self, n_samples, chunk_size=1024, rng=None,
+                                timestamp=None):
+        """Generate `n_samples` draws from the Dirichlet posterior in blocks
+        of at most `chunk_size` rows, reusing one preallocated buffer.  See
+        `conjugate.sampling.dirichlet_sample_chunks`; combine with the
+        reducers in `conjugate.sampling` for bounded-memory summaries.
+        """
+        return dirichlet_sample_chunks(self._posterior_alpha(timestamp),
+                                       n_samples, chunk_size=chunk_size,
+                                       rng=rng)
+
+    def posterior_predictive_logpmf(self, counts, timestamp=None):
+        """Return the log-probability of future counts under the
+        Dirichlet-Multinomial posterior predictive distribution.
+
+        Arguments:
+        ----------
+        counts: array with shape `(..., K)` of counts aligned with
+            `alphabet`; each row is one outcome of `sum(counts)` future
+            observations.
+
+        Returns:
+        --------
+        logpmf: array with shape `counts.shape[:-1]`.
+        """
+        counts = np.asarray(counts)
+        if counts.shape[-1:] != self._alpha.shape:
+            raise ConjugateDataException('Counts must have one column per '
+                                         'symbol!')
+
+        return dirichlet_multinomial_logpmf(counts,
+                                            self._posterior_alpha(timestamp))
+
+    def posterior_predictive_pmf(self, counts, timestamp=None):
+        """Return the probability of future counts, shape `(..., K)`, under
+        the Dirichlet-Multinomial posterior predictive distribution.
+        """
+        return np.exp(self.posterior_predictive_logpmf(counts, timestamp))
 
-    def posterior_sample(self):
-        """Return a sample of all parameters from the Dirichlet posterior."""
-        pass
+    def posterior_predictive_mean(self, n, timestamp=None):
+        """Return the posterior predictive mean counts of each symbol in `n`
+        future observations, shape `np.shape(n) + (K,)`.
+        """
+        return dirichlet_multinomial_moments(
+            n, self._posterior_alpha(timestamp))[0]
+
+    def posterior_predictive_variance(self, n, timestamp=None):
+        """Return the posterior predictive variances of the counts of each
+        symbol in `n` future observations, shape `np.shape(n) + (K,)`.
+        """
+        return dirichlet_multinomial_moments(
+            n, self._posterior_alpha(timestamp))[1]
+
+    def posterior_predictive_sample(self, n, size=None, rng=None,
+                                    timestamp=None):
+        """Return a sample of the counts of each symbol in `n` future
+        observations from the Dirichlet-Multinomial posterior predictive
+        distribution, shape `size + np.shape(n) + (K,)`.
+        """
+        rng = random_generator(rng)
+        shape = sample_shape(size) + np.shape(n)
+        p = dirichlet_sample(self._posterior_alpha(timestamp), size=shape,
+                             rng=rng)
+
+        return rng.multinomial(n, p)
 
-    def posterior_sample_parameter(self, parameter):
+    def posterior_sample_parameter(self, parameter, size=None, rng=None,
+                                   timestamp=None):
         """Return a sample of the passed parameter from the (marginal) Beta
-        posterior.
+        posterior as an array with shape `size`.
         """
-        pass
+        if parameter not in self:
+            raise ConjugateParameterException('Parameter not recognized!')
+        else:
+            a, b = self._posterior_marginal_hyperparameters(parameter,
+                                                            timestamp)
+
+            return random_generator(rng).beta(a, b, size=sample_shape(size))
 
-    def posterior_central_credible_region(self, parameter, confidence=0.95):
+    def posterior_central_credible_region(self, parameter, confidence=0.95,
+                                          timestamp=None):
         """Return central credible region of posterior for passed parameter."""
         if parameter not in self:
             raise ConjugateParameterException('Parameter not recognized!')
         else:
-            ccr = central_credible_region(self._posterior_marginal_scipy(parameter),
-                                          confidence=confidence)
+            a, b = self._posterior_marginal_hyperparameters(parameter,
+                                                            timestamp)
+            ccr = credible_region_cache.region(
+                'ccr', 'beta', (a, b), confidence,
+                lambda: beta_central_credible_region(a, b, confidence))
 
             return list(ccr)
 
     def posterior_high_density_credible_region(self, parameter,
-                                               confidence=0.95):
+                                               confidence=0.95,
+                                               timestamp=None):
         """Return high-density credible region of the posterior for passed
         parameter.
         """
         if parameter not in self:
             raise ConjugateParameterException('Parameter not recognized!')
         else:
-            p = parameter
-            hdcr = high_density_credible_region(self._posterior_marginal_scipy(p),
-                                                confidence=confidence)
+            a, b = self._posterior_marginal_hyperparameters(parameter,
+                                                            timestamp)
+            hdcr = credible_region_cache.region(
+                'hdcr', 'beta', (a, b), confidence,
+                lambda: beta_high_density_credible_region(a, b, confidence))
 
             return list(hdcr)
 
+    def _posterior_marginal_arrays(self, timestamp=None):
+        """Return arrays with the hyperparameters of the (marginal) Beta
+        posteriors of all parameters, aligned with the alphabet.
+        """
+        counts, N = self._decayed_counts(timestamp)
+        a = self._alpha + counts
+
+        return a, (self._A + N) - a
+
+    def posterior_means(self, timestamp=None):
+        """Return array of posterior means, aligned with
+        `distribution_parameter_names`.
+        """
+        counts, N = self._decayed_counts(timestamp)
+
+        return (self._alpha + counts)/(self._A + N)
+
+    def posterior_variances(self, timestamp=None):
+        """Return array of (marginal) posterior variances."""
+        a, b = self._posterior_marginal_arrays(timestamp)
+
+        return a*b/((a+b)**2*(a+b+1))
+
+    def posterior_modes(self, timestamp=None):
+        """Return array with the modes of the (marginal) Beta posteriors;
+        nan where a marginal has no unique mode.
+        """
+        return beta_mode(*self._posterior_marginal_arrays(timestamp))
+
+    def posterior_central_credible_regions(self, confidence=0.95,
+                                           timestamp=None):
+        """Return `(K, 2)` array with the central credible regions of the
+        (marginal) posteriors of all parameters.
+        """
+        a, b = self._posterior_marginal_arrays(timestamp)
+
+        return beta_central_credible_region(a, b, confidence)
+
+    def posterior_high_density_credible_regions(self, confidence=0.95,
+                                                timestamp=None):
+        """Return `(K, 2)` array with the high-density credible regions of
+        the (marginal) posteriors of all parameters.
+        """
+        a, b = self._posterior_marginal_arrays(timestamp)
+
+        return beta_high_density_credible_region(a, b, confidence)
+
     def plot_parameter_prior(self, parameter, **kwargs):
         """Plot the prior pdf."""
         width = kwargs.pop('width', 8)
@@ -287,7 +871,7 @@ class MultinomialDirichlet(PosteriorBase):
         y_label = kwargs.pop('y_label', 'Prior pdf')
         x_label = kwargs.pop('x_label', parameter)
 
-        fig, ax = plt.subplots(1, 1, figsize=(width, height))
+        fig, ax = pyplot().subplots(1, 1, figsize=(width, height))
         self._plot_prior_pdf(parameter, ax, y_label=y_label,
                              x_label=x_label)
 
@@ -300,7 +884,7 @@ class MultinomialDirichlet(PosteriorBase):
         y_label = kwargs.pop('y_label', 'Posterior pdf')
         x_label = kwargs.pop('x_label', parameter)
 
-        fig, ax = plt.subplots(1, 1, figsize=(width, height))
+        fig, ax = pyplot().subplots(1, 1, figsize=(width, height))
         self._plot_posterior_pdf(parameter, ax, y_label=y_label,
                                  x_label=x_label)
 
@@ -314,7 +898,7 @@ class MultinomialDirichlet(PosteriorBase):
         posterior_ylabel = kwargs.pop('posterior_ylabel', 'Posterior pdf')
         x_label = kwargs.pop('x_label', parameter)
 
-        fig, ax = plt.subplots(2, 1, figsize=(width, height), sharex=True)
+        fig, ax = pyplot().subplots(2, 1, figsize=(width, height), sharex=True)
         self._plot_prior_pdf(parameter, ax[0], ylabel=prior_ylabel,
                              x_label=None)
         self._plot_posterior_pdf(parameter, ax[1], y_label=posterior_ylabel,
@@ -332,8 +916,10 @@ class MultinomialDirichlet(PosteriorBase):
         else:
             nrows = d
 
-        gs = gridspec.GridSpec(nrows, ncols)
-        fig = plt.figure(num=1, figsize=(16, 3*nrows))
+        from matplotlib.gridspec import GridSpec
+
+        gs = GridSpec(nrows, ncols)
+        fig = pyplot().figure(num=1, figsize=(16, 3*nrows))
         ax = []
         for n, parameter in enumerate(self):
             r, c = divmod(n, 2)
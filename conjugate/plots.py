@@ -20,13 +20,31 @@ from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
                              round, str, super, zip)
 
 import numpy as np
-import matplotlib.pyplot as plt
-try:  # noqa
-    plt.style.use('ggplot')
-except:
-    pass
 
+from .instrumentation import instrument
 
+_pyplot = None
+
+
+def pyplot():
+    """Return `matplotlib.pyplot`, importing it (and applying the package
+    style) on first use so that `import conjugate` does not load
+    matplotlib or select a backend.
+    """
+    global _pyplot
+    if _pyplot is None:
+        import matplotlib.pyplot as plt
+        try:  # noqa
+            plt.style.use('ggplot')
+        except:
+            pass
+
+        _pyplot = plt
+
+    return _pyplot
+
+
+@instrument('plots.plot_parameter_pdf')
 def plot_parameter_pdf(ax, dist, dist_mean, x_param, fill=None, x_fill=None,
                        confidence=0.95, x_label=None, y_label=None,
                        color='r'):
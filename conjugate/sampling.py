@@ -0,0 +1,249 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+sampling.py
+
+Streaming (chunked) Monte Carlo sampling and bounded-memory reducers for
+summarizing the samples.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import numpy as np
+
+from .exceptions import ConjugateParameterException
+
+from .instrumentation import instrument
+
+from .utilities import _redraw_underflow
+from .utilities import random_generator
+
+
+def dirichlet_sample_chunks(alpha, n_samples, chunk_size=1024, rng=None):
+    """Generate `n_samples` Dirichlet draws in blocks of at most
+    `chunk_size` rows.
+
+    A single `(chunk_size, K)` buffer is allocated and refilled for every
+    block, so memory use does not depend on `n_samples`.  Each yielded block
+    is a view of that buffer and is overwritten by the next block; copy it
+    if it must be kept.
+
+    Arguments:
+    ----------
+    alpha: 1-d array of Dirichlet hyperparameters (length K).
+    n_samples: total number of draws.
+    chunk_size: maximum number of draws per block, default 1024.
+    rng: None, a seed or a `numpy.random.Generator`.
+
+    Yields:
+    -------
+    block: array with shape `(m, K)`, `m <= chunk_size`; rows sum to one.
+    """
+    alpha = np.asarray(alpha, dtype=np.float64)
+    n_samples = int(n_samples)
+    chunk_size = int(chunk_size)
+    if n_samples < 0 or chunk_size <= 0:
+        raise ConjugateParameterException('Number of samples must be '
+                                          'non-negative and chunk size '
+                                          'positive!')
+
+    rng = random_generator(rng)
+    buf = np.empty((min(chunk_size, n_samples), alpha.shape[0]))
+    norm = np.empty((buf.shape[0], 1))
+
+    remaining = n_samples
+    while remaining > 0:
+        m = min(chunk_size, remaining)
+        block = buf[:m]
+        rng.standard_gamma(alpha, size=block.shape, out=block)
+        np.sum(block, axis=1, keepdims=True, out=norm[:m])
+        _redraw_underflow(block, norm[:m], alpha, rng)
+        block /= norm[:m]
+        remaining -= m
+
+        yield block
+
+
+@instrument('sampling.reduce_chunks')
+def reduce_chunks(chunks, *reducers):
+    """Feed every block in `chunks` to each of the passed reducers, in a
+    single pass, and return the reducers.
+
+    Arguments:
+    ----------
+    chunks: iterable of 2-d sample blocks, e.g. from
+        `dirichlet_sample_chunks`.
+    reducers: instances with an `update(block)` method, e.g.
+        `RunningMoments`, `ReservoirQuantiles` or `ProbabilityOfMax`.
+
+    Returns:
+    --------
+    reducers: tuple with the passed reducers.
+    """
+    for block in chunks:
+        for reducer in reducers:
+            reducer.update(block)
+
+    return reducers
+
+
+class RunningMoments(object):
+    """Running mean and variance of each column, combined block by block
+    with the parallel algorithm of Chan, Golub and LeVeque.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._mean = None
+        self._m2 = None
+
+    def update(self, block):
+        """Add the rows of a 2-d sample block."""
+        block = np.asarray(block)
+        m = block.shape[0]
+        if m == 0:
+            return
+
+        block_mean = block.mean(axis=0)
+        block_m2 = ((block - block_mean)**2).sum(axis=0)
+
+        if self._mean is None:
+            self._mean = block_mean
+            self._m2 = block_m2
+            self.count = m
+        else:
+            total = self.count + m
+            delta = block_mean - self._mean
+            self._mean = self._mean + delta*(m/total)
+            self._m2 = self._m2 + block_m2 + delta**2*(self.count*m/total)
+            self.count = total
+
+    @property
+    def mean(self):
+        """Array with the mean of each column."""
+        return self._mean
+
+    @property
+    def variance(self):
+        """Array with the (population) variance of each column."""
+        if self._m2 is None:
+            return None
+
+        return self._m2/self.count
+
+    def result(self):
+        """Return the (mean, variance) arrays."""
+        return self.mean, self.variance
+
+
+class ReservoirQuantiles(object):
+    """Quantiles of each column estimated from a uniform reservoir sample of
+    the rows (Vitter's algorithm R, vectorized over blocks).
+
+    Memory use is `reservoir_size * len(columns) * 8` bytes; pass `columns`
+    to track a subset of the parameters when K is large.
+    """
+
+    def __init__(self, q, reservoir_size=1000, columns=None, rng=None):
+        """Initialize an instance of the ReservoirQuantiles class.
+
+        Arguments:
+        ----------
+        q: quantile or array of quantiles in [0, 1].
+        reservoir_size: number of rows kept, default 1000.
+        columns: optional index array of the columns to track.
+        rng: None, a seed or a `numpy.random.Generator`, used to select
+            reservoir rows.
+        """
+        self.q = np.asarray(q, dtype=np.float64)
+        if np.any(self.q < 0.) or np.any(self.q > 1.):
+            raise ConjugateParameterException('Quantiles must be in the '
+                                              'interval [0, 1]!')
+
+        self.reservoir_size = int(reservoir_size)
+        if self.reservoir_size <= 0:
+            raise ConjugateParameterException('Reservoir size must be '
+                                              'positive!')
+
+        self.columns = columns
+        self.count = 0
+        self._rng = random_generator(rng)
+        self._reservoir = None
+
+    def update(self, block):
+        """Add the rows of a 2-d sample block."""
+        block = np.asarray(block)
+        if self.columns is not None:
+            block = block[:, self.columns]
+
+        if self._reservoir is None:
+            self._reservoir = np.empty((self.reservoir_size, block.shape[1]),
+                                       dtype=block.dtype)
+
+        # fill the reservoir
+        fill = max(0, min(self.reservoir_size - self.count, block.shape[0]))
+        self._reservoir[self.count:self.count + fill] = block[:fill]
+
+        # row with global index i replaces a random slot with probability
+        # reservoir_size/(i + 1)
+        rest = block[fill:]
+        if rest.shape[0] > 0:
+            index = self.count + fill + np.arange(rest.shape[0])
+            slot = self._rng.integers(0, index + 1)
+            keep = slot < self.reservoir_size
+            slot, rows = slot[keep], np.nonzero(keep)[0]
+
+            # later rows win when several rows pick the same slot
+            last = slot.shape[0] - 1 - np.unique(slot[::-1],
+                                                 return_index=True)[1]
+            self._reservoir[slot[last]] = rest[rows[last]]
+
+        self.count += block.shape[0]
+
+    def result(self):
+        """Return quantile estimates with shape `np.shape(q) + (columns,)`."""
+        if self._reservoir is None:
+            return None
+
+        n = min(self.count, self.reservoir_size)
+
+        return np.quantile(self._reservoir[:n], self.q, axis=0)
+
+
+class ProbabilityOfMax(object):
+    """Probability that each column is the largest, estimated by counting
+    the argmax of each row.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.counts = None
+
+    def update(self, block):
+        """Add the rows of a 2-d sample block."""
+        block = np.asarray(block)
+        winners = np.bincount(block.argmax(axis=1), minlength=block.shape[1])
+        if self.counts is None:
+            self.counts = winners
+        else:
+            self.counts += winners
+
+        self.count += block.shape[0]
+
+    def result(self):
+        """Return array with the probability that each column is the max."""
+        if self.counts is None:
+            return None
+
+        return self.counts/self.count
@@ -0,0 +1,277 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+snapshot.py
+
+Save and load collections of posteriors as columnar NumPy `.npz` archives.
+
+Every archive holds the arrays below; nothing is pickled, so files load with
+`allow_pickle=False` and can be read without this package.
+
+* `format_version` -- integer, currently 2.  Version 1 archives, without
+  the half-life arrays, are still loaded.
+* `kind` -- `'binomial'` or `'multinomial'`.
+
+Posteriors with exponential forgetting additionally store:
+
+* `half_life` -- float64 scalar shared by all posteriors.
+* `last` -- float64 times of the latest update, shape `(N,)`; `-inf` for
+  posteriors never updated.
+
+For `kind == 'binomial'`, with N posteriors:
+
+* `alpha`, `beta` -- float64 prior hyperparameters, shape `(N,)`, or `(1,)`
+  when shared by all posteriors.
+* `n`, `k` -- attempts and successes, shape `(N,)`.  Integer counts are
+  stored in the smallest unsigned dtype that holds them.
+
+For `kind == 'multinomial'`, with N posteriors over an alphabet of size K:
+
+* `alphabet` -- unicode array of the K symbols, stored once.
+* `alpha` -- float64 prior hyperparameters, shape `(N, K)`, or `(1, K)` when
+  shared by all posteriors.
+* `counts` -- observed counts, shape `(N, K)`, stored like `n` and `k`.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import numpy as np
+
+from .binomial import BinomialBeta
+from .binomial import BinomialBetaArray
+from .multinomial import MultinomialDirichlet
+
+from .exceptions import ConjugateDataException
+
+FORMAT_VERSION = 2
+_SUPPORTED_VERSIONS = (1, 2)
+
+
+def _shared(values):
+    """Return `values[:1]` if all rows are equal, else `values`."""
+    if values.shape[0] > 0 and np.all(values == values[:1]):
+        return values[:1]
+
+    return values
+
+
+def _compact(counts):
+    """Return integer counts in the smallest unsigned dtype that holds
+    them; other counts are returned unchanged.
+    """
+    counts = np.asarray(counts)
+    if counts.dtype.kind in 'iu' and counts.size > 0 and counts.min() >= 0:
+        return counts.astype(np.min_scalar_type(counts.max()))
+
+    return counts
+
+
+def _widen(counts):
+    """Undo `_compact`: return int64 (or float64) counts."""
+    if counts.dtype.kind in 'iu':
+        return counts.astype(np.int64)
+
+    return counts.astype(np.float64)
+
+
+def _decay_arrays(arrays, half_lives, last):
+    """Add the `half_life` and `last` arrays to `arrays` if the posteriors
+    use exponential forgetting.
+    """
+    half_lives = set(half_lives)
+    if len(half_lives) > 1:
+        raise ConjugateDataException('All posteriors must share the same '
+                                     'half-life!')
+
+    half_life = half_lives.pop()
+    if half_life is not None:
+        arrays['half_life'] = np.float64(half_life)
+        arrays['last'] = np.asarray(last, dtype=np.float64)
+
+    return arrays
+
+
+def _half_life(arrays):
+    """Return the half-life stored in a snapshot, or None."""
+    if 'half_life' not in arrays:
+        return None
+
+    return float(arrays['half_life'])
+
+
+def _binomial_arrays(posteriors):
+    """Return the snapshot arrays for a BinomialBetaArray or a list of
+    BinomialBeta instances.
+    """
+    if isinstance(posteriors, BinomialBetaArray):
+        alpha, beta = posteriors.alpha, posteriors.beta
+        n, k = posteriors.n, posteriors.k
+        half_lives = [posteriors.half_life]
+        last = posteriors._last
+    else:
+        alpha = np.array([bp.prior_hyperparameters['alpha']
+                          for bp in posteriors], dtype=np.float64)
+        beta = np.array([bp.prior_hyperparameters['beta']
+                         for bp in posteriors], dtype=np.float64)
+        n = np.array([bp.data['n'] for bp in posteriors])
+        k = np.array([bp.data['k'] for bp in posteriors])
+        half_lives = [bp.half_life for bp in posteriors]
+        last = [bp._timestamp for bp in posteriors]
+
+    return _decay_arrays({'kind': 'binomial', 'alpha': _shared(alpha),
+                          'beta': _shared(beta), 'n': _compact(n),
+                          'k': _compact(k)}, half_lives, last)
+
+
+def _multinomial_arrays(posteriors):
+    """Return the snapshot arrays for a list of MultinomialDirichlet
+    instances sharing one alphabet.
+    """
+    alphabet = posteriors[0].alphabet
+    for mp in posteriors:
+        if mp.alphabet != alphabet:
+            raise ConjugateDataException('All posteriors must share the '
+                                         'same alphabet!')
+
+    alpha = np.stack([mp.alpha for mp in posteriors])
+    counts = np.stack([mp.counts for mp in posteriors])
+
+    return _decay_arrays({'kind': 'multinomial',
+                          'alphabet': np.array(alphabet, dtype='U'),
+                          'alpha': _shared(alpha),
+                          'counts': _compact(counts)},
+                         [mp.half_life for mp in posteriors],
+                         [mp._timestamp for mp in posteriors])
+
+
+def save_posteriors(path, posteriors, compress=False):
+    """Save a collection of posteriors to an `.npz` snapshot.
+
+    Arguments:
+    ----------
+    path: file name or open binary file.
+    posteriors: a BinomialBetaArray, a list of BinomialBeta instances or a
+        list of MultinomialDirichlet instances with the same alphabet.
+    compress: use `numpy.savez_compressed`, default False.
+    """
+    if isinstance(posteriors, BinomialBetaArray):
+        arrays = _binomial_arrays(posteriors)
+    else:
+        posteriors = list(posteriors)
+        if not posteriors:
+            raise ConjugateDataException('No posteriors to save!')
+
+        if all(isinstance(p, BinomialBeta) for p in posteriors):
+            arrays = _binomial_arrays(posteriors)
+        elif all(isinstance(p, MultinomialDirichlet) for p in posteriors):
+            arrays = _multinomial_arrays(posteriors)
+        else:
+            raise ConjugateDataException('Posteriors must all be '
+                                         'BinomialBeta or all be '
+                                         'MultinomialDirichlet!')
+
+    arrays['format_version'] = FORMAT_VERSION
+    save = np.savez_compressed if compress else np.savez
+    save(path, **arrays)
+
+
+def _load_binomial(arrays, as_array):
+    """Return BinomialBetaArray (or list of BinomialBeta) from snapshot."""
+    n, k = _widen(arrays['n']), _widen(arrays['k'])
+    half_life = _half_life(arrays)
+    # restoring the update times with the counts leaves them undecayed
+    last = arrays['last'] if half_life is not None else None
+    posteriors = BinomialBetaArray(n.shape[0], alpha=arrays['alpha'],
+                                   beta=arrays['beta'], half_life=half_life)
+    if n.dtype.kind == 'f':
+        # fractional (e.g. decayed) counts
+        posteriors._n = posteriors._n.astype(np.float64)
+        posteriors._k = posteriors._k.astype(np.float64)
+
+    posteriors.add_data({'n': n, 'k': k}, timestamp=last)
+    if as_array:
+        return posteriors
+
+    if last is None:
+        last = [None]*n.shape[0]
+    else:
+        last = last.tolist()
+
+    result = []
+    for a, b, ni, ki, ti in zip(posteriors.alpha.tolist(),
+                                posteriors.beta.tolist(), n.tolist(),
+                                k.tolist(), last):
+        bp = BinomialBeta(half_life=half_life)
+        bp.prior_hyperparameters = {'alpha': a, 'beta': b}
+        bp.add_data({'n': ni, 'k': ki}, timestamp=ti)
+        result.append(bp)
+
+    return result
+
+
+def _load_multinomial(arrays):
+    """Return list of MultinomialDirichlet from snapshot."""
+    counts = _widen(arrays['counts'])
+    alpha = np.broadcast_to(arrays['alpha'], counts.shape)
+    if np.any(alpha <= 0.) or np.any(counts < 0):
+        raise ConjugateDataException('Snapshot has invalid hyperparameters '
+                                     'or counts!')
+
+    # the name indexes built by the constructor are shared, read-only
+    half_life = _half_life(arrays)
+    template = MultinomialDirichlet(arrays['alphabet'].tolist(),
+                                    half_life=half_life)
+    if half_life is None:
+        return [template._with_arrays(alpha[i].copy(), counts[i])
+                for i in range(counts.shape[0])]
+
+    counts = counts.astype(np.float64)
+    result = []
+    for i, last in enumerate(arrays['last'].tolist()):
+        mp = template._with_arrays(alpha[i].copy(), counts[i])
+        mp._timestamp = last
+        result.append(mp)
+
+    return result
+
+
+def load_posteriors(path, as_array=True):
+    """Load a collection of posteriors saved with `save_posteriors`.
+
+    Arguments:
+    ----------
+    path: file name or open binary file.
+    as_array: return Beta posteriors as a single BinomialBetaArray (fast),
+        default True; if False return a list of BinomialBeta.
+
+    Returns:
+    --------
+    posteriors: a BinomialBetaArray or list of BinomialBeta, or a list of
+        MultinomialDirichlet.
+    """
+    with np.load(path, allow_pickle=False) as archive:
+        arrays = dict(archive.items())
+
+    version = int(arrays.get('format_version', -1))
+    if version not in _SUPPORTED_VERSIONS:
+        raise ConjugateDataException('Unsupported snapshot format version: '
+                                     '{}!'.format(version))
+
+    kind = str(arrays['kind'])
+    if kind == 'binomial':
+        return _load_binomial(arrays, as_array)
+    elif kind == 'multinomial':
+        return _load_multinomial(arrays)
+
+    raise ConjugateDataException('Unknown snapshot kind: {}!'.format(kind))
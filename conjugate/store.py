@@ -0,0 +1,364 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+store.py
+
+Posterior stores backed by memory-mapped `.npy` files, for count tables that
+do not fit in memory.  A store is a directory holding `store.json` (kind and
+format version) and one `.npy` file per array:
+
+* Beta stores: `alpha.npy`, `beta.npy` (float64) and `n.npy`, `k.npy`
+  (int64), each of length N.  Opened as a `BinomialBetaArray`.
+* Dirichlet stores: `alphabet.npy` (K symbols), `alpha.npy` (float64, K
+  hyperparameters shared by all rows) and `counts.npy` (float64, N x K).
+  Opened as a `DirichletStore`.
+
+Updates are written in place to the mapped files, so several processes that
+open the same store share one copy of the state through the page cache.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import json
+import os
+
+import numpy as np
+
+from .binomial import BinomialBetaArray
+from .multinomial import MultinomialDirichlet
+
+from .exceptions import ConjugateDataException
+from .exceptions import ConjugateParameterException
+
+from .utilities import beta_central_credible_region
+from .utilities import beta_high_density_credible_region
+from .utilities import dirichlet_sample
+from .utilities import random_generator
+from .utilities import sample_shape
+
+FORMAT_VERSION = 1
+
+
+def _write_header(path, kind):
+    """Create the store directory and its header."""
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+    with open(os.path.join(path, 'store.json'), 'w') as f:
+        f.write(str(json.dumps({'kind': kind,
+                                'format_version': FORMAT_VERSION})))
+
+
+def _check_header(path, kind):
+    """Raise exception if `path` is not a store of the passed kind."""
+    try:
+        with open(os.path.join(path, 'store.json')) as f:
+            header = json.load(f)
+    except (IOError, OSError, ValueError):
+        raise ConjugateDataException('Not a posterior store: '
+                                     '{}!'.format(path))
+
+    if header.get('kind') != kind or \
+            header.get('format_version') != FORMAT_VERSION:
+        raise ConjugateDataException('Store {} is not a version {} {} '
+                                     'store!'.format(path, FORMAT_VERSION,
+                                                     kind))
+
+
+def _create(path, name, dtype, shape, fill):
+    """Create a memory-mapped `.npy` array filled with `fill`."""
+    arr = np.lib.format.open_memmap(os.path.join(path, name + '.npy'),
+                                    mode='w+', dtype=dtype, shape=shape)
+    arr[...] = fill
+
+    return arr
+
+
+def _open(path, name, mode):
+    """Open a memory-mapped `.npy` array."""
+    return np.load(os.path.join(path, name + '.npy'), mmap_mode=mode)
+
+
+def create_beta_store(path, size, alpha=1, beta=1):
+    """Create a Beta store with `size` rows in directory `path` and return
+    it as a BinomialBetaArray whose arrays are memory maps.
+
+    Arguments:
+    ----------
+    path: directory for the store files; created if needed.
+    size: number of rows.
+    alpha, beta: prior hyperparameters, scalars or arrays of length `size`.
+    """
+    size = int(size)
+    _write_header(path, 'beta')
+    posteriors = BinomialBetaArray._from_arrays(
+        _create(path, 'alpha', np.float64, (size,), 1.),
+        _create(path, 'beta', np.float64, (size,), 1.),
+        _create(path, 'n', np.int64, (size,), 0),
+        _create(path, 'k', np.int64, (size,), 0))
+    posteriors.prior_hyperparameters = {'alpha': alpha, 'beta': beta}
+
+    return posteriors
+
+
+def open_beta_store(path, mode='r+'):
+    """Open a Beta store as a BinomialBetaArray over memory maps.
+
+    Arguments:
+    ----------
+    path: store directory.
+    mode: 'r+' (default) for in-place updates or 'r' for read-only access.
+    """
+    _check_header(path, 'beta')
+
+    return BinomialBetaArray._from_arrays(_open(path, 'alpha', mode),
+                                          _open(path, 'beta', mode),
+                                          _open(path, 'n', mode),
+                                          _open(path, 'k', mode))
+
+
+def create_dirichlet_store(path, alphabet, size, alpha=1):
+    """Create a Dirichlet store with `size` rows over `alphabet` in
+    directory `path` and return it as a DirichletStore.
+
+    Arguments:
+    ----------
+    path: directory for the store files; created if needed.
+    alphabet: the types of observations.
+    size: number of rows.
+    alpha: prior hyperparameters shared by all rows; a scalar or an array
+        aligned with `alphabet`.
+    """
+    alphabet = [str(i) for i in alphabet]
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=np.float64),
+                            (len(alphabet),))
+    if np.any(alpha <= 0.):
+        raise ConjugateParameterException('Hyperparameters must be greater '
+                                          'than zero!')
+
+    _write_header(path, 'dirichlet')
+    np.save(os.path.join(path, 'alphabet.npy'), np.array(alphabet,
+                                                         dtype='U'))
+    _create(path, 'alpha', np.float64, alpha.shape, alpha)
+    _create(path, 'counts', np.float64, (int(size), len(alphabet)), 0.)
+
+    return open_dirichlet_store(path)
+
+
+def open_dirichlet_store(path, mode='r+'):
+    """Open a Dirichlet store.
+
+    Arguments:
+    ----------
+    path: store directory.
+    mode: 'r+' (default) for in-place updates or 'r' for read-only access.
+    """
+    _check_header(path, 'dirichlet')
+    alphabet = np.load(os.path.join(path, 'alphabet.npy')).tolist()
+
+    return DirichletStore(alphabet, _open(path, 'alpha', 'r'),
+                          _open(path, 'counts', mode))
+
+
+class _StoreRow(MultinomialDirichlet):
+    """MultinomialDirichlet over one row of a DirichletStore.  The totals
+    are summed from the row on every query instead of being kept, so
+    updates through other views, `add_counts` or other processes are always
+    seen.
+    """
+
+    @property
+    def _A(self):
+        return float(self._alpha.sum())
+
+    @_A.setter
+    def _A(self, value):
+        # summed from the row on access
+        pass
+
+    @property
+    def _N(self):
+        return self._counts.sum().item()
+
+    @_N.setter
+    def _N(self, value):
+        # summed from the row on access
+        pass
+
+
+class DirichletStore(object):
+    """Rows of Multinomial-Dirichlet posteriors over one alphabet, with a
+    shared prior and counts held in an `(N, K)` array, usually a memory map
+    created by `create_dirichlet_store`.
+
+    `store[i]` returns a MultinomialDirichlet whose counts are a view of row
+    `i`: its query methods read, and its `add_data`/`add_sequence` write,
+    the store in place, so it always reflects the current row.  The shared
+    prior is read-only.
+    """
+
+    def __init__(self, alphabet, alpha, counts):
+        """Initialize an instance of the DirichletStore class.
+
+        Arguments:
+        ----------
+        alphabet: list of K symbols.
+        alpha: array of K prior hyperparameters shared by all rows.
+        counts: `(N, K)` array of counts, used without copying.
+        """
+        if counts.ndim != 2 or counts.shape[1] != len(alphabet) or \
+                alpha.shape != (len(alphabet),):
+            raise ConjugateDataException('Counts must have shape (N, K) and '
+                                         'alpha shape (K,) for an alphabet '
+                                         'of K symbols!')
+
+        self._template = _StoreRow(alphabet)
+        self._alpha = alpha
+        self._counts = counts
+
+    def __len__(self):
+        return self._counts.shape[0]
+
+    def __getitem__(self, index):
+        """Return row `index` as a MultinomialDirichlet view, or a
+        DirichletStore over the selected rows (a view for slices).
+        """
+        if isinstance(index, (int, np.integer)):
+            return self._template._with_arrays(self._alpha,
+                                               self._counts[index])
+
+        return DirichletStore(self.alphabet, self._alpha,
+                              self._counts[index])
+
+    @property
+    def alphabet(self):
+        """List of symbols, aligned with the columns of `counts`."""
+        return self._template.alphabet
+
+    @property
+    def alpha(self):
+        """Array of prior hyperparameters shared by all rows."""
+        return self._alpha
+
+    @property
+    def counts(self):
+        """`(N, K)` array of counts."""
+        return self._counts
+
+    def add_counts(self, index, counts):
+        """Add an array of counts to the passed rows in place.
+
+        Arguments:
+        ----------
+        index: integer array of rows; repeated rows are accumulated.
+        counts: array with shape `(len(index), K)`.
+        """
+        index = np.asarray(index, dtype=np.intp)
+        counts = np.asarray(counts, dtype=np.float64)
+        if counts.shape != index.shape + (len(self.alphabet),):
+            raise ConjugateDataException('Counts must have shape '
+                                         '(len(index), K)!')
+
+        if np.any(counts < 0):
+            raise ConjugateDataException('Passed negative data!')
+
+        np.add.at(self._counts, index, counts)
+
+    def flush(self):
+        """Write pending changes of memory-mapped counts to disk."""
+        if isinstance(self._counts, np.memmap):
+            self._counts.flush()
+
+    def _posterior_marginal_arrays(self, rows):
+        """Return `(n, K)` arrays of marginal Beta posterior
+        hyperparameters for the counts in `rows`.
+        """
+        a = self._alpha + rows
+        total = self._alpha.sum() + rows.sum(axis=1, keepdims=True)
+
+        return a, total - a
+
+    def _chunks(self, chunk_size):
+        """Generate (slice, counts block) pairs of at most `chunk_size`
+        rows, so that summaries never hold all counts in memory.
+        """
+        for start in range(0, len(self), chunk_size):
+            stop = min(start + chunk_size, len(self))
+            yield slice(start, stop), np.asarray(self._counts[start:stop])
+
+    def _output(self, shape, out):
+        """Return `out`, checked against `shape`, or a new array."""
+        if out is None:
+            return np.empty(shape)
+
+        if out.shape != shape:
+            raise ConjugateDataException('Output array must have shape '
+                                         '{}!'.format(shape))
+
+        return out
+
+    def posterior_means(self, chunk_size=65536, out=None):
+        """Return `(N, K)` array of posterior means.
+
+        Pass an `(N, K)` float64 array as `out`, e.g. a memory map created
+        with `numpy.lib.format.open_memmap`, to write the result there
+        instead of allocating it in memory.
+        """
+        means = self._output(self._counts.shape, out)
+        for rows, block in self._chunks(chunk_size):
+            a, b = self._posterior_marginal_arrays(block)
+            means[rows] = a/(a+b)
+
+        return means
+
+    def posterior_central_credible_regions(self, confidence=0.95,
+                                           chunk_size=65536, out=None):
+        """Return `(N, K, 2)` array with the central credible regions of
+        the (marginal) posteriors of all rows and parameters; see
+        `posterior_means` for `out`.
+        """
+        ccr = self._output(self._counts.shape + (2,), out)
+        for rows, block in self._chunks(chunk_size):
+            a, b = self._posterior_marginal_arrays(block)
+            ccr[rows] = beta_central_credible_region(a, b, confidence)
+
+        return ccr
+
+    def posterior_high_density_credible_regions(self, confidence=0.95,
+                                                chunk_size=65536, out=None):
+        """Return `(N, K, 2)` array with the high-density credible regions
+        of the (marginal) posteriors of all rows and parameters; see
+        `posterior_means` for `out`.
+        """
+        hdcr = self._output(self._counts.shape + (2,), out)
+        for rows, block in self._chunks(chunk_size):
+            a, b = self._posterior_marginal_arrays(block)
+            hdcr[rows] = beta_high_density_credible_region(a, b, confidence)
+
+        return hdcr
+
+    def posterior_sample(self, size=None, rng=None, chunk_size=65536,
+                         out=None):
+        """Return a sample from the Dirichlet posteriors of all rows, shape
+        `size + (N, K)`, drawn chunk by chunk; see `posterior_means` for
+        `out`.
+        """
+        rng = random_generator(rng)
+        shape = sample_shape(size)
+        sample = self._output(shape + self._counts.shape, out)
+        for rows, block in self._chunks(chunk_size):
+            sample[..., rows, :] = dirichlet_sample(self._alpha + block,
+                                                    size=shape, rng=rng)
+
+        return sample
@@ -19,9 +19,18 @@ from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
                              input, int, map, next, oct, open, pow, range,
                              round, str, super, zip)
 
-from scipy.optimize import fmin
+import copy
+import threading
+from collections import OrderedDict
 
+import numpy as np
 
+from .exceptions import ConjugateParameterException
+
+from .instrumentation import instrument
+
+
+@instrument('utilities.central_credible_region')
 def central_credible_region(dist, confidence=0.95):
     """Find the central credible region (CCR) for the passed
     distrbution at the specified level. This means there are
@@ -41,6 +50,7 @@ def central_credible_region(dist, confidence=0.95):
     return dist.ppf([alpha/2, 1.0 - alpha/2])
 
 
+@instrument('utilities.high_density_credible_region')
 def high_density_credible_region(dist, confidence=0.95):
     """Find the high-density credible region (HDCR) for the passed
     distrbution at the specified level.
@@ -61,7 +71,18 @@ def high_density_credible_region(dist, confidence=0.95):
     http://stackoverflow.com/a/25777507
 
     Inspired by Kruschke's `Doing Bayesian Data Analysis`.
+
+    Notes:
+    ------
+    Frozen (standard) Beta distributions are passed to
+    `beta_high_density_credible_region`, which does not need `fmin`.
     """
+    if _is_standard_beta(dist):
+        return beta_high_density_credible_region(dist.args[0], dist.args[1],
+                                                 confidence=confidence)
+
+    from scipy.optimize import fmin
+
     def region_width(lower_bound):
         return dist.ppf(lower_bound + confidence) - dist.ppf(lower_bound)
 
@@ -70,3 +91,581 @@ def high_density_credible_region(dist, confidence=0.95):
                             ftol=1.e-8, disp=False)[0]
 
     return dist.ppf([hdcr_lower_bound, hdcr_lower_bound + confidence])
+
+
+def random_generator(rng=None):
+    """Return a `numpy.random.Generator` for drawing samples.
+
+    Arguments:
+    ----------
+    rng: None, an integer seed or an existing `numpy.random.Generator`.
+        None gives a freshly seeded generator; a generator is passed
+        through unchanged.
+
+    Returns:
+    --------
+    rng: instance of `numpy.random.Generator`.
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng
+
+    return np.random.default_rng(rng)
+
+
+def _is_standard_beta(dist):
+    """Return True if `dist` is a frozen `scipy.stats.beta` with shape
+    parameters passed positionally and the default location and scale.
+    """
+    return (getattr(getattr(dist, 'dist', None), 'name', None) == 'beta' and
+            len(dist.args) == 2 and
+            dist.kwds.get('loc', 0) == 0 and dist.kwds.get('scale', 1) == 1)
+
+
+def _beta_broadcast(a, b, confidence, outer=False):
+    """Broadcast Beta hyperparameters and confidence levels.
+
+    Returns flat arrays `a`, `b`, `confidence` and the output shape, which is
+    `np.broadcast(a, b, confidence).shape`, or `np.broadcast(a, b).shape +
+    np.shape(confidence)` if `outer` is True.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    confidence = np.asarray(confidence, dtype=np.float64)
+
+    if np.any(a <= 0.) or np.any(b <= 0.):
+        raise ConjugateParameterException('Beta hyperparameters must be '
+                                          'greater than zero!')
+
+    if np.any(confidence <= 0.) or np.any(confidence > 1.):
+        raise ConjugateParameterException('Confidence must be in the '
+                                          'interval (0, 1]!')
+
+    if outer:
+        a, b = np.broadcast_arrays(a, b)
+        expand = a.shape + (1,)*confidence.ndim
+        a = a.reshape(expand)
+        b = b.reshape(expand)
+
+    try:
+        a, b, confidence = np.broadcast_arrays(a, b, confidence)
+    except ValueError:
+        raise ConjugateParameterException('Hyperparameters and confidence '
+                                          'levels do not broadcast '
+                                          'together!')
+
+    return a.ravel(), b.ravel(), confidence.ravel(), a.shape
+
+
+@instrument('utilities.beta_central_credible_region')
+def beta_central_credible_region(a, b, confidence=0.95, outer=False):
+    """Find the central credible region (CCR) for Beta distributions with
+    hyperparameters `a` and `b` at one or more confidence levels, using a
+    single broadcast `betaincinv` call.
+
+    Arguments:
+    ----------
+    a, b: Beta hyperparameters; scalars or arrays that broadcast together.
+    confidence: probability associated with region, default 0.95; a scalar
+        or an array of levels.
+    outer: if True, evaluate every distribution at every confidence level
+        instead of broadcasting `confidence` with `a` and `b`, default
+        False.
+
+    Returns:
+    --------
+    ccr: array with shape `np.broadcast(a, b, confidence).shape + (2,)`
+        holding lower- and upper-bounds of the regions.  With `outer` the
+        shape is `np.broadcast(a, b).shape + np.shape(confidence) + (2,)`,
+        for example `(N, L, 2)` for `N` distributions and `L` levels.
+    """
+    from scipy.special import betaincinv
+
+    a, b, c, shape = _beta_broadcast(a, b, confidence, outer=outer)
+    tail = (1. - c)/2
+    q = np.stack([tail, 1. - tail], axis=-1)
+
+    return betaincinv(a[:, np.newaxis], b[:, np.newaxis],
+                      q).reshape(shape + (2,))
+
+
+@instrument('utilities.beta_high_density_credible_region')
+def beta_high_density_credible_region(a, b, confidence=0.95, tol=1.e-10,
+                                      maxiter=50, outer=False):
+    """Find the high-density credible region (HDCR) for Beta distributions
+    with hyperparameters `a` and `b`, vectorized over all inputs.
+
+    For :math:`a > 1` and :math:`b > 1` the density is unimodal and the HDCR
+    :math:`[F^{-1}(t), F^{-1}(t + c)]` has equal density at both endpoints.
+    The lower-tail probability :math:`t` is found with a safeguarded Newton
+    iteration on the log-density difference of the endpoints, using a
+    logistic parametrization of :math:`t \\in (0, 1 - c)` so that regions
+    pushed against either boundary converge as quickly as central ones.  Each
+    iteration costs two `betaincinv` evaluations and typically five to eight
+    iterations are needed.  Monotone densities put the region against the
+    boundary, the uniform density returns the central region and U-shaped
+    densities return the shorter of the two boundary intervals.
+
+    Arguments:
+    ----------
+    a, b: Beta hyperparameters; scalars or arrays that broadcast together.
+    confidence: probability associated with region, default 0.95; a scalar
+        or an array of levels.
+    tol: convergence tolerance on the logit of the lower-tail probability,
+        i.e. a relative tolerance on both tail probabilities.
+    maxiter: maximum number of Newton/bisection iterations.
+    outer: if True, evaluate every distribution at every confidence level;
+        see `beta_central_credible_region`.
+
+    Returns:
+    --------
+    hdcr: array with shape `np.broadcast(a, b, confidence).shape + (2,)`, or
+        `np.broadcast(a, b).shape + np.shape(confidence) + (2,)` with
+        `outer`, holding lower- and upper-bounds of the regions.
+
+    Accuracy:
+    ---------
+    Both bounds are computed from `betaincinv`, so every region covers
+    exactly `confidence` up to the accuracy of `betaincinv`.  The tail
+    probabilities outside the region are within a relative `tol` of the
+    true HDCR values, unless `maxiter` is exhausted.
+    """
+    from scipy.special import betaincinv
+
+    a, b, c, shape = _beta_broadcast(a, b, confidence, outer=outer)
+    lower = np.empty_like(a)
+    upper = np.empty_like(a)
+
+    full = c >= 1.
+    uniform = (a == 1.) & (b == 1.) & ~full
+    decreasing = (a <= 1.) & (b >= 1.) & ~uniform & ~full
+    increasing = (a >= 1.) & (b <= 1.) & ~uniform & ~full
+    u_shaped = (a < 1.) & (b < 1.) & ~full
+    unimodal = (a > 1.) & (b > 1.) & ~full
+
+    lower[full] = 0.
+    upper[full] = 1.
+
+    tail = (1. - c[uniform])/2
+    lower[uniform] = tail
+    upper[uniform] = 1. - tail
+
+    lower[decreasing] = 0.
+    upper[decreasing] = betaincinv(a[decreasing], b[decreasing],
+                                   c[decreasing])
+
+    lower[increasing] = 1. - betaincinv(b[increasing], a[increasing],
+                                        c[increasing])
+    upper[increasing] = 1.
+
+    if np.any(u_shaped):
+        au, bu, cu = a[u_shaped], b[u_shaped], c[u_shaped]
+        left = betaincinv(au, bu, cu)
+        right = 1. - betaincinv(bu, au, cu)
+        use_left = left <= 1. - right
+        lower[u_shaped] = np.where(use_left, 0., right)
+        upper[u_shaped] = np.where(use_left, left, 1.)
+
+    if np.any(unimodal):
+        lower[unimodal], upper[unimodal] = \
+            _beta_hdcr_unimodal(a[unimodal], b[unimodal], c[unimodal],
+                                tol, maxiter)
+
+    return np.stack([lower, upper], axis=-1).reshape(shape + (2,))
+
+
+def _beta_hdcr_unimodal(a, b, c, tol, maxiter):
+    """Return lower- and upper-bounds of the HDCR for unimodal Beta
+    distributions (:math:`a > 1`, :math:`b > 1`).
+
+    With :math:`h = 1 - c`, the lower- and upper-tail probabilities are
+    :math:`t = h/(1 + e^{-y})` and :math:`h - t = h/(1 + e^{y})`.  The root
+    of :math:`g(y) = \\log f(F^{-1}(t)) - \\log f(F^{-1}(t + c))` is kept
+    bracketed; :math:`g` is increasing in :math:`y` and asymptotically linear
+    as either tail vanishes, which keeps Newton well behaved.  Newton steps
+    leaving the bracket fall back to bisection.  The upper bound is computed
+    from the upper-tail probability, :math:`F^{-1}(t + c) = 1 -
+    G^{-1}(h - t)` with :math:`G` the CDF of Beta(:math:`b`, :math:`a`), to
+    keep full precision near one.
+    """
+    from scipy.special import betaincinv
+    from scipy.special import betaln
+
+    h = 1. - c
+    y = np.zeros_like(a)
+    y_lo = np.full_like(a, -np.inf)
+    y_hi = np.full_like(a, np.inf)
+    lower = np.empty_like(a)
+    upper = np.empty_like(a)
+    log_norm = betaln(a, b)
+    active = np.arange(a.size)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(maxiter):
+            if active.size == 0:
+                break
+
+            aa, bb, hh, yy = a[active], b[active], h[active], y[active]
+            p_lo = hh/(1. + np.exp(-yy))
+            p_hi = hh/(1. + np.exp(yy))
+            x_lo = betaincinv(aa, bb, p_lo)
+            z_hi = betaincinv(bb, aa, p_hi)
+            lower[active] = x_lo
+            upper[active] = 1. - z_hi
+
+            log_f_lo = (aa - 1.)*np.log(x_lo) + (bb - 1.)*np.log1p(-x_lo)
+            log_f_hi = (aa - 1.)*np.log1p(-z_hi) + (bb - 1.)*np.log(z_hi)
+            g = log_f_lo - log_f_hi
+
+            below = g < 0.
+            y_lo[active] = np.where(below, yy, y_lo[active])
+            y_hi[active] = np.where(below, y_hi[active], yy)
+
+            # dg/dy = dg/dt dt/dy with dx/dt = 1/f(x) at both endpoints
+            dlog_lo = (aa - 1.)/x_lo - (bb - 1.)/(1. - x_lo)
+            dlog_hi = (aa - 1.)/(1. - z_hi) - (bb - 1.)/z_hi
+            dg = ((dlog_lo*np.exp(log_norm[active] - log_f_lo) -
+                   dlog_hi*np.exp(log_norm[active] - log_f_hi)) *
+                  p_lo*p_hi/hh)
+
+            # stop once the step is below tolerance, g is below the rounding
+            # error of its terms or an endpoint reaches the boundary
+            noise = 64*np.finfo(float).eps*(
+                np.abs((aa - 1.)*np.log(x_lo)) +
+                np.abs((bb - 1.)*np.log1p(-x_lo)) +
+                np.abs((aa - 1.)*np.log1p(-z_hi)) +
+                np.abs((bb - 1.)*np.log(z_hi)))
+            step = g/dg
+            converged = ((np.abs(g) <= noise) | (np.abs(step) <= tol) |
+                         (x_lo == 0.) | (z_hi == 0.))
+            y_new = yy - step
+
+            # fall back to bisection when Newton leaves the bracket
+            lo, hi = y_lo[active], y_hi[active]
+            bisect = ~converged & (~np.isfinite(y_new) | (y_new <= lo) |
+                                   (y_new >= hi))
+            mid = np.where(np.isinf(lo), hi - 1.,
+                           np.where(np.isinf(hi), lo + 1., (lo + hi)/2))
+            y[active] = np.where(bisect, mid, y_new)
+
+            active = active[~converged]
+
+    return lower, upper
+
+
+def beta_mode(a, b):
+    """Return the mode of Beta distributions with hyperparameters `a` and
+    `b` (scalars or arrays that broadcast together).
+
+    Densities that increase (decrease) monotonically have their mode at 1
+    (0); the uniform and U-shaped densities, with no unique mode, give nan.
+    """
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=np.float64),
+                               np.asarray(b, dtype=np.float64))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mode = np.where((a > 1.) & (b > 1.), (a - 1.)/(a + b - 2.), np.nan)
+
+    mode[(a <= 1.) & (b >= 1.) & ((a < 1.) | (b > 1.))] = 0.
+    mode[(a >= 1.) & (b <= 1.) & ((a > 1.) | (b < 1.))] = 1.
+
+    return mode
+
+
+@instrument('utilities.beta_binomial_logpmf')
+def beta_binomial_logpmf(k, n, a, b):
+    """Return the log-pmf of Beta-Binomial distributions, the predictive
+    distribution of the number of successes :math:`k` in :math:`n` future
+    attempts given a Beta(:math:`a`, :math:`b`) posterior:
+
+    .. math::
+        \\log \\binom{n}{k} + \\log B(k + a, n - k + b) - \\log B(a, b)
+
+    Arguments:
+    ----------
+    k, n, a, b: scalars or arrays that broadcast together.
+
+    Returns:
+    --------
+    logpmf: array with the broadcast shape; `-inf` where :math:`k` is not an
+        integer in :math:`[0, n]`.
+    """
+    from scipy.special import betaln
+    from scipy.special import gammaln
+
+    k, n, a, b = np.broadcast_arrays(*[np.asarray(x, dtype=np.float64)
+                                       for x in (k, n, a, b)])
+    valid = (k >= 0) & (k <= n) & (k == np.floor(k))
+
+    with np.errstate(invalid='ignore'):
+        logpmf = (gammaln(n + 1) - gammaln(k + 1) - gammaln(n - k + 1) +
+                  betaln(k + a, n - k + b) - betaln(a, b))
+
+    return np.where(valid, logpmf, -np.inf)
+
+
+def beta_binomial_moments(n, a, b):
+    """Return the mean and variance of Beta-Binomial distributions with
+    :math:`n` attempts and hyperparameters `a` and `b` (scalars or arrays
+    that broadcast together).
+    """
+    n, a, b = [np.asarray(x, dtype=np.float64) for x in (n, a, b)]
+    p = a/(a + b)
+
+    return n*p, n*p*(1. - p)*(a + b + n)/(a + b + 1.)
+
+
+@instrument('utilities.dirichlet_multinomial_logpmf')
+def dirichlet_multinomial_logpmf(counts, alpha):
+    """Return the log-pmf of Dirichlet-Multinomial distributions, the
+    predictive distribution of the counts of :math:`n = \\sum_i c_i` future
+    observations given a Dirichlet(:math:`\\alpha`) posterior.
+
+    Arguments:
+    ----------
+    counts: array of counts with shape `(..., K)`.
+    alpha: array of Dirichlet hyperparameters with shape `(..., K)` that
+        broadcasts with `counts`.
+
+    Returns:
+    --------
+    logpmf: array with the broadcast shape without the last axis; `-inf`
+        where any count is negative or not an integer.
+    """
+    from scipy.special import gammaln
+
+    counts, alpha = np.broadcast_arrays(np.asarray(counts, dtype=np.float64),
+                                        np.asarray(alpha, dtype=np.float64))
+    valid = np.all((counts >= 0) & (counts == np.floor(counts)), axis=-1)
+
+    n = counts.sum(axis=-1)
+    total = alpha.sum(axis=-1)
+    with np.errstate(invalid='ignore'):
+        logpmf = (gammaln(n + 1) + gammaln(total) - gammaln(n + total) +
+                  (gammaln(counts + alpha) - gammaln(alpha) -
+                   gammaln(counts + 1)).sum(axis=-1))
+
+    return np.where(valid, logpmf, -np.inf)
+
+
+def dirichlet_multinomial_moments(n, alpha):
+    """Return the means and variances of the counts of Dirichlet-Multinomial
+    distributions with :math:`n` observations (a scalar or array) and 1-d
+    hyperparameters `alpha`, as arrays with shape `np.shape(n) + (K,)`.
+    """
+    n = np.asarray(n, dtype=np.float64)[..., np.newaxis]
+    alpha = np.asarray(alpha, dtype=np.float64)
+    total = alpha.sum()
+    p = alpha/total
+
+    return n*p, n*p*(1. - p)*(total + n)/(total + 1.)
+
+
+def merge_posteriors(posteriors):
+    """Merge posteriors with matching priors, e.g. partial posteriors
+    computed from shards of the data by worker processes, by pairwise
+    (tree) reduction.
+
+    Arguments:
+    ----------
+    posteriors: non-empty iterable of posteriors of one type with a `merge`
+        method (BinomialBeta, MultinomialDirichlet or BinomialBetaArray).
+
+    Returns:
+    --------
+    posterior: new posterior holding the combined data.
+    """
+    level = list(posteriors)
+    if not level:
+        raise ConjugateParameterException('No posteriors to merge!')
+
+    if len(level) == 1:
+        return copy.deepcopy(level[0])
+
+    while len(level) > 1:
+        merged = [first.merge(second)
+                  for first, second in zip(level[::2], level[1::2])]
+        if len(level) % 2:
+            merged.append(level[-1])
+        level = merged
+
+    return level[0]
+
+
+def decay_weights(timestamp, last, half_life):
+    """Return exponential-forgetting factors for data observed at
+    `timestamp` that is added to counts last updated at `last`.  Arguments
+    are scalars or arrays; `last` is `-inf` for counts never updated.
+
+    Returns:
+    --------
+    decay: factor for the existing counts, :math:`2^{-(t - t_{last})/h}` if
+        `timestamp` is later than `last`, else 1.
+    weight: factor for the new data, :math:`2^{-(t_{last} - t)/h}` for late
+        (out-of-order) data, else 1.
+    """
+    timestamp = np.asarray(timestamp, dtype=np.float64)
+    last = np.asarray(last, dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        elapsed = np.where(last == -np.inf, np.inf, timestamp - last)
+
+    decay = np.exp2(-np.maximum(elapsed, 0.)/half_life)
+    weight = np.exp2(-np.maximum(-elapsed, 0.)/half_life)
+
+    return decay, weight
+
+
+def sample_shape(size=None):
+    """Return the shape tuple for a sample of the passed `size`, which may be
+    None, an integer or a tuple of integers.
+    """
+    if size is None:
+        return ()
+
+    return tuple(int(i) for i in np.atleast_1d(size))
+
+
+@instrument('utilities.dirichlet_sample')
+def dirichlet_sample(alpha, size=None, rng=None):
+    """Draw samples from a Dirichlet distribution by normalizing a single
+    block of Gamma variates.
+
+    Arguments:
+    ----------
+    alpha: 1-d array of Dirichlet hyperparameters (length K).
+    size: None, an integer or a tuple; the number (shape) of draws.
+    rng: None, a seed or a `numpy.random.Generator`.
+
+    Returns:
+    --------
+    sample: array with shape `size + (K,)`; rows sum to one.
+    """
+    alpha = np.asarray(alpha, dtype=np.float64)
+    rng = random_generator(rng)
+    sample = rng.standard_gamma(alpha, size=sample_shape(size) + alpha.shape)
+    total = sample.sum(axis=-1, keepdims=True)
+    _redraw_underflow(sample, total, alpha, rng)
+    sample /= total
+
+    return sample
+
+
+def _redraw_underflow(sample, total, alpha, rng):
+    """Redraw, in place, rows of Gamma variates `sample` whose `total` is
+    zero because every variate underflowed, as happens for very small
+    `alpha`.  The rows are drawn in log space, using
+    :math:`G_a = G_{a+1} U^{1/a}`, and rescaled so that their largest
+    variate is one; `total` is updated to match.
+    """
+    empty = total[..., 0] == 0.
+    if not np.any(empty):
+        return
+
+    a = np.broadcast_to(alpha, sample.shape)[empty]
+    log = (np.log(rng.standard_gamma(a + 1.)) +
+           np.log1p(-rng.random(a.shape))/a)
+    log -= log.max(axis=-1, keepdims=True)
+    rows = np.exp(log)
+    sample[empty] = rows
+    total[empty] = rows.sum(axis=-1, keepdims=True)
+
+
+class CredibleRegionCache(object):
+    """Bounded least-recently-used (LRU) cache for credible regions.
+
+    Regions are keyed on region type, distribution family, distribution
+    parameters and confidence, so posteriors that share parameters -- or
+    that have not changed since the last query -- share one computation.
+    A `maxsize` of zero, the default, disables the cache.  The cache is
+    guarded by a lock so that threads can share it; regions are computed
+    outside the lock.
+    """
+
+    def __init__(self, maxsize=0):
+        """Initialize an instance of the CredibleRegionCache class.
+
+        Arguments:
+        ----------
+        maxsize: maximum number of cached regions, default 0 (disabled).
+        """
+        self._lock = threading.Lock()
+        self._regions = OrderedDict()
+        self._maxsize = 0
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._regions)
+
+    @property
+    def maxsize(self):
+        """Maximum number of cached regions; zero disables the cache."""
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize):
+        maxsize = int(maxsize)
+        if maxsize < 0:
+            raise ConjugateParameterException('Cache size must be '
+                                              'non-negative!')
+
+        with self._lock:
+            self._maxsize = maxsize
+            while len(self._regions) > maxsize:
+                self._regions.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached regions and reset the statistics."""
+        with self._lock:
+            self._regions.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Return a dict with hits, misses, current size and maxsize."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._regions), 'maxsize': self._maxsize}
+
+    def region(self, kind, family, parameters, confidence, compute):
+        """Return the cached region, calling `compute()` on a miss.
+
+        Arguments:
+        ----------
+        kind: region type, e.g. 'ccr' or 'hdcr'.
+        family: distribution family, e.g. 'beta'.
+        parameters: sequence of distribution parameters.
+        confidence: probability associated with region.
+        compute: callable with no arguments returning the region.
+
+        Returns:
+        --------
+        region: array with lower- and upper-bounds of region (a copy).
+        """
+        if self._maxsize == 0:
+            return np.asarray(compute())
+
+        key = (kind, family, tuple(float(p) for p in parameters),
+               float(confidence))
+        with self._lock:
+            region = self._regions.pop(key, None)
+            if region is not None:
+                self.hits += 1
+                # mark as most recently used
+                self._regions[key] = region
+
+                return region.copy()
+
+            self.misses += 1
+
+        region = np.array(compute())
+        with self._lock:
+            self._regions[key] = region
+            while len(self._regions) > self._maxsize:
+                self._regions.popitem(last=False)
+
+        return region.copy()
+
+
+# cache shared by all posteriors in the package; opt in by setting maxsize
+credible_region_cache = CredibleRegionCache()
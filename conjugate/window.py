@@ -0,0 +1,184 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+window.py
+
+Sliding-window posteriors: only data observed during the last `window` time
+units contributes to the posterior.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import math
+import time
+
+import numpy as np
+
+from .binomial import BinomialBeta
+from .binomial import bernoulli_counts
+from .multinomial import MultinomialDirichlet
+
+from .exceptions import ConjugateDataException
+from .exceptions import ConjugateParameterException
+
+
+class SlidingWindow(object):
+    """Keep a BinomialBeta or MultinomialDirichlet posterior restricted to
+    the data of the last `window` time units.
+
+    Data is counted in `n_buckets` buckets of width `window/n_buckets` held
+    in a ring buffer.  The wrapped `posterior` always holds the totals of
+    the live buckets, so queries go straight to it; new data is passed to
+    its `add_data` method, and advancing the window past a non-empty bucket
+    resets its `data` to the sum of the live buckets, at a cost that does
+    not depend on the number of events.  Call `advance` before querying to
+    expire buckets that aged out while no data arrived.
+    """
+
+    def __init__(self, posterior, window, n_buckets=60):
+        """Initialize an instance of the SlidingWindow class.
+
+        Arguments:
+        ----------
+        posterior: BinomialBeta or MultinomialDirichlet holding the prior;
+            any data it holds is cleared.
+        window: length of the window, in the units of the timestamps.
+        n_buckets: number of buckets in the window, default 60.
+        """
+        if isinstance(posterior, BinomialBeta):
+            index = {'n': 0, 'k': 1}
+        elif isinstance(posterior, MultinomialDirichlet):
+            index = {i: n for n, i in enumerate(posterior.alphabet)}
+        else:
+            raise ConjugateParameterException('Posterior must be BinomialBeta '
+                                              'or MultinomialDirichlet!')
+
+        if getattr(posterior, 'half_life', None) is not None:
+            raise ConjugateParameterException('Posterior must not use a '
+                                              'half-life!')
+
+        if window <= 0 or int(n_buckets) <= 0:
+            raise ConjugateParameterException('Window and number of buckets '
+                                              'must be positive!')
+
+        posterior.data = {}
+        self.posterior = posterior
+        self.window = window
+        self.n_buckets = int(n_buckets)
+        self.bucket_width = window/self.n_buckets
+
+        self._index = index
+        self._buckets = np.zeros((self.n_buckets, len(index)),
+                                 dtype=np.int64)
+        self._head = None
+
+    def _bucket(self, timestamp):
+        """Return the absolute bucket number for `timestamp`."""
+        return int(math.floor(timestamp/self.bucket_width))
+
+    def _vector(self, data):
+        """Validate a data dict and return it as a vector of bucket counts."""
+        if not isinstance(data, dict):
+            raise ConjugateDataException('Passed data is not a dictionary!')
+
+        index = self._index
+        for key in data:
+            if key not in index:
+                raise ConjugateDataException('Key: {} in passed data not '
+                                             'valid!'.format(key))
+
+        values = np.asarray(list(data.values()) or [0])
+        if values.ndim != 1 or values.dtype.kind not in 'iuf':
+            raise ConjugateDataException('Passed data must be numeric '
+                                         'scalars!')
+
+        if np.any(values < 0):
+            raise ConjugateDataException('Passed negative data!')
+
+        dtype = np.float64 if values.dtype.kind == 'f' else np.int64
+        vector = np.zeros(self._buckets.shape[1], dtype=dtype)
+        for key, value in data.items():
+            vector[index[key]] = value
+
+        if isinstance(self.posterior, BinomialBeta) and vector[1] > vector[0]:
+            raise ConjugateDataException('Data has k > n -- invalid!')
+
+        return vector
+
+    def _reset(self):
+        """Set the data of the posterior to the totals of the live
+        buckets.
+        """
+        totals = self._buckets.sum(axis=0).tolist()
+        if isinstance(self.posterior, BinomialBeta):
+            self.posterior.data = {'n': totals[0], 'k': totals[1]}
+        else:
+            self.posterior.data = dict(zip(self.posterior.alphabet, totals))
+
+    def advance(self, timestamp=None):
+        """Move the window to end at `timestamp` (default: now), dropping
+        the buckets that fall out of it.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        head = self._bucket(timestamp)
+        if self._head is None:
+            self._head = head
+        elif head > self._head:
+            steps = min(head - self._head, self.n_buckets)
+            slots = (self._head + 1 + np.arange(steps)) % self.n_buckets
+            expired = np.any(self._buckets[slots])
+            self._buckets[slots] = 0
+            self._head = head
+            if expired:
+                self._reset()
+
+    def add_data(self, data, timestamp=None):
+        """Add data observed at `timestamp` (default: now), passed as for
+        the `add_data` method of the wrapped posterior.  Data older than the
+        window is ignored; invalid data raises an exception and changes
+        nothing.
+        """
+        vector = self._vector(data)
+        if timestamp is None:
+            timestamp = time.time()
+
+        self.advance(timestamp)
+        bucket = self._bucket(timestamp)
+        if bucket <= self._head - self.n_buckets:
+            return
+
+        if vector.dtype.kind == 'f' and self._buckets.dtype.kind != 'f':
+            # allow fractional counts
+            self._buckets = self._buckets.astype(np.float64)
+
+        self.posterior.add_data(data)
+        self._buckets[bucket % self.n_buckets] += vector
+
+    def add_outcomes(self, outcomes, timestamp=None):
+        """Add raw Bernoulli outcomes observed at `timestamp` to a windowed
+        BinomialBeta; see `bernoulli_counts`.
+        """
+        n, k = bernoulli_counts(outcomes)
+        self.add_data({'n': n, 'k': k}, timestamp)
+
+    def add_sequence(self, symbols, timestamp=None):
+        """Add a raw sequence of symbols observed at `timestamp` to a
+        windowed MultinomialDirichlet; see `sequence_counts`.
+        """
+        counts = self.posterior.sequence_counts(symbols)
+        alphabet = self.posterior.alphabet
+        self.add_data({alphabet[i]: counts[i].item()
+                       for i in np.flatnonzero(counts)}, timestamp)
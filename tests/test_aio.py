@@ -0,0 +1,224 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+Tests for the PosteriorIngestor class.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from conjugate import BinomialBeta
+from conjugate import ConjugateParameterException
+from conjugate import MultinomialDirichlet
+from conjugate.aio import PosteriorIngestor
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_ingest_binomial():
+    """
+    * aio: test_ingest_binomial -- queued events are applied per key in
+    batches.
+    """
+    async def main():
+        ingestor = PosteriorIngestor(BinomialBeta, batch_size=16)
+        ingestor.start()
+        for i in range(100):
+            await ingestor.put(i % 3, {'n': 1, 'k': i % 2})
+        snapshot = await ingestor.snapshot(flush=True)
+        await ingestor.stop()
+
+        return ingestor, snapshot
+
+    ingestor, snapshot = _run(main())
+
+    assert sorted(snapshot) == [0, 1, 2]
+    assert snapshot[0].data == {'n': 34, 'k': 17}
+    assert snapshot[1].data == {'n': 33, 'k': 17}
+    assert snapshot[2].data == {'n': 33, 'k': 16}
+
+    metrics = ingestor.metrics()
+    assert metrics['events_applied'] == 100
+    assert metrics['events_rejected'] == 0
+    assert metrics['queue_size'] == 0
+    assert 1 <= metrics['batches'] <= 100
+    assert metrics['last_batch_size'] <= 16
+
+
+def test_ingest_snapshot_copy():
+    """
+    * aio: test_ingest_snapshot_copy -- snapshots are copies; unknown keys
+    give the prior.
+    """
+    async def main():
+        ingestor = PosteriorIngestor(
+            lambda: MultinomialDirichlet(['a', 'b']), max_delay=0.)
+        ingestor.start()
+        await ingestor.put('x', {'a': 2})
+        before = await ingestor.snapshot('x', flush=True)
+        await ingestor.put('x', {'b': 3})
+        after = await ingestor.snapshot('x', flush=True)
+        empty = await ingestor.snapshot('y')
+        await ingestor.stop()
+
+        return before, after, empty
+
+    before, after, empty = _run(main())
+
+    assert before.data == {'a': 2, 'b': 0}
+    assert after.data == {'a': 2, 'b': 3}
+    assert empty.data == {'a': 0, 'b': 0}
+
+
+def test_ingest_rejected():
+    """
+    * aio: test_ingest_rejected -- invalid events are dropped without
+    affecting valid events of the same key.
+    """
+    async def main():
+        ingestor = PosteriorIngestor(BinomialBeta)
+        ingestor.start()
+        await ingestor.put('x', {'n': 2, 'k': 1})
+        await ingestor.put('x', {'z': 1})
+        await ingestor.put('x', {'n': -1})
+        await ingestor.put('x', [1, 0])
+        await ingestor.put('x', {'n': 'a'})
+        snapshot = await ingestor.snapshot('x', flush=True)
+        await ingestor.stop()
+
+        return ingestor, snapshot
+
+    ingestor, snapshot = _run(main())
+
+    assert snapshot.data == {'n': 2, 'k': 1}
+    assert ingestor.metrics()['events_rejected'] == 4
+    assert ingestor.metrics()['events_applied'] == 1
+
+
+def test_ingest_rejected_sum():
+    """
+    * aio: test_ingest_rejected_sum -- an inconsistent event is rejected by
+    itself and does not corrupt the posterior or drop valid events.
+    """
+    async def main():
+        ingestor = PosteriorIngestor(BinomialBeta, max_delay=0.1)
+        await ingestor.put('x', {'n': 1, 'k': 1})
+        await ingestor.put('x', {'k': 1})
+        ingestor.start()
+        snapshot = await ingestor.snapshot('x', flush=True)
+        await ingestor.stop()
+
+        return ingestor, snapshot
+
+    ingestor, snapshot = _run(main())
+
+    assert snapshot.data == {'n': 1, 'k': 1}
+    assert ingestor.metrics()['events_rejected'] == 1
+    assert ingestor.metrics()['events_applied'] == 1
+
+
+def test_ingest_non_scalar():
+    """
+    * aio: test_ingest_non_scalar -- an event with array values is rejected
+    and does not stall `flush`.
+    """
+    async def main():
+        ingestor = PosteriorIngestor(BinomialBeta)
+        ingestor.start()
+        await ingestor.put('x', {'n': np.array([1, 2]), 'k': 0})
+        await ingestor.put('x', {'n': 2, 'k': 1})
+        snapshot = await asyncio.wait_for(ingestor.snapshot('x', flush=True),
+                                          5.)
+        await ingestor.stop()
+
+        return ingestor, snapshot
+
+    ingestor, snapshot = _run(main())
+
+    assert snapshot.data == {'n': 2, 'k': 1}
+    assert ingestor.metrics()['events_rejected'] == 1
+
+
+def test_ingest_backpressure():
+    """
+    * aio: test_ingest_backpressure -- puts on a full queue wait and are
+    counted.
+    """
+    async def main():
+        ingestor = PosteriorIngestor(BinomialBeta, maxsize=4, batch_size=2)
+        producer = asyncio.ensure_future(asyncio.gather(
+            *[ingestor.put('x', {'n': 1}) for _ in range(10)]))
+        await asyncio.sleep(0)
+        blocked = ingestor.metrics()
+        ingestor.start()
+        await producer
+        await ingestor.stop()
+
+        return blocked, ingestor
+
+    blocked, ingestor = _run(main())
+
+    assert blocked['queue_size'] == 4
+    assert blocked['queue_maxsize'] == 4
+    assert blocked['blocked_puts'] == 6
+    assert ingestor.metrics()['events_applied'] == 10
+    assert ingestor._posteriors['x'].data == {'n': 10, 'k': 0}
+
+
+def test_ingest_in_place():
+    """
+    * aio: test_ingest_in_place -- batches update the stored posterior
+    instead of a copy of it.
+    """
+    async def main():
+        ingestor = PosteriorIngestor(lambda: MultinomialDirichlet(range(3)),
+                                     batch_size=4)
+        ingestor.start()
+        await ingestor.put('x', {'0': 1})
+        await ingestor.flush()
+        posterior = ingestor._posteriors['x']
+        for i in range(10):
+            await ingestor.put('x', {str(i % 3): 1})
+        await ingestor.put('x', {'0': -1})
+        await ingestor.stop()
+
+        return ingestor, posterior
+
+    ingestor, posterior = _run(main())
+
+    assert ingestor._posteriors['x'] is posterior
+    assert posterior.data == {'0': 5, '1': 3, '2': 3}
+    assert ingestor.metrics()['events_rejected'] == 1
+
+
+def test_ingest_exceptions():
+    """
+    * aio: test_ingest_exceptions -- invalid batching parameters raise
+    exceptions.
+    """
+    with pytest.raises(ConjugateParameterException):
+        PosteriorIngestor(BinomialBeta, batch_size=0)
+
+    with pytest.raises(ConjugateParameterException):
+        PosteriorIngestor(BinomialBeta, max_delay=-1.)
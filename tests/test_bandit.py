@@ -0,0 +1,134 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+Tests for the ThompsonSamplingBandit class.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import numpy as np
+import pytest
+
+from conjugate import BinomialBeta
+from conjugate import ConjugateDataException
+from conjugate import ConjugateParameterException
+from conjugate import ThompsonSamplingBandit
+
+
+@pytest.fixture
+def bandit():
+    return ThompsonSamplingBandit(4, rng=0)
+
+
+def test_select(bandit):
+    """
+    * bandit: test_select -- single and batched selections are valid arms.
+    """
+    arm = bandit.select()
+    arms = bandit.select(batch=100)
+
+    assert 0 <= arm < 4
+    assert arms.shape == (100,)
+    assert np.all((arms >= 0) & (arms < 4))
+
+
+def test_select_top(bandit):
+    """
+    * bandit: test_select_top -- top-m selections are distinct arms.
+    """
+    top = bandit.select_top(3, batch=50)
+
+    assert top.shape == (50, 3)
+    assert all(len(set(row)) == 3 for row in top.tolist())
+    assert bandit.select_top(4).shape == (4,)
+
+    with pytest.raises(ConjugateParameterException):
+        bandit.select_top(5)
+
+
+def test_update(bandit):
+    """
+    * bandit: test_update -- repeated arms accumulate.
+    """
+    bandit.update([0, 0, 2, 3], [1, 0, 1, 1])
+
+    assert list(bandit.posterior.n) == [2, 0, 1, 1]
+    assert list(bandit.posterior.k) == [1, 0, 1, 1]
+
+
+def test_update_invalid(bandit):
+    """
+    * bandit: test_update_invalid -- bad arms and outcomes are rejected
+    without changing the posteriors.
+    """
+    with pytest.raises(ConjugateDataException):
+        bandit.update([0, 4], [1, 1])
+
+    with pytest.raises(ConjugateDataException):
+        bandit.update([0, 1], [1, 2])
+
+    with pytest.raises(ConjugateDataException):
+        bandit.update([0, 1], [1])
+
+    assert np.all(bandit.posterior.n == 0)
+
+
+def test_converges(bandit):
+    """
+    * bandit: test_converges -- the best arm dominates after feedback.
+    """
+    bandit.update(np.repeat([0, 1, 2, 3], 200),
+                  np.concatenate([np.arange(200) < m
+                                  for m in (20, 60, 160, 100)]))
+
+    assert np.mean(bandit.select(batch=1000) == 2) > 0.95
+    assert bandit.probability_best(1000).argmax() == 2
+
+
+def test_probability_best_invalid(bandit):
+    """
+    * bandit: test_probability_best_invalid -- sample and chunk sizes must
+    be positive.
+    """
+    with pytest.raises(ConjugateParameterException):
+        bandit.probability_best(0)
+
+    with pytest.raises(ConjugateParameterException):
+        bandit.probability_best(100, chunk_size=0)
+
+
+def test_from_posteriors():
+    """
+    * bandit: test_from_posteriors -- arms copy BinomialBeta state.
+    """
+    posteriors = [BinomialBeta() for _ in range(3)]
+    posteriors[1].add_data({'n': 10, 'k': 7})
+    posteriors[2].prior_hyperparameters = {'alpha': 2, 'beta': 5}
+
+    bandit = ThompsonSamplingBandit.from_posteriors(posteriors)
+
+    assert list(bandit.posterior.k) == [0, 7, 0]
+    assert list(bandit.posterior.alpha) == [1, 1, 2]
+    assert list(bandit.posterior.beta) == [1, 1, 5]
+
+
+def test_half_life():
+    """
+    * bandit: test_half_life -- old rewards are forgotten.
+    """
+    bandit = ThompsonSamplingBandit(2, half_life=1.)
+    bandit.update([0, 0], [1, 1], timestamp=0.)
+    bandit.update([1], [1], timestamp=1.)
+
+    assert list(bandit.posterior.k) == [1, 1]
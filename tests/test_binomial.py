@@ -17,6 +17,7 @@ from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
                              input, int, map, next, oct, open, pow, range,
                              round, str, super, zip)
 
+import numpy as np
 import pytest
 
 from conjugate import PosteriorBase
@@ -304,3 +305,247 @@ def test_add_data_invalid_dict(binomp):
     """
     with pytest.raises(ConjugateDataException):
         binomp.add_data({'m': 10, 'k': 2})
+
+
+def test_add_data_atomic(binomp):
+    """
+    * binomial: test_add_data_atomic -- rejected data leaves the counts,
+    decay and update time unchanged.
+    """
+    binomp.add_data({'n': 1, 'k': 1})
+    for data in [{'k': 1}, {'n': 5, 'k': 1, 'm': 1}, {'n': 1, 'k': 'a'}]:
+        with pytest.raises((ConjugateDataException, TypeError)):
+            binomp.add_data(data)
+    assert binomp.data == {'n': 1, 'k': 1}
+
+    bp = BinomialBeta(half_life=1.)
+    bp.add_data({'n': 10, 'k': 0}, timestamp=0.)
+    # valid against the stored counts, but not after decaying them
+    with pytest.raises(ConjugateDataException):
+        bp.add_data({'k': 5}, timestamp=4.)
+    assert bp.data == {'n': 10, 'k': 0} and bp._timestamp == 0.
+
+
+def test_copy(binomp):
+    """
+    * binomial: test_copy -- copies do not share data or hyperparameters.
+    """
+    binomp.add_data({'n': 4, 'k': 1})
+    other = binomp.copy()
+    other.add_data({'n': 2, 'k': 2})
+    other.prior_hyperparameters['alpha'] = 3
+
+    assert binomp.data == {'n': 4, 'k': 1}
+    assert binomp.prior_hyperparameters == {'alpha': 1, 'beta': 1}
+    assert other.data == {'n': 6, 'k': 3}
+
+
+def test_posterior_sample(binomp):
+    """
+    * binomial: test_posterior_sample -- shapes, reproducibility and mean of
+    posterior samples.
+    """
+    binomp.add_data({'n': 50, 'k': 20})
+
+    sample = binomp.posterior_sample(size=(1000, 2),
+                                     rng=np.random.default_rng(7))
+    sample_p = binomp.posterior_sample_parameter(
+        'p', size=(1000, 2), rng=np.random.default_rng(7))
+
+    assert sample.shape == (1000, 2, 1)
+    assert np.array_equal(sample[..., 0], sample_p)
+    assert abs(sample.mean() - binomp.posterior_mean('p')) < 0.01
+
+
+def test_prior_sample_invalid(binomp):
+    """
+    * binomial: test_prior_sample_invalid -- (try to) sample an invalid
+    parameter.
+    """
+    with pytest.raises(ConjugateParameterException):
+        binomp.prior_sample_parameter('a', size=10)
+
+
+def test_add_outcomes_valid(binomp):
+    """
+    * binomial: test_add_outcomes_valid -- arrays, buffers, lists and
+    generators of 0/1 outcomes.
+    """
+    outcomes = np.array([0, 1, 1, 0, 1], dtype=np.uint8)
+
+    binomp.add_outcomes(outcomes)
+    binomp.add_outcomes(outcomes.astype(bool), chunk_size=2)
+    binomp.add_outcomes(outcomes.tobytes())
+    binomp.add_outcomes([1.0, 0.0])
+    binomp.add_outcomes(i % 2 for i in range(7))
+
+    assert binomp.data == {'n': 5*3 + 2 + 7, 'k': 3*3 + 1 + 3}
+
+
+def test_add_outcomes_invalid(binomp):
+    """
+    * binomial: test_add_outcomes_invalid -- values other than 0/1 are
+    rejected and the data is unchanged.
+    """
+    with pytest.raises(ConjugateDataException):
+        binomp.add_outcomes(np.array([0, 1, 2]))
+
+    with pytest.raises(ConjugateDataException):
+        binomp.add_outcomes(iter([0, -1]))
+
+    with pytest.raises(ConjugateDataException):
+        binomp.add_outcomes(np.array([0.5]))
+
+    with pytest.raises(ConjugateDataException):
+        binomp.add_outcomes(x for x in [0.5, 1.7, 0.2])
+
+    with pytest.raises(ConjugateDataException):
+        binomp.add_outcomes(iter(['a', 'b']))
+
+    assert binomp.data == {'n': 0, 'k': 0}
+
+
+def test_scipy_cache(binomp):
+    """
+    * binomial: test_scipy_cache -- frozen scipy distributions are reused
+    until data or prior hyperparameters change.
+    """
+    posterior = binomp._posterior_scipy()
+    prior = binomp._prior_scipy()
+    assert binomp._posterior_scipy() is posterior
+    assert binomp._prior_scipy() is prior
+
+    binomp.add_data({'n': 10, 'k': 4})
+    posterior = binomp._posterior_scipy()
+    assert posterior.args == (5, 7)
+    assert binomp._posterior_marginal_scipy('p') is posterior
+
+    binomp.prior_hyperparameters = {'alpha': 2, 'beta': 3}
+    assert binomp._prior_scipy().args == (2, 3)
+    assert binomp._posterior_scipy().args == (6, 9)
+
+    binomp.data = {'n': 1, 'k': 1}
+    assert binomp._posterior_scipy().args == (3, 3)
+
+    # in-place edits of the dicts are not missed
+    binomp.data['n'] += 10
+    binomp.prior_hyperparameters['alpha'] = 4
+    assert binomp._posterior_scipy().args == (5, 13)
+    assert binomp._prior_scipy().args == (4, 3)
+
+
+def test_posterior_vector_summaries(binomp):
+    """
+    * binomial: test_posterior_vector_summaries -- vector summaries agree
+    with the per-parameter methods and the structured summary.
+    """
+    binomp.add_data({'n': 12, 'k': 4})
+
+    assert np.allclose(binomp.posterior_means(), [binomp.posterior_mean('p')])
+    assert np.allclose(binomp.posterior_variances(), [5*9/(14**2*15)])
+    assert np.allclose(binomp.posterior_modes(), [4/12])
+    assert np.allclose(binomp.posterior_central_credible_regions(),
+                       [binomp.posterior_central_credible_region('p')])
+
+    summary = binomp.posterior_summary()
+    assert list(summary['parameter']) == ['p']
+    assert np.allclose(summary['hdcr_low'][0],
+                       binomp.posterior_high_density_credible_region('p')[0])
+
+
+def test_merge(binomp):
+    """
+    * binomial: test_merge -- merged data is summed and the prior counted
+    once.
+    """
+    binomp.prior_hyperparameters = {'alpha': 2, 'beta': 3}
+    binomp.add_data({'n': 10, 'k': 4})
+    other = BinomialBeta()
+    other.prior_hyperparameters = {'alpha': 2, 'beta': 3}
+    other.add_data({'n': 5, 'k': 5})
+
+    merged = binomp + other
+    assert merged.data == {'n': 15, 'k': 9}
+    assert merged.prior_hyperparameters == {'alpha': 2, 'beta': 3}
+    assert merged.posterior_mean('p') == (2+9)/(5+15)
+    assert binomp.data == {'n': 10, 'k': 4}
+
+
+def test_merge_invalid(binomp):
+    """
+    * binomial: test_merge_invalid -- priors must match.
+    """
+    other = BinomialBeta()
+    other.prior_hyperparameters = {'alpha': 2, 'beta': 1}
+
+    with pytest.raises(ConjugateParameterException):
+        binomp.merge(other)
+
+    with pytest.raises(TypeError):
+        binomp + 1
+
+
+def test_half_life():
+    """
+    * binomial: test_half_life -- counts halve every half-life and late
+    data is down-weighted.
+    """
+    bp = BinomialBeta(half_life=10.)
+    bp.add_data({'n': 8, 'k': 4}, timestamp=0.)
+    bp.add_data({'n': 2, 'k': 2}, timestamp=10.)
+    assert bp.data == {'n': 6., 'k': 4.}
+
+    bp.add_data({'n': 4, 'k': 0}, timestamp=0.)
+    assert bp.data == {'n': 8., 'k': 4.}
+
+    bp.decay_to(30.)
+    assert bp.data == {'n': 2., 'k': 1.}
+    assert bp.posterior_mean('p') == (1+1)/(2+2)
+
+    other = BinomialBeta(half_life=10.)
+    other.add_data({'n': 4, 'k': 4}, timestamp=40.)
+    assert (bp + other).data == {'n': 5., 'k': 4.5}
+
+    with pytest.raises(ConjugateParameterException):
+        bp.merge(BinomialBeta())
+
+
+def test_half_life_query():
+    """
+    * binomial: test_half_life_query -- queries with a timestamp use the
+    decayed counts without changing the stored ones.
+    """
+    bp = BinomialBeta(half_life=10.)
+    bp.add_data({'n': 8, 'k': 6}, timestamp=0.)
+
+    assert bp.posterior_mean('p', timestamp=10.) == (1+3)/(2+4)
+    assert bp.posterior_mean('p', timestamp=-5.) == bp.posterior_mean('p')
+    decayed = BinomialBeta()
+    decayed.add_data({'n': 2., 'k': 1.5})
+    assert bp.posterior_central_credible_region('p', timestamp=20.) == \
+        decayed.posterior_central_credible_region('p')
+    assert bp.posterior_summary(timestamp=20.)['mean'][0] == 0.625
+    assert bp.data == {'n': 8, 'k': 6}
+
+    assert BinomialBeta().posterior_mean('p', timestamp=10.) == 0.5
+
+
+def test_posterior_predictive(binomp):
+    """
+    * binomial: test_posterior_predictive -- Beta-Binomial predictive pmf,
+    moments and sample.
+    """
+    binomp.prior_hyperparameters = {'alpha': 2, 'beta': 3}
+    binomp.add_data({'n': 10, 'k': 4})
+    k = np.arange(21)
+    pmf = binomp.posterior_predictive_pmf(k, 20)
+
+    assert np.isclose(pmf.sum(), 1.)
+    assert np.isclose((k*pmf).sum(), binomp.posterior_predictive_mean(20))
+    assert np.isclose((k**2*pmf).sum() - (k*pmf).sum()**2,
+                      binomp.posterior_predictive_variance(20))
+    assert np.isclose(binomp.posterior_predictive_mean(20), 20*6./15.)
+
+    sample = binomp.posterior_predictive_sample([5, 20], size=1000, rng=0)
+    assert sample.shape == (1000, 2)
+    assert np.all((sample >= 0) & (sample <= [5, 20]))
@@ -0,0 +1,250 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+Tests for the BinomialBetaArray class.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import numpy as np
+import pytest
+
+from conjugate import BinomialBeta
+from conjugate import BinomialBetaArray
+from conjugate import ConjugateDataException
+from conjugate import ConjugateParameterException
+
+
+@pytest.fixture
+def binomarr():
+    return BinomialBetaArray(3)
+
+
+def test_instantiate(binomarr):
+    """
+    * binomial array: test_instantiate -- default priors and empty data.
+    """
+    assert len(binomarr) == 3
+    assert np.all(binomarr.alpha == 1) and np.all(binomarr.beta == 1)
+    assert np.all(binomarr.n == 0) and np.all(binomarr.k == 0)
+
+
+def test_prior_hyperparameters_invalid(binomarr):
+    """
+    * binomial array: test_prior_hyperparameters_invalid -- negative and
+    wrongly-shaped hyperparameters are rejected.
+    """
+    with pytest.raises(ConjugateParameterException):
+        binomarr.prior_hyperparameters = {'alpha': [1, -1, 1], 'beta': 1}
+
+    with pytest.raises(ConjugateParameterException):
+        binomarr.prior_hyperparameters = {'alpha': [1, 2], 'beta': 1}
+
+
+def test_add_data_valid(binomarr):
+    """
+    * binomial array: test_add_data_valid -- add data to all rows.
+    """
+    binomarr.add_data({'n': [5, 10, 0], 'k': [2, 10, 0]})
+    binomarr.add_data({'n': [1, 1, 1], 'k': [1, 0, 0]})
+
+    assert list(binomarr.n) == [6, 11, 1]
+    assert list(binomarr.k) == [3, 10, 0]
+
+
+def test_add_data_index(binomarr):
+    """
+    * binomial array: test_add_data_index -- repeated rows accumulate.
+    """
+    binomarr.add_data({'n': [1, 1, 1], 'k': [1, 0, 1]}, index=[0, 2, 0])
+
+    assert list(binomarr.n) == [2, 0, 1]
+    assert list(binomarr.k) == [2, 0, 0]
+
+
+def test_add_data_invalid(binomarr):
+    """
+    * binomial array: test_add_data_invalid -- k > n, bad keys and non-dict
+    data are rejected without changing state.
+    """
+    with pytest.raises(ConjugateDataException):
+        binomarr.add_data({'n': [1, 1, 1], 'k': [2, 0, 0]})
+
+    with pytest.raises(ConjugateDataException):
+        binomarr.add_data({'m': [1, 1, 1]})
+
+    with pytest.raises(ConjugateDataException):
+        binomarr.add_data([0, 1, 1])
+
+    with pytest.raises(ConjugateDataException):
+        binomarr.add_data({'n': 2.5, 'k': 1})
+
+    with pytest.raises(ConjugateDataException):
+        binomarr.add_data({'n': 'a'})
+
+    with pytest.raises(ConjugateDataException):
+        binomarr.add_data({'n': 1}, index=[5])
+
+    with pytest.raises(ConjugateDataException):
+        binomarr.add_data({'n': 1}, index=[-1])
+
+    assert np.all(binomarr.n == 0) and np.all(binomarr.k == 0)
+
+    # integer-valued floats are accepted as counts
+    binomarr.add_data({'n': 2.0, 'k': 1.0}, index=[2])
+    assert list(binomarr.n) == [0, 0, 2] and binomarr.n.dtype == np.int64
+
+
+def test_posterior_mean_valid(binomarr):
+    """
+    * binomial array: test_posterior_mean_valid -- matches BinomialBeta.
+    """
+    binomarr.add_data({'n': [5, 10, 0], 'k': [2, 9, 0]})
+    means = binomarr.posterior_mean('p')
+
+    assert np.allclose(means, [(1+2)/(2+5), (1+9)/(2+10), 1/2])
+
+
+def test_posterior_mean_invalid(binomarr):
+    """
+    * binomial array: test_posterior_mean_invalid -- bad parameter name.
+    """
+    with pytest.raises(ConjugateParameterException):
+        binomarr.posterior_mean('a')
+
+
+def test_posterior_credible_regions(binomarr):
+    """
+    * binomial array: test_posterior_credible_regions -- ccr and hdcr agree
+    with the single-posterior BinomialBeta class.
+    """
+    data = {'n': [5, 10, 40], 'k': [2, 9, 3]}
+    binomarr.add_data(data)
+    ccr = binomarr.posterior_central_credible_region('p')
+    hdcr = binomarr.posterior_high_density_credible_region('p')
+
+    assert ccr.shape == (3, 2) and hdcr.shape == (3, 2)
+    for i in range(3):
+        bp = BinomialBeta()
+        bp.add_data({'n': data['n'][i], 'k': data['k'][i]})
+        assert np.allclose(ccr[i], bp.posterior_central_credible_region('p'))
+        assert np.allclose(hdcr[i],
+                           bp.posterior_high_density_credible_region('p'),
+                           atol=1e-6)
+
+
+def test_posterior_sample(binomarr):
+    """
+    * binomial array: test_posterior_sample -- shape and reproducibility.
+    """
+    binomarr.add_data({'n': [5, 10, 40], 'k': [2, 9, 3]})
+    s1 = binomarr.posterior_sample(size=4, rng=np.random.default_rng(1))
+    s2 = binomarr.posterior_sample(size=4, rng=np.random.default_rng(1))
+
+    assert s1.shape == (4, 3)
+    assert np.array_equal(s1, s2)
+    assert np.all((s1 > 0) & (s1 < 1))
+
+
+def test_merge(binomarr):
+    """
+    * binomial array: test_merge -- rows are summed; sizes must match.
+    """
+    binomarr.add_data({'n': [5, 10, 0], 'k': [2, 9, 0]})
+    other = BinomialBetaArray(3)
+    other.add_data({'n': [1, 0, 4], 'k': [1, 0, 2]})
+
+    merged = binomarr + other
+    assert list(merged.n) == [6, 10, 4]
+    assert list(merged.k) == [3, 9, 2]
+
+    with pytest.raises(ConjugateParameterException):
+        binomarr.merge(BinomialBetaArray(2))
+
+
+def test_getitem(binomarr):
+    """
+    * binomial array: test_getitem -- integers give BinomialBeta copies,
+    slices give views.
+    """
+    binomarr.add_data({'n': [5, 10, 0], 'k': [2, 9, 0]})
+
+    bp = binomarr[1]
+    assert isinstance(bp, BinomialBeta)
+    assert bp.data == {'n': 10, 'k': 9}
+
+    view = binomarr[1:]
+    view.add_data({'n': 1, 'k': 1})
+    assert len(view) == 2
+    assert list(binomarr.n) == [5, 11, 1]
+
+
+def test_half_life():
+    """
+    * binomial array: test_half_life -- only updated rows are decayed;
+    decay_to ages idle rows.
+    """
+    binomarr = BinomialBetaArray(3, half_life=10.)
+    binomarr.add_data({'n': [4, 4, 4], 'k': [2, 2, 2]}, timestamp=0.)
+    binomarr.add_data({'n': 2, 'k': 2}, index=[0, 0], timestamp=[10., 0.])
+
+    # row 0: 4 decayed to 2, plus 2 at t=10 and 2 at t=0 (weight 1/2)
+    assert list(binomarr.n) == [5, 4, 4]
+    assert list(binomarr.k) == [4, 2, 2]
+
+    binomarr.decay_to(20., index=[1])
+    assert list(binomarr.n) == [5, 1, 4]
+
+    binomarr.decay_to(10.)
+    assert list(binomarr.n) == [5, 1, 2]
+    assert binomarr[0].data == {'n': 5., 'k': 4.}
+
+
+def test_half_life_query():
+    """
+    * binomial array: test_half_life_query -- queries decay each row from
+    its own update time without changing the stored counts.
+    """
+    binomarr = BinomialBetaArray(2, half_life=10.)
+    binomarr.add_data({'n': [4, 4], 'k': [4, 0]}, timestamp=[0., 10.])
+
+    means = binomarr.posterior_mean('p', timestamp=10.)
+    assert np.allclose(means, [(1+2)/(2+2), 1/(2+4)])
+    assert binomarr.posterior_high_density_credible_region(
+        'p', timestamp=[10., 10.]).shape == (2, 2)
+    assert list(binomarr.n) == [4, 4]
+
+
+def test_posterior_predictive(binomarr):
+    """
+    * binomial array: test_posterior_predictive -- predictive pmf of each
+    row matches the BinomialBeta row.
+    """
+    binomarr.add_data({'n': [10, 3, 0], 'k': [4, 3, 0]})
+    k = np.arange(6)[:, np.newaxis]
+    logpmf = binomarr.posterior_predictive_logpmf(k, 5)
+
+    assert logpmf.shape == (6, 3)
+    for i in range(3):
+        assert np.allclose(logpmf[:, i],
+                           binomarr[i].posterior_predictive_logpmf(k[:, 0],
+                                                                   5))
+
+    assert np.allclose(binomarr.posterior_predictive_pmf(k, 5).sum(axis=0),
+                       1.)
+    assert np.allclose(binomarr.posterior_predictive_mean(5),
+                       5*binomarr.posterior_mean('p'))
+    assert binomarr.posterior_predictive_variance(5).shape == (3,)
+    assert binomarr.posterior_predictive_sample(5, size=(4, 2),
+                                                rng=0).shape == (4, 2, 3)
@@ -0,0 +1,118 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+Tests for the ConcurrentPosteriors class.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import threading
+
+import pytest
+
+from conjugate import BinomialBeta
+from conjugate import ConcurrentPosteriors
+from conjugate import ConjugateDataException
+from conjugate import ConjugateParameterException
+from conjugate import MultinomialDirichlet
+
+
+@pytest.fixture
+def posteriors():
+    return ConcurrentPosteriors(BinomialBeta, n_stripes=4)
+
+
+def test_threaded_updates(posteriors):
+    """
+    * collection: test_threaded_updates -- concurrent updates of shared keys
+    are not lost.
+    """
+    def worker(seed):
+        for i in range(2000):
+            posteriors.add_data((seed + i) % 10, {'n': 1, 'k': i % 2})
+
+    threads = [threading.Thread(target=worker, args=(s,)) for s in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    snapshot = posteriors.snapshot_all()
+    assert len(posteriors) == 10
+    assert sorted(posteriors.keys()) == list(range(10))
+    assert sum(bp.data['n'] for bp in snapshot.values()) == 16000
+    assert sum(bp.data['k'] for bp in snapshot.values()) == 8000
+
+
+def test_snapshot_copy(posteriors):
+    """
+    * collection: test_snapshot_copy -- snapshots are copies; unknown keys
+    give the prior.
+    """
+    posteriors.add_data('x', {'n': 3, 'k': 1})
+    snapshot = posteriors.snapshot('x')
+    posteriors.add_data('x', {'n': 1, 'k': 1})
+
+    assert snapshot.data == {'n': 3, 'k': 1}
+    assert posteriors.snapshot('x').data == {'n': 4, 'k': 2}
+    assert posteriors.snapshot('y').data == {'n': 0, 'k': 0}
+    assert 'x' in posteriors
+    assert 'y' not in posteriors
+
+
+def test_update_multinomial():
+    """
+    * collection: test_update_multinomial -- `update` runs arbitrary
+    methods under the stripe lock.
+    """
+    posteriors = ConcurrentPosteriors(
+        lambda: MultinomialDirichlet(['a', 'b']))
+    posteriors.update('x', lambda mp: mp.add_sequence('abba'))
+    mean = posteriors.update('x', lambda mp: mp.posterior_mean('p_a'))
+
+    assert posteriors.snapshot('x').data == {'a': 2, 'b': 2}
+    assert mean == pytest.approx(0.5)
+
+
+def test_snapshot_copies():
+    """
+    * collection: test_snapshot_copies -- snapshots are independent of
+    later updates but share the read-only name indexes.
+    """
+    posteriors = ConcurrentPosteriors(
+        lambda: MultinomialDirichlet(['a', 'b']))
+    posteriors.add_data('x', {'a': 1})
+    posteriors.add_data('y', {'b': 2})
+    snapshot = posteriors.snapshot_all()
+    posteriors.add_data('x', {'a': 5})
+    snapshot['y'].add_data({'a': 3})
+    live = posteriors.snapshot('x')
+
+    assert snapshot['x'].data == {'a': 1, 'b': 0}
+    assert posteriors.snapshot('y').data == {'a': 0, 'b': 2}
+    assert live.data == {'a': 6, 'b': 0}
+    assert live._index is snapshot['x']._index
+    assert live.posterior_mean('p_a') == 7/8
+
+
+def test_collection_exceptions(posteriors):
+    """
+    * collection: test_collection_exceptions -- invalid stripes and data
+    raise exceptions.
+    """
+    with pytest.raises(ConjugateParameterException):
+        ConcurrentPosteriors(BinomialBeta, n_stripes=0)
+
+    with pytest.raises(ConjugateDataException):
+        posteriors.add_data('x', [1, 0])
@@ -0,0 +1,43 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+Tests for package import side effects.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import subprocess
+import sys
+
+
+def _modules_after_import():
+    """Return the module names loaded by `import conjugate` in a fresh
+    interpreter.
+    """
+    code = ('import sys; import conjugate; '
+            'print("\\n".join(sorted(sys.modules)))')
+    output = subprocess.check_output([sys.executable, '-c', code])
+
+    return set(output.decode('utf-8').split())
+
+
+def test_import_lazy():
+    """
+    * imports: test_import_lazy -- `import conjugate` must not load
+    matplotlib or scipy; both are imported on first use.
+    """
+    modules = _modules_after_import()
+
+    assert 'matplotlib' not in modules
+    assert 'scipy' not in modules
@@ -0,0 +1,79 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+Tests for the instrumentation module.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import pytest
+
+from conjugate import BinomialBeta
+from conjugate import MultinomialDirichlet
+from conjugate import credible_region_cache
+from conjugate import instrumentation
+
+
+@pytest.fixture
+def binom():
+    bp = BinomialBeta()
+    bp.add_data({'n': 20, 'k': 7})
+    return bp
+
+
+def test_disabled_by_default(binom):
+    """
+    * instrumentation: test_disabled_by_default -- nothing is recorded unless
+    instrumentation is enabled.
+    """
+    instrumentation.reset()
+    binom.posterior_mean('p')
+
+    assert not instrumentation.is_enabled()
+    assert instrumentation.snapshot() == {}
+
+
+def test_instrumented_counts(binom):
+    """
+    * instrumentation: test_instrumented_counts -- public methods, private
+    scipy builders and utilities are counted inside the context manager.
+    """
+    credible_region_cache.clear()
+    with instrumentation.instrumented() as stats:
+        binom.posterior_mean('p')
+        binom.posterior_mean('p')
+        binom.posterior_high_density_credible_region('p')
+        binom._posterior_marginal_scipy('p')
+
+    assert not instrumentation.is_enabled()
+    assert stats['BinomialBeta.posterior_mean']['calls'] == 2
+    assert 'BinomialBeta._posterior_marginal_scipy' in stats
+    assert 'utilities.beta_high_density_credible_region' in stats
+
+    summary = stats['BinomialBeta.posterior_mean']
+    assert set(summary) == {'calls', 'total', 'mean', 'p50', 'p90', 'p99',
+                            'max'}
+    assert 0 <= summary['p50'] <= summary['p99'] <= summary['max']
+
+
+def test_instrumented_subclass_names():
+    """
+    * instrumentation: test_instrumented_subclass_names -- methods are
+    recorded under the name of the class defining them.
+    """
+    mp = MultinomialDirichlet(['a', 'b'])
+    with instrumentation.instrumented() as stats:
+        mp.add_data({'a': 1, 'b': 2})
+
+    assert stats['MultinomialDirichlet.add_data']['calls'] == 1
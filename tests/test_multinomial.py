@@ -17,12 +17,14 @@ from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
                              input, int, map, next, oct, open, pow, range,
                              round, str, super, zip)
 
+import numpy as np
 import pytest
 
 from conjugate import PosteriorBase
 from conjugate import MultinomialDirichlet
 from conjugate import ConjugateDataException
 from conjugate import ConjugateParameterException
+from conjugate import merge_posteriors
 
 
 @pytest.fixture
@@ -350,3 +352,384 @@ def test_prior_mean_valid02(setup):
             assert multinomp.prior_mean(p) == 3/6
         else:
             assert multinomp.prior_mean(p) == 1/6
+
+
+def test_array_backing(setup):
+    """
+    * multinomial: test_array_backing -- counts and alpha arrays stay
+    aligned with the alphabet and the dict views.
+    """
+    multinomp = setup['multinomp']
+
+    multinomp.prior_hyperparameters = {'a_b': 3}
+    multinomp.add_data({'a': 10, 'c': 5})
+    multinomp.add_data({'c': 1})
+
+    assert list(multinomp.alpha) == [1, 3, 1, 1]
+    assert list(multinomp.counts) == [10, 0, 6, 0]
+    assert multinomp.data == {'a': 10, 'b': 0, 'c': 6, 'd': 0}
+
+
+def test_posterior_mean_valid01(setup):
+    """
+    * multinomial: test_posterior_mean_valid01 -- simple test of posterior
+    mean...
+    """
+    multinomp = setup['multinomp']
+
+    multinomp.data = {'a': 10, 'b': 0, 'c': 5, 'd': 1}
+    multinomp.prior_hyperparameters = {'a_a': 3}
+
+    assert multinomp.posterior_mean('p_a') == (3+10)/(6+16)
+    assert multinomp.posterior_mean('p_b') == 1/(6+16)
+
+
+def test_add_data_invalid_unchanged(setup):
+    """
+    * multinomial: test_add_data_invalid_unchanged -- invalid data leaves
+    the counts unchanged.
+    """
+    multinomp = setup['multinomp']
+
+    with pytest.raises(ConjugateDataException):
+        multinomp.add_data({'a': 10, 'b': -1})
+
+    assert multinomp.data == {'a': 0, 'b': 0, 'c': 0, 'd': 0}
+
+
+def test_posterior_sample(setup):
+    """
+    * multinomial: test_posterior_sample -- Dirichlet draws have the right
+    shape, sum to one and match the posterior means.
+    """
+    multinomp = setup['multinomp']
+    multinomp.data = {'a': 10, 'b': 0, 'c': 5, 'd': 1}
+
+    sample = multinomp.posterior_sample(size=20000,
+                                        rng=np.random.default_rng(3))
+    means = [multinomp.posterior_mean(p) for p in multinomp]
+
+    assert sample.shape == (20000, 4)
+    assert np.allclose(sample.sum(axis=1), 1.0)
+    assert np.allclose(sample.mean(axis=0), means, atol=0.005)
+
+
+def test_prior_sample_parameter(setup):
+    """
+    * multinomial: test_prior_sample_parameter -- marginal Beta draws.
+    """
+    multinomp = setup['multinomp']
+    multinomp.prior_hyperparameters = {'a_a': 3}
+
+    sample = multinomp.prior_sample_parameter('p_a', size=(100, 3))
+
+    assert sample.shape == (100, 3)
+    with pytest.raises(ConjugateParameterException):
+        multinomp.prior_sample_parameter('p_nonsense')
+
+
+def test_add_sequence_valid(setup):
+    """
+    * multinomial: test_add_sequence_valid -- lists, string arrays, bytes
+    and memoryviews of raw symbols.
+    """
+    multinomp = setup['multinomp']
+
+    multinomp.add_sequence(['a', 'b', 'a', 'd'])
+    multinomp.add_sequence(np.array(['c', 'c', 'a']))
+    multinomp.add_sequence(b'abba')
+    multinomp.add_sequence(memoryview(b'dd'))
+
+    assert multinomp.data == {'a': 5, 'b': 3, 'c': 2, 'd': 3}
+
+
+def test_add_sequence_integers():
+    """
+    * multinomial: test_add_sequence_integers -- integer tokens are matched
+    to the alphabet entries str(token).
+    """
+    multinomp = MultinomialDirichlet(range(5))
+
+    multinomp.add_sequence(np.array([0, 4, 4, 2]))
+    multinomp.add_sequence([1, 4])
+    multinomp.add_sequence(np.array([3, 10**12]) % 10**12)
+
+    assert list(multinomp.counts) == [2, 1, 1, 1, 3]
+
+    with pytest.raises(ConjugateDataException):
+        multinomp.add_sequence(np.array([1, 5]))
+
+    with pytest.raises(ConjugateDataException):
+        multinomp.add_sequence(np.array([-1]))
+
+
+def test_add_sequence_invalid(setup):
+    """
+    * multinomial: test_add_sequence_invalid -- unknown symbols are
+    rejected in bulk and the counts are unchanged.
+    """
+    multinomp = setup['multinomp']
+
+    with pytest.raises(ConjugateDataException):
+        multinomp.add_sequence(['a', 'b', 'z'])
+
+    with pytest.raises(ConjugateDataException):
+        multinomp.add_sequence(b'abz')
+
+    assert list(multinomp.counts) == [0, 0, 0, 0]
+
+
+def test_scipy_cache(setup):
+    """
+    * multinomial: test_scipy_cache -- frozen scipy marginals are reused
+    until data or prior hyperparameters change.
+    """
+    multinomp = setup['multinomp']
+
+    posterior = multinomp._posterior_marginal_scipy('p_a')
+    assert multinomp._posterior_marginal_scipy('p_a') is posterior
+    assert multinomp._posterior_marginal_scipy('p_b') is not posterior
+
+    multinomp.add_data({'a': 2})
+    assert multinomp._posterior_marginal_scipy('p_a').args == (3, 3)
+
+    multinomp.add_sequence('bb')
+    assert multinomp._posterior_marginal_scipy('p_a').args == (3, 5)
+
+    multinomp.prior_hyperparameters = {'a_a': 2}
+    assert multinomp._prior_marginal_scipy('p_a').args == (2, 3)
+    assert multinomp._posterior_marginal_scipy('p_a').args == (4, 5)
+
+    multinomp.data = {'a': 0}
+    assert multinomp._posterior_marginal_scipy('p_a').args == (2, 3)
+
+    # stale entries are dropped on update and the cache is bounded
+    multinomp.add_data({'b': 1})
+    assert len(multinomp._scipy_cache) == 0
+
+    big = MultinomialDirichlet(range(100))
+    for parameter in big:
+        big._posterior_marginal_scipy(parameter)
+    assert len(big._scipy_cache) == big._scipy_cache_size
+
+
+def test_arrays_read_only(setup):
+    """
+    * multinomial: test_arrays_read_only -- alpha and counts can only be
+    changed through the setters and add_* methods.
+    """
+    multinomp = setup['multinomp']
+
+    with pytest.raises(ValueError):
+        multinomp.counts[0] = 1
+
+    with pytest.raises(ValueError):
+        multinomp.alpha[0] = 2
+
+
+def test_totals(setup):
+    """
+    * multinomial: test_totals -- hyperparameter and observation totals
+    follow the setters and add_* methods.
+    """
+    multinomp = setup['multinomp']
+
+    multinomp.prior_hyperparameters = {'a_a': 3, 'a_d': 0.5}
+    multinomp.add_data({'a': 2, 'b': 5})
+    multinomp.add_sequence('ccd')
+    assert multinomp._A == multinomp.alpha.sum() == 5.5
+    assert multinomp._N == multinomp.counts.sum() == 10
+
+    multinomp.data = {'c': 1.5}
+    assert multinomp._N == 1.5
+    assert multinomp.posterior_mean('p_c') == (1+1.5)/(5.5+1.5)
+
+
+def test_dict_views(setup):
+    """
+    * multinomial: test_dict_views -- item assignment on data and
+    prior_hyperparameters writes through to the posterior.
+    """
+    multinomp = setup['multinomp']
+    multinomp.add_data({'a': 1, 'b': 2})
+
+    multinomp.prior_hyperparameters['a_a'] = 5
+    multinomp.data['a'] = 4
+    multinomp.data['c'] += 0.5
+    assert multinomp.prior_hyperparameters['a_a'] == 5
+    assert multinomp.data == {'a': 4, 'b': 2, 'c': 0.5, 'd': 0}
+    assert multinomp._A == 8 and multinomp._N == 6.5
+    assert multinomp.posterior_mean('p_a') == (5+4)/(8+6.5)
+
+    multinomp.data = multinomp.data
+    assert multinomp._N == 6.5
+
+    with pytest.raises(ConjugateDataException):
+        multinomp.data['a'] = -1
+
+    with pytest.raises(ConjugateDataException):
+        multinomp.data['z'] = 1
+
+    with pytest.raises(ConjugateParameterException):
+        multinomp.prior_hyperparameters['a_b'] = 0
+
+    with pytest.raises(TypeError):
+        del multinomp.data['a']
+
+    assert multinomp.data == {'a': 4, 'b': 2, 'c': 0.5, 'd': 0}
+
+
+def test_posterior_vector_summaries(setup):
+    """
+    * multinomial: test_posterior_vector_summaries -- vector summaries are
+    aligned with distribution_parameter_names and agree with the
+    per-parameter methods.
+    """
+    multinomp = setup['multinomp']
+    multinomp.add_data({'a': 10, 'b': 3, 'c': 0, 'd': 1})
+    names = multinomp.distribution_parameter_names
+
+    assert np.allclose(multinomp.posterior_means(),
+                       [multinomp.posterior_mean(p) for p in names])
+    assert np.isclose(multinomp.posterior_means().sum(), 1.)
+
+    ccr = multinomp.posterior_central_credible_regions(0.9)
+    hdcr = multinomp.posterior_high_density_credible_regions(0.9)
+    assert ccr.shape == hdcr.shape == (4, 2)
+    for i, p in enumerate(names):
+        assert np.allclose(
+            ccr[i], multinomp.posterior_central_credible_region(p, 0.9))
+        assert np.allclose(
+            hdcr[i], multinomp.posterior_high_density_credible_region(p, 0.9))
+
+    # marginal of p_c is Beta(1, 17): mode at zero
+    modes = multinomp.posterior_modes()
+    assert np.allclose(modes, [10/16, 3/16, 0., 1/16])
+
+    summary = multinomp.posterior_summary(0.9)
+    assert list(summary['parameter']) == names
+    assert np.allclose(summary['variance'],
+                       multinomp.posterior_variances())
+
+
+def test_underscore_symbols():
+    """
+    * multinomial: test_underscore_symbols -- symbols containing '_' are
+    resolved to the right parameter.
+    """
+    multinomp = MultinomialDirichlet(['new', 'new_user', 'old_user'])
+    multinomp.add_data({'new': 1, 'new_user': 5, 'old_user': 0})
+
+    assert 'p_new_user' in multinomp
+    assert 'p_user' not in multinomp
+    assert [] not in multinomp
+    assert multinomp.posterior_mean('p_new_user') == 6/9
+    assert multinomp.posterior_mean('p_new') == 2/9
+
+    with pytest.raises(ConjugateParameterException):
+        multinomp.posterior_mean('p_user')
+
+
+def test_merge(setup):
+    """
+    * multinomial: test_merge -- shards merged with merge_posteriors equal
+    one posterior fed all the data.
+    """
+    multinomp = setup['multinomp']
+    multinomp.prior_hyperparameters = {'a_b': 2}
+    multinomp.add_sequence('aabcdddab')
+
+    shards = []
+    for part in ['aab', 'cd', 'dd', 'ab']:
+        shard = MultinomialDirichlet(multinomp.alphabet)
+        shard.prior_hyperparameters = {'a_b': 2}
+        shard.add_sequence(part)
+        shards.append(shard)
+
+    merged = merge_posteriors(shards)
+    assert merged.data == multinomp.data
+    assert merged.prior_hyperparameters == multinomp.prior_hyperparameters
+    assert np.allclose(merged.posterior_means(), multinomp.posterior_means())
+    assert (shards[0] + shards[1]).data == {'a': 2, 'b': 1, 'c': 1, 'd': 1}
+
+
+def test_merge_invalid(setup):
+    """
+    * multinomial: test_merge_invalid -- alphabets and priors must match.
+    """
+    multinomp = setup['multinomp']
+
+    with pytest.raises(ConjugateParameterException):
+        multinomp.merge(MultinomialDirichlet(['a', 'b']))
+
+    other = MultinomialDirichlet(multinomp.alphabet)
+    other.prior_hyperparameters = {'a_a': 5}
+    with pytest.raises(ConjugateParameterException):
+        multinomp.merge(other)
+
+    with pytest.raises(ConjugateParameterException):
+        merge_posteriors([])
+
+
+def test_half_life():
+    """
+    * multinomial: test_half_life -- counts and totals decay toward the
+    prior.
+    """
+    multinomp = MultinomialDirichlet(['a', 'b'], half_life=1.)
+    multinomp.add_data({'a': 8}, timestamp=0.)
+    multinomp.add_sequence('bb', timestamp=2.)
+
+    assert multinomp.data == {'a': 2., 'b': 2.}
+    assert multinomp._N == 4.
+    assert multinomp.posterior_mean('p_a') == 0.5
+
+    multinomp.decay_to(3.)
+    assert multinomp.data == {'a': 1., 'b': 1.}
+
+
+def test_half_life_query():
+    """
+    * multinomial: test_half_life_query -- queries with a timestamp use the
+    decayed counts without changing the stored ones.
+    """
+    multinomp = MultinomialDirichlet(['a', 'b'], half_life=1.)
+    multinomp.add_data({'a': 6, 'b': 2}, timestamp=0.)
+
+    assert multinomp.posterior_mean('p_a', timestamp=2.) == (1+1.5)/(2+2)
+    assert np.allclose(multinomp.posterior_means(timestamp=2.),
+                       [2.5/4, 1.5/4])
+    assert np.allclose(
+        multinomp.posterior_high_density_credible_regions(timestamp=2.)[0],
+        multinomp.posterior_high_density_credible_region('p_a',
+                                                         timestamp=2.))
+    assert multinomp.posterior_sample(size=3, rng=0,
+                                      timestamp=2.).shape == (3, 2)
+    assert multinomp.data == {'a': 6, 'b': 2}
+
+
+def test_posterior_predictive(setup):
+    """
+    * multinomial: test_posterior_predictive -- Dirichlet-Multinomial
+    predictive pmf, moments and sample.
+    """
+    mp = setup['multinomp']
+    mp.add_data({'a': 3, 'b': 1})
+    outcomes = np.array([[i, j, k, 3 - i - j - k] for i in range(4)
+                         for j in range(4 - i) for k in range(4 - i - j)])
+    pmf = mp.posterior_predictive_pmf(outcomes)
+
+    assert pmf.shape == (20,)
+    assert np.isclose(pmf.sum(), 1.)
+    assert np.allclose((outcomes*pmf[:, np.newaxis]).sum(axis=0),
+                       mp.posterior_predictive_mean(3))
+    assert np.allclose(mp.posterior_predictive_mean([1, 3])[0],
+                       mp.posterior_means())
+    assert mp.posterior_predictive_variance([1, 3]).shape == (2, 4)
+
+    sample = mp.posterior_predictive_sample(3, size=100, rng=0)
+    assert sample.shape == (100, 4)
+    assert np.all(sample.sum(axis=-1) == 3)
+
+    with pytest.raises(ConjugateDataException):
+        mp.posterior_predictive_logpmf([1, 2])
@@ -0,0 +1,115 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+Tests for the sampling.py
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import numpy as np
+import pytest
+
+from conjugate import ConjugateParameterException
+from conjugate import MultinomialDirichlet
+from conjugate import ProbabilityOfMax
+from conjugate import ReservoirQuantiles
+from conjugate import RunningMoments
+from conjugate import dirichlet_sample_chunks
+from conjugate import reduce_chunks
+
+
+def test_chunks_shape_and_buffer():
+    """
+    * sampling: test_chunks_shape_and_buffer -- block sizes add up and the
+    buffer is reused between blocks.
+    """
+    blocks = []
+    for block in dirichlet_sample_chunks([1., 2., 3.], 2500, chunk_size=1000,
+                                         rng=1):
+        assert np.allclose(block.sum(axis=1), 1.0)
+        blocks.append(block)
+
+    assert [b.shape[0] for b in blocks] == [1000, 1000, 500]
+    assert np.shares_memory(blocks[0], blocks[1])
+
+
+def test_small_alpha_underflow():
+    """
+    * sampling: test_small_alpha_underflow -- rows whose Gamma variates all
+    underflow are redrawn instead of becoming nan.
+    """
+    alpha = [1.e-4, 1.e-4, 1.e-4]
+    mp = MultinomialDirichlet(['a', 'b', 'c'])
+    mp.prior_hyperparameters = {'a_a': 1.e-4, 'a_b': 1.e-4, 'a_c': 1.e-4}
+    sample = mp.posterior_sample(size=2000, rng=0)
+    block = next(dirichlet_sample_chunks(alpha, 2000, rng=0))
+
+    for draws in (sample, block):
+        assert not np.any(np.isnan(draws))
+        assert np.allclose(draws.sum(axis=1), 1.)
+        # almost all mass sits on one symbol per draw
+        assert np.mean(draws.max(axis=1) > 0.99) > 0.9
+
+
+def test_chunks_invalid():
+    """
+    * sampling: test_chunks_invalid -- chunk size must be positive.
+    """
+    with pytest.raises(ConjugateParameterException):
+        next(dirichlet_sample_chunks([1., 1.], 10, chunk_size=0))
+
+
+def test_reducers_posterior():
+    """
+    * sampling: test_reducers_posterior -- running moments, reservoir
+    quantiles and probability-of-max agree with the exact posterior.
+    """
+    mp = MultinomialDirichlet(['a', 'b', 'c'])
+    mp.data = {'a': 30, 'b': 10, 'c': 29}
+    chunks = mp.posterior_sample_chunks(50000, chunk_size=4096,
+                                        rng=np.random.default_rng(5))
+
+    moments, quantiles, pmax = reduce_chunks(
+        chunks, RunningMoments(), ReservoirQuantiles([0.5], rng=2),
+        ProbabilityOfMax())
+
+    mean, variance = moments.result()
+    alpha = mp.alpha + mp.counts
+    A = alpha.sum()
+    assert moments.count == 50000
+    assert np.allclose(mean, alpha/A, atol=0.002)
+    assert np.allclose(variance, alpha*(A - alpha)/(A**2*(A + 1)), rtol=0.05)
+    assert np.allclose(quantiles.result()[0], alpha/A, atol=0.02)
+
+    prob = pmax.result()
+    assert np.isclose(prob.sum(), 1.0)
+    assert prob[1] < 0.01 and prob[0] > prob[2]
+
+
+def test_reservoir_uniform():
+    """
+    * sampling: test_reservoir_uniform -- every row is equally likely to be
+    kept in the reservoir.
+    """
+    rows = np.arange(1000, dtype=float)[:, np.newaxis]
+    kept = np.zeros(1000)
+    for seed in range(200):
+        reducer = ReservoirQuantiles(0.5, reservoir_size=100, rng=seed)
+        for start in range(0, 1000, 64):
+            reducer.update(rows[start:start + 64])
+        kept[reducer._reservoir[:, 0].astype(int)] += 1
+
+    # each row is kept with probability 0.1, i.e. ~20 times in 200 runs
+    assert kept.sum() == 200*100
+    assert abs(kept[:500].mean() - kept[500:].mean()) < 2
@@ -0,0 +1,149 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+Tests for saving and loading posterior snapshots.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import io
+
+import numpy as np
+import pytest
+
+from conjugate import BinomialBeta
+from conjugate import BinomialBetaArray
+from conjugate import ConjugateDataException
+from conjugate import MultinomialDirichlet
+from conjugate import load_posteriors
+from conjugate import save_posteriors
+
+
+def _roundtrip(posteriors, **kwargs):
+    f = io.BytesIO()
+    save_posteriors(f, posteriors)
+    f.seek(0)
+
+    return load_posteriors(f, **kwargs)
+
+
+def test_binomial_array_roundtrip():
+    """
+    * snapshot: test_binomial_array_roundtrip -- arrays survive a save/load
+    cycle with compact count dtypes.
+    """
+    arr = BinomialBetaArray(4, alpha=[1, 2, 3, 4], beta=2)
+    arr.add_data({'n': [0, 10, 300, 7], 'k': [0, 3, 299, 7]})
+
+    loaded = _roundtrip(arr)
+
+    assert isinstance(loaded, BinomialBetaArray)
+    assert list(loaded.alpha) == [1, 2, 3, 4]
+    assert list(loaded.beta) == [2, 2, 2, 2]
+    assert list(loaded.n) == [0, 10, 300, 7]
+    assert list(loaded.k) == [0, 3, 299, 7]
+    assert loaded.n.dtype == np.int64
+
+
+def test_binomial_list_roundtrip():
+    """
+    * snapshot: test_binomial_list_roundtrip -- lists of BinomialBeta load
+    as an array or as a list.
+    """
+    posteriors = [BinomialBeta() for _ in range(3)]
+    posteriors[1].add_data({'n': 5, 'k': 2})
+    posteriors[2].prior_hyperparameters = {'alpha': 3, 'beta': 1}
+
+    arr = _roundtrip(posteriors)
+    assert list(arr.n) == [0, 5, 0] and list(arr.alpha) == [1, 1, 3]
+
+    loaded = _roundtrip(posteriors, as_array=False)
+    assert [bp.data for bp in loaded] == [bp.data for bp in posteriors]
+    assert loaded[2].prior_hyperparameters == {'alpha': 3, 'beta': 1}
+
+
+def test_multinomial_roundtrip():
+    """
+    * snapshot: test_multinomial_roundtrip -- shared alphabet, priors and
+    counts are restored; loaded posteriors are independent.
+    """
+    posteriors = [MultinomialDirichlet(['a', 'b_c']) for _ in range(3)]
+    posteriors[0].add_data({'a': 4})
+    posteriors[2].prior_hyperparameters = {'a_b_c': 5}
+    posteriors[2].add_data({'b_c': 2.5})
+
+    loaded = _roundtrip(posteriors)
+
+    for before, after in zip(posteriors, loaded):
+        assert after.alphabet == before.alphabet
+        assert after.prior_hyperparameters == before.prior_hyperparameters
+        assert after.data == before.data
+        assert after.posterior_mean('p_b_c') == before.posterior_mean('p_b_c')
+
+    loaded[1].add_data({'a': 1})
+    assert loaded[0].data == {'a': 4, 'b_c': 0}
+
+
+def test_half_life_roundtrip():
+    """
+    * snapshot: test_half_life_roundtrip -- half-lives and update times are
+    restored, so loaded posteriors keep decaying.
+    """
+    arr = BinomialBetaArray(3, half_life=10.)
+    arr.add_data({'n': [4, 8], 'k': [2, 2]}, index=[0, 1],
+                 timestamp=[100., 90.])
+    posteriors = [BinomialBeta(half_life=10.) for _ in range(2)]
+    posteriors[0].add_data({'n': 4, 'k': 1}, timestamp=50.)
+    multi = [MultinomialDirichlet(['a', 'b'], half_life=10.)]
+    multi[0].add_data({'a': 4}, timestamp=20.)
+
+    loaded = _roundtrip(arr)
+    assert loaded.half_life == 10.
+    assert list(loaded._last) == [100., 90., -np.inf]
+    assert list(loaded.n) == [4., 8., 0.]
+    loaded.decay_to(110.)
+    assert np.allclose(loaded.n, [2., 2., 0.])
+
+    loaded = _roundtrip(posteriors, as_array=False)
+    assert loaded[0].half_life == 10.
+    assert loaded[0]._timestamp == 50.
+    assert loaded[1]._timestamp == -np.inf
+    loaded[0].decay_to(60.)
+    assert loaded[0].data == {'n': 2., 'k': 0.5}
+
+    loaded = _roundtrip(multi)
+    assert loaded[0].half_life == 10. and loaded[0]._timestamp == 20.
+    loaded[0].decay_to(30.)
+    assert loaded[0].data == {'a': 2., 'b': 0.}
+
+    with pytest.raises(ConjugateDataException):
+        save_posteriors(io.BytesIO(), [BinomialBeta(half_life=1.),
+                                       BinomialBeta()])
+
+
+def test_save_invalid():
+    """
+    * snapshot: test_save_invalid -- mixed collections and alphabets are
+    rejected.
+    """
+    with pytest.raises(ConjugateDataException):
+        save_posteriors(io.BytesIO(), [BinomialBeta(),
+                                       MultinomialDirichlet(['a'])])
+
+    with pytest.raises(ConjugateDataException):
+        save_posteriors(io.BytesIO(), [MultinomialDirichlet(['a']),
+                                       MultinomialDirichlet(['b'])])
+
+    with pytest.raises(ConjugateDataException):
+        save_posteriors(io.BytesIO(), [])
@@ -0,0 +1,155 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+Tests for the memory-mapped posterior stores.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import os
+
+import numpy as np
+import pytest
+
+from conjugate import BinomialBeta
+from conjugate import ConjugateDataException
+from conjugate import MultinomialDirichlet
+from conjugate import create_beta_store
+from conjugate import create_dirichlet_store
+from conjugate import open_beta_store
+from conjugate import open_dirichlet_store
+
+
+@pytest.fixture
+def store_path(tmpdir):
+    return os.path.join(str(tmpdir), 'store')
+
+
+def test_beta_store(store_path):
+    """
+    * store: test_beta_store -- updates are written in place and seen by
+    other handles; slices are views.
+    """
+    store = create_beta_store(store_path, 5, alpha=2)
+    store.add_data({'n': [4, 6], 'k': [1, 6]}, index=[1, 3])
+    store[2:4].add_data({'n': 1, 'k': 0})
+
+    reader = open_beta_store(store_path, mode='r')
+    assert isinstance(reader.n, np.memmap)
+    assert list(reader.n) == [0, 4, 1, 7, 0]
+    assert list(reader.alpha) == [2, 2, 2, 2, 2]
+
+    bp = BinomialBeta()
+    bp.prior_hyperparameters = {'alpha': 2, 'beta': 1}
+    bp.add_data({'n': 7, 'k': 6})
+    assert reader[3].data == bp.data
+    assert np.allclose(reader.posterior_high_density_credible_region('p')[3],
+                       bp.posterior_high_density_credible_region('p'))
+
+    with pytest.raises(ValueError):
+        reader.add_data({'n': 1, 'k': 1})
+
+
+def test_dirichlet_store(store_path):
+    """
+    * store: test_dirichlet_store -- rows behave like MultinomialDirichlet
+    and write through to the store.
+    """
+    store = create_dirichlet_store(store_path, ['a', 'b', 'c'], 4,
+                                   alpha=[1, 2, 1])
+    row = store[1]
+    row.add_data({'a': 3})
+    row.add_sequence('ab')
+    store.add_counts([2, 2], [[1, 0, 0], [0, 0, 1]])
+
+    reader = open_dirichlet_store(store_path, mode='r')
+    assert reader.alphabet == ['a', 'b', 'c']
+    assert reader[1].data == {'a': 4, 'b': 1, 'c': 0}
+
+    mp = MultinomialDirichlet(['a', 'b', 'c'])
+    mp.prior_hyperparameters = {'a_b': 2}
+    mp.add_data({'a': 4, 'b': 1})
+    assert np.allclose(reader.posterior_means(chunk_size=3)[1],
+                       mp.posterior_means())
+    assert np.allclose(reader.posterior_central_credible_regions()[1],
+                       mp.posterior_central_credible_regions())
+    assert reader[2:].counts.shape == (2, 3)
+
+    with pytest.raises(ValueError):
+        reader[1].add_data({'a': 1})
+
+    with pytest.raises(ConjugateDataException):
+        store.add_counts([0], [[1, 1]])
+
+
+def test_dirichlet_store_live_rows(store_path):
+    """
+    * store: test_dirichlet_store_live_rows -- a row view sees updates
+    made after it was taken.
+    """
+    store = create_dirichlet_store(store_path, ['a', 'b'], 2)
+    view = store[0]
+    other = store[0]
+    store.add_counts([0], [[100, 0]])
+    other.add_data({'b': 10})
+
+    assert view.posterior_mean('p_a') == 101/112
+    assert np.isclose(view.posterior_means().sum(), 1.)
+    assert view._posterior_marginal_scipy('p_a').args == (101, 11)
+
+    reader = open_dirichlet_store(store_path, mode='r')
+    view = reader[0]
+    store.add_counts([0], [[0, 4]])
+    assert view.posterior_mean('p_b') == 15/116
+
+
+def test_dirichlet_store_out(store_path):
+    """
+    * store: test_dirichlet_store_out -- summaries and samples can be
+    written to memory-mapped outputs.
+    """
+    store = create_dirichlet_store(store_path, ['a', 'b'], 5)
+    store.add_counts([0, 3], [[10, 0], [0, 4]])
+
+    out = np.lib.format.open_memmap(str(store_path) + '_means.npy',
+                                    mode='w+', shape=(5, 2))
+    means = store.posterior_means(chunk_size=2, out=out)
+    assert means is out
+    assert np.allclose(out[0], [11./12., 1./12.])
+
+    hdcr = store.posterior_high_density_credible_regions(
+        chunk_size=2, out=np.empty((5, 2, 2)))
+    assert np.allclose(
+        hdcr[3, 1], store[3].posterior_high_density_credible_region('p_b'))
+
+    sample = store.posterior_sample(size=1000, rng=0, chunk_size=2)
+    assert sample.shape == (1000, 5, 2)
+    assert np.allclose(sample.sum(axis=-1), 1.)
+    assert np.allclose(sample.mean(axis=0), store.posterior_means(),
+                       atol=0.03)
+
+    with pytest.raises(ConjugateDataException):
+        store.posterior_means(out=np.empty((4, 2)))
+
+
+def test_open_invalid(store_path):
+    """
+    * store: test_open_invalid -- missing or mismatched stores are rejected.
+    """
+    with pytest.raises(ConjugateDataException):
+        open_beta_store(store_path)
+
+    create_beta_store(store_path, 2)
+    with pytest.raises(ConjugateDataException):
+        open_dirichlet_store(store_path)
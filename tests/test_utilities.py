@@ -17,11 +17,26 @@ from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
                              input, int, map, next, oct, open, pow, range,
                              round, str, super, zip)
 
+import threading
+
+import numpy as np
 import pytest
 
+from scipy.optimize import fmin
 from scipy.stats import beta
+from scipy.stats import betabinom
 
+from conjugate import BinomialBeta
+from conjugate import ConjugateParameterException
+from conjugate import CredibleRegionCache
+from conjugate import MultinomialDirichlet
+from conjugate import beta_binomial_logpmf
+from conjugate import beta_central_credible_region
+from conjugate import beta_high_density_credible_region
+from conjugate import beta_mode
 from conjugate import central_credible_region
+from conjugate import credible_region_cache
+from conjugate import dirichlet_multinomial_logpmf
 from conjugate import high_density_credible_region
 
 
@@ -60,3 +75,225 @@ def test_ccr_binomial_02():
     pre_comp = [0.0025285785444617869, 0.30849710781876077]
 
     assert ccr == pre_comp
+
+
+def test_beta_hdcr_matches_fmin():
+    """
+    * utils: test_beta_hdcr_matches_fmin -- the Beta HDCR engine agrees with
+    a direct minimization of the region width.
+    """
+    def region_width(lower_bound, dist, confidence):
+        return dist.ppf(lower_bound + confidence) - dist.ppf(lower_bound)
+
+    for a, b, confidence in [(3, 4, 0.95), (1.5, 40, 0.9), (200, 3, 0.5)]:
+        dist = beta(a, b)
+        lower = fmin(region_width, 1.0 - confidence, args=(dist, confidence),
+                     xtol=1.e-12, ftol=1.e-12, disp=False)[0]
+        pre_comp = dist.ppf([lower, lower + confidence])
+        hdcr = beta_high_density_credible_region(a, b, confidence)
+
+        assert np.allclose(hdcr, pre_comp, atol=1.e-8)
+        assert abs(dist.cdf(hdcr[1]) - dist.cdf(hdcr[0]) - confidence) < 1e-12
+
+
+def test_beta_hdcr_vectorized():
+    """
+    * utils: test_beta_hdcr_vectorized -- broadcast over hyperparameters and
+    confidence levels.
+    """
+    a = np.array([0.5, 1.0, 1.0, 3.0, 5.0])
+    b = np.array([0.5, 1.0, 10.0, 0.5, 5.0])
+    hdcr = beta_high_density_credible_region(a, b, [0.5, 0.95], outer=True)
+
+    assert hdcr.shape == (5, 2, 2)
+    # monotone densities put the region against the boundary
+    assert hdcr[2, 1, 0] == 0.0 and hdcr[3, 1, 1] == 1.0
+    # uniform and symmetric densities give the central region
+    assert np.allclose(hdcr[1, 1], [0.025, 0.975])
+    assert np.allclose(hdcr[4, 1], beta(5, 5).ppf([0.025, 0.975]))
+
+
+def test_beta_hdcr_invalid():
+    """
+    * utils: test_beta_hdcr_invalid -- reject bad hyperparameters and
+    confidence levels.
+    """
+    with pytest.raises(ConjugateParameterException):
+        beta_high_density_credible_region(-1, 2)
+
+    with pytest.raises(ConjugateParameterException):
+        beta_high_density_credible_region(1, 2, confidence=1.5)
+
+
+def test_beta_ccr_batch():
+    """
+    * utils: test_beta_ccr_batch -- (N, L, 2) regions agree with
+    central_credible_region for every distribution and level.
+    """
+    a = np.array([1.0, 5.0, 30.0])
+    b = np.array([10.0, 5.0, 2.0])
+    levels = np.array([0.5, 0.8, 0.95])
+    ccr = beta_central_credible_region(a, b, levels, outer=True)
+
+    assert ccr.shape == (3, 3, 2)
+    for i in range(3):
+        for j in range(3):
+            pre_comp = central_credible_region(beta(a[i], b[i]), levels[j])
+            assert np.allclose(ccr[i, j], pre_comp)
+
+    assert beta_central_credible_region(5, 5).shape == (2,)
+
+
+def test_beta_regions_elementwise():
+    """
+    * utils: test_beta_regions_elementwise -- aligned (a, b, confidence)
+    arrays give one region per element.
+    """
+    rng = np.random.default_rng(0)
+    a = rng.uniform(0.5, 50., size=400)
+    b = rng.uniform(0.5, 50., size=400)
+    levels = rng.uniform(0.5, 0.99, size=400)
+
+    ccr = beta_central_credible_region(a, b, levels)
+    hdcr = beta_high_density_credible_region(a, b, levels)
+    assert ccr.shape == hdcr.shape == (400, 2)
+    for i in [0, 199, 399]:
+        assert np.allclose(ccr[i], beta_central_credible_region(a[i], b[i],
+                                                                levels[i]))
+        assert np.allclose(hdcr[i],
+                           beta_high_density_credible_region(a[i], b[i],
+                                                             levels[i]))
+
+    with pytest.raises(ConjugateParameterException):
+        beta_central_credible_region(a, b, [0.5, 0.9])
+
+
+def test_credible_region_cache_lru():
+    """
+    * utils: test_credible_region_cache_lru -- hits, misses and eviction of
+    the least-recently-used region.
+    """
+    cache = CredibleRegionCache(maxsize=2)
+    calls = []
+
+    def compute(a):
+        calls.append(a)
+        return [0.0, a]
+
+    for a in [1, 2, 1, 3, 2]:
+        region = cache.region('ccr', 'beta', (a, 1), 0.95,
+                              lambda: compute(a))
+        assert list(region) == [0.0, a]
+
+    # 2 was evicted when 3 was added, 1 was used more recently
+    assert calls == [1, 2, 3, 2]
+    assert cache.info() == {'hits': 1, 'misses': 4, 'size': 2, 'maxsize': 2}
+
+    cache.maxsize = 0
+    assert len(cache) == 0
+    cache.region('ccr', 'beta', (1, 1), 0.95, lambda: compute(1))
+    assert cache.info()['misses'] == 4
+
+
+def test_credible_region_cache_posteriors():
+    """
+    * utils: test_credible_region_cache_posteriors -- posteriors with
+    identical marginals share cached regions.
+    """
+    assert credible_region_cache.maxsize == 0
+
+    credible_region_cache.clear()
+    credible_region_cache.maxsize = 16
+    try:
+        bp = BinomialBeta()
+        bp.data = {'n': 5, 'k': 2}
+        hdcr = bp.posterior_high_density_credible_region('p')
+
+        # marginal posterior of p_a is Beta(1+2, 1+3), the same as bp
+        mp = MultinomialDirichlet(['a', 'b'])
+        mp.data = {'a': 2, 'b': 3}
+        assert mp.posterior_high_density_credible_region('p_a') == hdcr
+
+        info = credible_region_cache.info()
+        assert info['hits'] == 1 and info['misses'] == 1
+    finally:
+        credible_region_cache.maxsize = 0
+        credible_region_cache.clear()
+
+
+def test_credible_region_cache_threads():
+    """
+    * utils: test_credible_region_cache_threads -- concurrent lookups with
+    evictions neither fail nor lose statistics.
+    """
+    cache = CredibleRegionCache(maxsize=4)
+    errors = []
+
+    def worker(seed):
+        try:
+            for i in range(500):
+                p = (seed + i) % 10
+                cache.region('ccr', 'beta', (p + 1., 2.), 0.95,
+                             lambda: [0., 1.])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(s,)) for s in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    info = cache.info()
+    assert errors == []
+    assert info['hits'] + info['misses'] == 4000
+    assert info['size'] <= 4
+
+
+def test_beta_mode():
+    """
+    * utils: test_beta_mode -- interior, boundary and undefined modes.
+    """
+    a = [2, 5, 0.5, 1, 3, 1, 0.5]
+    b = [2, 2, 3, 4, 1, 1, 0.5]
+    mode = beta_mode(a, b)
+
+    assert np.allclose(mode[:5], [0.5, 0.8, 0., 0., 1.])
+    assert np.all(np.isnan(mode[5:]))
+
+
+def test_beta_binomial_logpmf():
+    """
+    * utils: test_beta_binomial_logpmf -- broadcast log-pmf matches scipy;
+    impossible outcomes give -inf.
+    """
+    k = np.arange(11)[:, np.newaxis]
+    a = np.array([0.5, 2., 30.])
+    b = np.array([0.5, 5., 1.])
+    logpmf = beta_binomial_logpmf(k, 10, a, b)
+
+    assert logpmf.shape == (11, 3)
+    assert np.allclose(logpmf, betabinom.logpmf(k, 10, a, b))
+    assert np.allclose(np.exp(logpmf).sum(axis=0), 1.)
+    assert np.all(beta_binomial_logpmf([-1, 11, 2.5], 10, 1., 1.) ==
+                  -np.inf)
+
+
+def test_dirichlet_multinomial_logpmf():
+    """
+    * utils: test_dirichlet_multinomial_logpmf -- pmf sums to one over all
+    outcomes and reduces to the Beta-Binomial for two symbols.
+    """
+    alpha = np.array([0.5, 2., 3.])
+    outcomes = np.array([[i, j, 4 - i - j] for i in range(5)
+                         for j in range(5 - i)])
+    pmf = np.exp(dirichlet_multinomial_logpmf(outcomes, alpha))
+
+    assert pmf.shape == (15,)
+    assert np.isclose(pmf.sum(), 1.)
+
+    k = np.arange(7)
+    counts = np.stack([k, 6 - k], axis=-1)
+    assert np.allclose(dirichlet_multinomial_logpmf(counts, [2., 3.]),
+                       beta_binomial_logpmf(k, 6, 2., 3.))
+    assert dirichlet_multinomial_logpmf([1, -1, 2], alpha) == -np.inf
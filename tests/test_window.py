@@ -0,0 +1,148 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# vim:fenc=utf-8
+#
+# Copyright © 2015 Christopher C. Strelioff <chris.strelioff@gmail.com>
+#
+# Distributed under terms of the MIT license.
+
+"""
+Tests for the SlidingWindow class.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.builtins import (ascii, bytes, chr, dict, filter, hex,  # noqa
+                             input, int, map, next, oct, open, pow, range,
+                             round, str, super, zip)
+
+import numpy as np
+import pytest
+
+from conjugate import BinomialBeta
+from conjugate import ConjugateDataException
+from conjugate import ConjugateParameterException
+from conjugate import MultinomialDirichlet
+from conjugate import SlidingWindow
+
+
+@pytest.fixture
+def binom_window():
+    return SlidingWindow(BinomialBeta(), window=60., n_buckets=6)
+
+
+@pytest.fixture
+def multi_window():
+    return SlidingWindow(MultinomialDirichlet(['a', 'b', 'c']), window=60.,
+                         n_buckets=6)
+
+
+def test_binomial_window(binom_window):
+    """
+    * window: test_binomial_window -- posterior holds only the data of the
+    last window.
+    """
+    binom_window.add_data({'n': 10, 'k': 4}, timestamp=0.)
+    binom_window.add_data({'n': 5, 'k': 5}, timestamp=35.)
+    assert binom_window.posterior.data == {'n': 15, 'k': 9}
+
+    # first bucket [0, 10) expires once the window ends in [60, 70)
+    binom_window.advance(65.)
+    assert binom_window.posterior.data == {'n': 5, 'k': 5}
+    assert binom_window.posterior.posterior_mean('p') == \
+        pytest.approx(6./7.)
+
+    binom_window.add_outcomes([1, 0, 0], timestamp=70.)
+    assert binom_window.posterior.data == {'n': 8, 'k': 6}
+
+    # a gap longer than the window clears everything
+    binom_window.advance(1000.)
+    assert binom_window.posterior.data == {'n': 0, 'k': 0}
+
+
+def test_binomial_window_late_data(binom_window):
+    """
+    * window: test_binomial_window_late_data -- late data goes to its own
+    bucket; data older than the window is ignored.
+    """
+    binom_window.add_data({'n': 2, 'k': 1}, timestamp=55.)
+    binom_window.add_data({'n': 3, 'k': 3}, timestamp=5.)
+    binom_window.add_data({'n': 7, 'k': 7}, timestamp=-10.)
+    assert binom_window.posterior.data == {'n': 5, 'k': 4}
+
+    binom_window.advance(60.)
+    assert binom_window.posterior.data == {'n': 2, 'k': 1}
+
+
+def test_multinomial_window(multi_window):
+    """
+    * window: test_multinomial_window -- running totals match a brute-force
+    sum over events in the window.
+    """
+    rng = np.random.default_rng(0)
+    times = np.sort(rng.uniform(0., 300., size=200))
+    symbols = rng.choice(['a', 'b', 'c'], size=200)
+    for t, s in zip(times.tolist(), symbols.tolist()):
+        multi_window.add_sequence([s], timestamp=t)
+
+    head = int(times[-1]//10.)
+    live = (times//10.) > head - 6
+    expected = [int(np.sum(live & (symbols == s))) for s in 'abc']
+    assert multi_window.posterior.counts.tolist() == expected
+    assert multi_window.posterior.posterior_mean('p_a') == \
+        pytest.approx((1. + expected[0])/(3. + sum(expected)))
+
+
+def test_multinomial_window_fractional(multi_window):
+    """
+    * window: test_multinomial_window_fractional -- fractional counts expire
+    exactly.
+    """
+    multi_window.add_data({'a': 0.5}, timestamp=0.)
+    multi_window.add_data({'b': 2}, timestamp=20.)
+    multi_window.advance(60.)
+
+    assert multi_window.posterior.data == {'a': 0., 'b': 2., 'c': 0.}
+
+
+def test_window_exceptions():
+    """
+    * window: test_window_exceptions -- invalid posteriors, windows and data
+    raise exceptions.
+    """
+    with pytest.raises(ConjugateParameterException):
+        SlidingWindow(BinomialBeta(half_life=10.), window=60.)
+
+    with pytest.raises(ConjugateParameterException):
+        SlidingWindow(BinomialBeta(), window=0.)
+
+    with pytest.raises(ConjugateParameterException):
+        SlidingWindow(object(), window=60.)
+
+    window = SlidingWindow(MultinomialDirichlet(['a', 'b']), window=60.)
+    with pytest.raises(ConjugateDataException):
+        window.add_data({'z': 1}, timestamp=0.)
+
+    with pytest.raises(ConjugateDataException):
+        window.add_data({'a': -1}, timestamp=0.)
+
+    assert window.posterior.counts.tolist() == [0, 0]
+
+
+def test_window_invalid_unchanged(binom_window):
+    """
+    * window: test_window_invalid_unchanged -- invalid data leaves the
+    posterior and the buckets in sync.
+    """
+    binom_window.add_data({'n': 2, 'k': 1}, timestamp=0.)
+    with pytest.raises(ConjugateDataException):
+        binom_window.add_data({'n': 1, 'k': 2}, timestamp=1.)
+
+    with pytest.raises(ConjugateDataException):
+        binom_window.add_data({'n': [1, 2]}, timestamp=1.)
+
+    assert binom_window.posterior.data == {'n': 2, 'k': 1}
+
+    binom_window.advance(100.)
+    assert binom_window.posterior.data == {'n': 0, 'k': 0}